@@ -1,3 +1,4 @@
+import glob
 import importlib.resources
 import logging
 import os
@@ -13,6 +14,8 @@ from autorag import dashboard
 from autorag.deploy import extract_best_config as original_extract_best_config
 from autorag.deploy.api import ApiRunner
 from autorag.evaluator import Evaluator
+from autorag.nodes.retrieval.bm25_index import migrate_bm25_pkl
+from autorag.utils.util import load_yaml_config
 from autorag.validator import Validator
 
 logger = logging.getLogger("AutoRAG")
@@ -78,11 +81,67 @@ def evaluate(config, qa_data_path, corpus_data_path, project_dir, skip_validatio
 @click.option(
 	"--remote", help="Run the API server in remote mode.", type=bool, default=False
 )
-def run_api(config_path, host, port, trial_dir, project_dir, remote: bool):
+@click.option(
+	"--workers", help="The number of the API server processes.", type=int, default=1
+)
+@click.option(
+	"--max_batch_size",
+	help="The maximum number of the concurrent requests that run as one batch.",
+	type=int,
+	default=1,
+)
+@click.option(
+	"--batch_wait_ms",
+	help="The maximum milliseconds that a request waits for the other requests to batch.",
+	type=float,
+	default=10.0,
+)
+@click.option(
+	"--warmup_query",
+	help="The synthetic query that warms up the pipeline when the server starts. It can be used many times.",
+	type=str,
+	multiple=True,
+)
+def run_api(
+	config_path,
+	host,
+	port,
+	trial_dir,
+	project_dir,
+	remote: bool,
+	workers: int,
+	max_batch_size: int,
+	batch_wait_ms: float,
+	warmup_query,
+):
+	runner_kwargs = {
+		"max_batch_size": max_batch_size,
+		"batch_wait_ms": batch_wait_ms,
+		"warmup_queries": list(warmup_query) or None,
+	}
+	if workers > 1:
+		# the worker processes load the pipeline, so do not load it here
+		if trial_dir is None:
+			config = load_yaml_config(config_path)
+		else:
+			config = original_extract_best_config(trial_dir)
+			project_dir = os.path.dirname(trial_dir)
+		ApiRunner.run_multi_worker_server(
+			config,
+			project_dir,
+			host=host,
+			port=port,
+			remote=remote,
+			workers=workers,
+			**runner_kwargs,
+		)
+		return
 	if trial_dir is None:
-		runner = ApiRunner.from_yaml(config_path, project_dir=project_dir)
+		runner = ApiRunner.from_yaml(
+			config_path, project_dir=project_dir, **runner_kwargs
+		)
 	else:
-		runner = ApiRunner.from_trial_folder(trial_dir)
+		runner = ApiRunner.from_trial_folder(trial_dir, **runner_kwargs)
 	logger.info(f"Running API server at {host}:{port}...")
 	nest_asyncio.apply()
 	runner.run_api_server(host, port, remote=remote)
@@ -197,6 +256,22 @@ def validate(config, qa_data_path, corpus_data_path):
 	validator.validate(config)
 
 
+@click.command()
+@click.option(
+	"--project_dir",
+	help="Path to project directory.",
+	type=click.Path(dir_okay=True, file_okay=False, exists=True),
+	required=True,
+)
+def migrate_bm25(project_dir):
+	bm25_pkl_paths = glob.glob(os.path.join(project_dir, "resources", "bm25_*.pkl"))
+	if len(bm25_pkl_paths) == 0:
+		logger.info(f"There is no legacy bm25 corpus in {project_dir}.")
+	for bm25_pkl_path in bm25_pkl_paths:
+		index_dir = migrate_bm25_pkl(bm25_pkl_path)
+		click.echo(f"Migrated {bm25_pkl_path} to {index_dir}")
+
+
 cli.add_command(evaluate, "evaluate")
 cli.add_command(run_api, "run_api")
 cli.add_command(run_web, "run_web")
@@ -204,6 +279,7 @@ cli.add_command(run_dashboard, "dashboard")
 cli.add_command(extract_best_config, "extract_best_config")
 cli.add_command(restart_evaluate, "restart_evaluate")
 cli.add_command(validate, "validate")
+cli.add_command(migrate_bm25, "migrate_bm25")
 
 if __name__ == "__main__":
 	cli()
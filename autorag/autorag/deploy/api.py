@@ -1,17 +1,29 @@
+import asyncio
+import functools
+import gc
+import json
 import logging
 import os
 import pathlib
-import uuid
-from typing import Dict, Optional, List, Union, Literal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Dict, Optional, List, Union, Literal, Tuple, Any
 
 import pandas as pd
 from quart import Quart, request, jsonify
 from quart.helpers import stream_with_context
 from pydantic import BaseModel, ValidationError
 
-from autorag.deploy.base import BaseRunner
+from autorag.deploy.base import BaseRunner, make_pipeline_context
+from autorag.deploy.batching import MicroBatcher
 from autorag.nodes.generator.base import BaseGenerator
 from autorag.nodes.promptmaker.base import BasePromptMaker
+from autorag.utils.corpus import (
+	clear_corpus_cache,
+	get_corpus_path,
+	load_corpus_data,
+)
 from autorag.utils.util import fetch_contents, to_list
 
 logger = logging.getLogger("AutoRAG")
@@ -20,6 +32,8 @@ deploy_dir = pathlib.Path(__file__).parent
 root_dir = pathlib.Path(__file__).parent.parent
 
 VERSION_PATH = os.path.join(root_dir, "VERSION")
+# The environment variable that passes the runner settings to the workers of the multi-worker server
+API_RUNNER_ENV = "AUTORAG_API_RUNNER"
 
 
 class QueryRequest(BaseModel):
@@ -62,18 +76,164 @@ class VersionResponse(BaseModel):
 	version: str
 
 
+class ModuleStatus(BaseModel):
+	module_type: str
+	load_time: float
+	warmup_time: Optional[float]
+
+
+class ReadyResponse(BaseModel):
+	ready: bool
+	modules: List[ModuleStatus]
+	error: Optional[str] = None
+
+
+def open_ngrok_tunnel(port: int):
+	from pyngrok import ngrok
+
+	http_tunnel = ngrok.connect(str(port), "http")
+	logger.info(f"Public API URL: {http_tunnel.public_url}")
+
+
 class ApiRunner(BaseRunner):
-	def __init__(self, config: Dict, project_dir: Optional[str] = None):
-		super().__init__(config, project_dir)
+	# the warmup queries run in the background when the server starts
+	warmup_on_init = False
+
+	def __init__(
+		self,
+		config: Dict,
+		project_dir: Optional[str] = None,
+		max_workers: Optional[int] = None,
+		max_batch_size: int = 1,
+		batch_wait_ms: float = 10.0,
+		load_workers: Optional[int] = None,
+		warmup_queries: Optional[List[str]] = None,
+	):
+		"""
+		Initialize the API runner.
+		The modules of the pipeline run at a thread pool,
+		so the requests do not block the event loop of the server and run concurrently.
+
+		:param config: The pipeline config.
+		:param project_dir: The project directory.
+			Default is the current directory.
+		:param max_workers: The maximum number of the threads that run the pipeline.
+			Default is None, which follows the default of ThreadPoolExecutor.
+		:param max_batch_size: The maximum number of the concurrent requests that run as one batch.
+			The requests that come in batch_wait_ms are stacked to one dataframe,
+			so each module runs once for them.
+			Default is 1, which runs each request alone.
+		:param batch_wait_ms: The maximum milliseconds that a request waits for the other requests.
+			Default is 10.
+		:param load_workers: The number of the threads that load the modules.
+			Default is None, which follows the default of ThreadPoolExecutor.
+		:param warmup_queries: The synthetic queries that run through each module when the server starts.
+			The /health/ready endpoint returns 503 until the warmup is done.
+			Default is None, which does not warm up.
+		"""
+		super().__init__(
+			config,
+			project_dir,
+			load_workers=load_workers,
+			warmup_queries=warmup_queries,
+		)
+		self.load_workers = load_workers
+		self.ready = not warmup_queries
+		self.warmup_error: Optional[str] = None
+		self.warmup_task: Optional[asyncio.Future] = None
 		self.app = Quart(__name__)
-
-		data_dir = os.path.join(project_dir, "data")
-		self.corpus_df = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
+		self.max_workers = max_workers
+		self.max_batch_size = max_batch_size
+		self.batch_wait_ms = batch_wait_ms
+		# the micro batchers of each module indices
+		self.batchers: Dict[Tuple[int, ...], MicroBatcher] = {}
+		self.executor = ThreadPoolExecutor(
+			max_workers=max_workers, thread_name_prefix="autorag-api"
 		)
+		# the modules with local models run one request at a time
+		self.module_locks = [
+			threading.Lock()
+			if module_instance.get_resource(**module_param) == "gpu"
+			else None
+			for module_instance, module_param in zip(
+				self.module_instances, self.module_params
+			)
+		]
+
+		data_dir = os.path.join(self.project_dir, "data")
+		self.corpus_df = load_corpus_data(get_corpus_path(data_dir))
 		self.__add_api_route()
 
+	def run_modules(
+		self, previous_result: pd.DataFrame, module_indices: List[int]
+	) -> pd.DataFrame:
+		"""
+		Run the modules of the pipeline in order.
+
+		:param previous_result: The previous result dataframe.
+		:param module_indices: The indices of the modules to run.
+		:return: The result dataframe, which has the previous result columns and the module result columns.
+		"""
+		context = self.run_pipeline(previous_result.to_dict("list"), module_indices)
+		return pd.DataFrame(context)
+
+	def _run_module(
+		self, module_index: int, context: Dict[str, List[Any]]
+	) -> Dict[str, List[Any]]:
+		with self.module_locks[module_index] or nullcontext():
+			return super()._run_module(module_index, context)
+
+	def _warmup_in_background(self):
+		try:
+			self.warmup(self.warmup_queries)
+		except Exception as e:
+			# the failed warmup does not block the server, but it is reported at /health/ready
+			logger.exception("Failed to warm up the pipeline.")
+			self.warmup_error = str(e)
+		self.ready = True
+
+	async def arun_modules(
+		self, previous_result: pd.DataFrame, module_indices: List[int]
+	) -> pd.DataFrame:
+		"""
+		Run the modules of the pipeline at the thread pool without blocking the event loop.
+		With max_batch_size bigger than one, it runs with the other concurrent requests as one batch.
+		"""
+
+		async def run(rows: pd.DataFrame) -> pd.DataFrame:
+			loop = asyncio.get_running_loop()
+			return await loop.run_in_executor(
+				self.executor,
+				functools.partial(self.run_modules, rows, module_indices),
+			)
+
+		if self.max_batch_size <= 1:
+			return await run(previous_result)
+		key = tuple(module_indices)
+		if key not in self.batchers:
+			self.batchers[key] = MicroBatcher(
+				run, max_batch_size=self.max_batch_size, max_wait_ms=self.batch_wait_ms
+			)
+		return await self.batchers[key].run(previous_result)
+
 	def __add_api_route(self):
+		@self.app.before_serving
+		async def start_warmup():
+			if not self.ready:
+				loop = asyncio.get_running_loop()
+				self.warmup_task = loop.run_in_executor(
+					self.executor, self._warmup_in_background
+				)
+
+		@self.app.route("/health/ready", methods=["GET"])
+		async def get_ready():
+			response = ReadyResponse(
+				ready=self.ready,
+				modules=self.get_module_status(),
+				error=self.warmup_error,
+			)
+			return jsonify(response.model_dump()), 200 if self.ready else 503
+
 		@self.app.route("/v1/run", methods=["POST"])
 		async def run_query():
 			try:
@@ -82,25 +242,10 @@ class ApiRunner(BaseRunner):
 			except ValidationError as e:
 				return jsonify(e.errors()), 400
 
-			previous_result = pd.DataFrame(
-				{
-					"qid": str(uuid.uuid4()),
-					"query": [data.query],
-					"retrieval_gt": [[]],
-					"generation_gt": [""],
-				}
-			)  # pseudo qa data for execution
-			for module_instance, module_param in zip(
-				self.module_instances, self.module_params
-			):
-				new_result = module_instance.pure(
-					previous_result=previous_result, **module_param
-				)
-				duplicated_columns = previous_result.columns.intersection(
-					new_result.columns
-				)
-				drop_previous_result = previous_result.drop(columns=duplicated_columns)
-				previous_result = pd.concat([drop_previous_result, new_result], axis=1)
+			previous_result = pd.DataFrame(make_pipeline_context([data.query]))
+			previous_result = await self.arun_modules(
+				previous_result, list(range(len(self.module_instances)))
+			)
 
 			# Simulate processing the query
 			generated_text = previous_result[data.result_column].tolist()[0]
@@ -123,29 +268,13 @@ class ApiRunner(BaseRunner):
 					}
 				), 400
 
-			previous_result = pd.DataFrame(
-				{
-					"qid": str(uuid.uuid4()),
-					"query": [query],
-					"retrieval_gt": [[]],
-					"generation_gt": [""],
-				}
-			)  # pseudo qa data for execution
-			for module_instance, module_param in zip(
-				self.module_instances, self.module_params
-			):
-				if isinstance(module_instance, BasePromptMaker) or isinstance(
-					module_instance, BaseGenerator
-				):
-					continue
-				new_result = module_instance.pure(
-					previous_result=previous_result, **module_param
-				)
-				duplicated_columns = previous_result.columns.intersection(
-					new_result.columns
-				)
-				drop_previous_result = previous_result.drop(columns=duplicated_columns)
-				previous_result = pd.concat([drop_previous_result, new_result], axis=1)
+			previous_result = pd.DataFrame(make_pipeline_context([query]))
+			module_indices = [
+				i
+				for i, module_instance in enumerate(self.module_instances)
+				if not isinstance(module_instance, (BasePromptMaker, BaseGenerator))
+			]
+			previous_result = await self.arun_modules(previous_result, module_indices)
 
 			# Simulate processing the query
 			retrieved_passages = self.extract_retrieve_passage(previous_result)
@@ -163,31 +292,13 @@ class ApiRunner(BaseRunner):
 
 			@stream_with_context
 			async def generate():
-				previous_result = pd.DataFrame(
-					{
-						"qid": str(uuid.uuid4()),
-						"query": [data.query],
-						"retrieval_gt": [[]],
-						"generation_gt": [""],
-					}
-				)  # pseudo qa data for execution
+				previous_result = pd.DataFrame(make_pipeline_context([data.query]))
 
-				for module_instance, module_param in zip(
-					self.module_instances, self.module_params
+				for i, (module_instance, module_param) in enumerate(
+					zip(self.module_instances, self.module_params)
 				):
 					if not isinstance(module_instance, BaseGenerator):
-						new_result = module_instance.pure(
-							previous_result=previous_result, **module_param
-						)
-						duplicated_columns = previous_result.columns.intersection(
-							new_result.columns
-						)
-						drop_previous_result = previous_result.drop(
-							columns=duplicated_columns
-						)
-						previous_result = pd.concat(
-							[drop_previous_result, new_result], axis=1
-						)
+						previous_result = await self.arun_modules(previous_result, [i])
 					else:
 						retrieved_passages = self.extract_retrieve_passage(
 							previous_result
@@ -227,7 +338,12 @@ class ApiRunner(BaseRunner):
 			return jsonify(response.model_dump()), 200
 
 	def run_api_server(
-		self, host: str = "0.0.0.0", port: int = 8000, remote: bool = True, **kwargs
+		self,
+		host: str = "0.0.0.0",
+		port: int = 8000,
+		remote: bool = True,
+		workers: int = 1,
+		**kwargs,
 	):
 		"""
 		Run the pipeline as an api server.
@@ -236,17 +352,92 @@ class ApiRunner(BaseRunner):
 		:param host: The host of the api server.
 		:param port: The port of the api server.
 		:param remote: Whether to expose the api server to the public internet using ngrok.
-		:param kwargs: Other arguments for Flask app.run.
+		:param workers: The number of the server processes.
+			With more than one worker, it runs a Hypercorn server,
+			and each worker process loads the same pipeline.
+			The modules of this runner are released before the workers start, so they do not stay resident.
+			Use run_multi_worker_server to start the workers without loading the pipeline here at all.
+			Default is 1.
+		:param kwargs: Other arguments for Quart app.run. They are used only with one worker.
 		"""
+		if workers > 1:
+			settings = {
+				"max_workers": self.max_workers,
+				"max_batch_size": self.max_batch_size,
+				"batch_wait_ms": self.batch_wait_ms,
+				"load_workers": self.load_workers,
+				"warmup_queries": self.warmup_queries,
+			}
+			config, project_dir = self.config, self.project_dir
+			# this process only launches the workers, so it does not keep the models and the corpus
+			self.executor.shutdown(wait=False)
+			self.module_instances = []
+			self.corpus_df = None
+			clear_corpus_cache()
+			gc.collect()
+			self.run_multi_worker_server(
+				config,
+				project_dir,
+				host=host,
+				port=port,
+				remote=remote,
+				workers=workers,
+				**settings,
+			)
+			return
+
 		logger.info(f"Run api server at {host}:{port}")
 		if remote:
-			from pyngrok import ngrok
-
-			http_tunnel = ngrok.connect(str(port), "http")
-			public_url = http_tunnel.public_url
-			logger.info(f"Public API URL: {public_url}")
+			open_ngrok_tunnel(port)
 		self.app.run(host=host, port=port, **kwargs)
 
+	@classmethod
+	def run_multi_worker_server(
+		cls,
+		config: Dict,
+		project_dir: Optional[str] = None,
+		host: str = "0.0.0.0",
+		port: int = 8000,
+		remote: bool = True,
+		workers: int = 2,
+		**kwargs,
+	):
+		"""
+		Run the pipeline as a multi-worker api server with Hypercorn.
+		The pipeline is not loaded in this process.
+		Only the config is passed to the worker processes, and each worker loads the pipeline.
+		The memory-mapped indexes, like the local vectordb, share their pages between the workers.
+
+		:param config: The pipeline config.
+		:param project_dir: The project directory.
+			Default is the current directory.
+		:param host: The host of the api server.
+		:param port: The port of the api server.
+		:param remote: Whether to expose the api server to the public internet using ngrok.
+		:param workers: The number of the server processes.
+			Default is 2.
+		:param kwargs: Other arguments for initializing the ApiRunner at each worker,
+			like max_batch_size and warmup_queries.
+		"""
+		from hypercorn.config import Config
+		from hypercorn.run import run
+
+		logger.info(f"Run api server at {host}:{port} with {workers} workers")
+		if remote:
+			open_ngrok_tunnel(port)
+		os.environ[API_RUNNER_ENV] = json.dumps(
+			{
+				"config": config,
+				"project_dir": os.getcwd() if project_dir is None else project_dir,
+				**kwargs,
+			}
+		)
+		hypercorn_config = Config()
+		hypercorn_config.bind = [f"{host}:{port}"]
+		hypercorn_config.workers = workers
+		hypercorn_config.application_path = "autorag.deploy.asgi:app"
+		run(hypercorn_config)
+
 	def extract_retrieve_passage(self, df: pd.DataFrame) -> List[RetrievedPassage]:
 		retrieved_ids: List[str] = df["retrieved_ids"].tolist()[0]
 		contents = fetch_contents(self.corpus_df, [retrieved_ids])[0]
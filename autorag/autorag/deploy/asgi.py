@@ -0,0 +1,22 @@
+import json
+import os
+
+from autorag.deploy.api import API_RUNNER_ENV, ApiRunner
+
+
+def create_app():
+	"""
+	Create the Quart app of the API server from the runner settings at the AUTORAG_API_RUNNER environment variable.
+	Each worker process of the multi-worker server loads the pipeline with it.
+	"""
+	if API_RUNNER_ENV not in os.environ:
+		raise ValueError(
+			f"{API_RUNNER_ENV} environment variable is not set. "
+			"Use ApiRunner.run_api_server with workers to run the multi-worker API server."
+		)
+	settings = json.loads(os.environ[API_RUNNER_ENV])
+	runner = ApiRunner(settings.pop("config"), **settings)
+	return runner.app
+
+
+app = create_app()
@@ -1,18 +1,30 @@
 import logging
 import os
 import pathlib
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Any
 
 import pandas as pd
 import yaml
 
+import autorag
 from autorag.support import get_support_modules
+from autorag.utils.corpus import (
+	CORPUS_TABLE_NAME,
+	get_corpus_path,
+	load_corpus_data,
+	save_corpus_table,
+)
 from autorag.utils.util import load_summary_file, load_yaml_config
 
 logger = logging.getLogger("AutoRAG")
 
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_META_FILE = "snapshot.yaml"
+
 
 def extract_node_line_names(config_dict: Dict) -> List[str]:
 	"""
@@ -145,15 +157,98 @@ def extract_vectordb_config(trial_path: str) -> List[Dict]:
 	]
 
 
+def make_pipeline_context(queries: List[str]) -> Dict[str, List[Any]]:
+	"""
+	Make the record-based pipeline context of the queries for the online inference.
+	The context is the dictionary of the column names and the values of each row,
+	and it starts with the pseudo qa data for the execution.
+
+	:param queries: The queries of the users.
+	:return: The pipeline context.
+	"""
+	return {
+		"qid": [str(uuid.uuid4()) for _ in queries],
+		"query": list(queries),
+		"retrieval_gt": [[] for _ in queries],
+		"generation_gt": ["" for _ in queries],
+	}
+
+
+def run_module_with_context(
+	module_instance, module_param: Dict, context: Dict[str, List[Any]]
+) -> Dict[str, List[Any]]:
+	"""
+	Run the module with the record-based pipeline context.
+	The module gets the context as a dataframe, but its result does not make a dataframe.
+	The raw result lists of the module update the context columns,
+	so there is no concat and drop of the dataframes between the modules.
+
+	:param module_instance: The module instance.
+	:param module_param: The module parameters.
+	:param context: The pipeline context from make_pipeline_context.
+	:return: The new pipeline context that has the module result columns.
+	"""
+	previous_result = pd.DataFrame(context)
+	pure = type(module_instance).pure
+	result_columns = getattr(pure, "result_columns", None)
+	if result_columns is None or not hasattr(pure, "__wrapped__"):
+		new_result = module_instance.pure(
+			previous_result=previous_result, **module_param
+		)
+		return {**context, **new_result.to_dict("list")}
+	results = pure.__wrapped__(
+		module_instance, previous_result=previous_result, **module_param
+	)
+	if len(result_columns) == 1:
+		results = [results]
+	return {
+		**context,
+		**{column: list(result) for column, result in zip(result_columns, results)},
+	}
+
+
+def iter_module_instances(module_instances: List[Any]):
+	"""
+	Iterate the module instances and the inner modules of them, like the target modules of the hybrid retrieval.
+	"""
+	for module_instance in module_instances:
+		yield module_instance
+		yield from iter_module_instances(getattr(module_instance, "target_modules", []))
+
+
 class BaseRunner:
-	def __init__(self, config: Dict, project_dir: Optional[str] = None):
+	# whether to run the warmup queries at the end of __init__
+	warmup_on_init: bool = True
+
+	def __init__(
+		self,
+		config: Dict,
+		project_dir: Optional[str] = None,
+		load_workers: Optional[int] = None,
+		warmup_queries: Optional[List[str]] = None,
+	):
+		"""
+		Initialize the runner and load the modules of the pipeline.
+		The modules are loaded in parallel threads, so the models and the indexes load at the same time.
+
+		:param config: The pipeline config.
+		:param project_dir: The project directory.
+			Default is the current directory.
+		:param load_workers: The number of the threads that load the modules.
+			Default is None, which follows the default of ThreadPoolExecutor.
+		:param warmup_queries: The synthetic queries that run through each module after loading,
+			so the first requests do not hit the cold caches and the kernel compilation.
+			Default is None, which does not warm up.
+		"""
 		self.config = config
 		project_dir = os.getcwd() if project_dir is None else project_dir
+		self.project_dir = project_dir
 		os.environ["PROJECT_DIR"] = project_dir
+		self.warmup_queries = warmup_queries
 
 		# init modules
 		node_lines = deepcopy(self.config["node_lines"])
-		self.module_instances = []
+		self.module_types = []
 		self.module_params = []
 		for node_line in node_lines:
 			for node in node_line["nodes"]:
@@ -163,17 +258,94 @@ class BaseRunner:
 						"Please use extract_best_config method for extracting yaml file from evaluated trial."
 					)
 				module = node["modules"][0]
-				module_type = module.pop("module_type")
-				module_params = module
-				module_instance = get_support_modules(module_type)(
-					project_dir=project_dir,
-					**module_params,
-				)
-				self.module_instances.append(module_instance)
-				self.module_params.append(module_params)
+				self.module_types.append(module.pop("module_type"))
+				self.module_params.append(module)
+
+		def load_module(module_type: str, module_params: Dict):
+			start_time = time.perf_counter()
+			module_instance = get_support_modules(module_type)(
+				project_dir=project_dir,
+				**module_params,
+			)
+			return module_instance, time.perf_counter() - start_time
+
+		with ThreadPoolExecutor(
+			max_workers=load_workers, thread_name_prefix="autorag-load"
+		) as executor:
+			loaded = list(
+				executor.map(load_module, self.module_types, self.module_params)
+			)
+		self.module_instances = [module_instance for module_instance, _ in loaded]
+		self.module_load_times = [load_time for _, load_time in loaded]
+		self.module_warmup_times: List[Optional[float]] = [None] * len(loaded)
+		for module_type, load_time in zip(self.module_types, self.module_load_times):
+			logger.info(f"Loaded {module_type} module in {load_time:.2f} seconds.")
+
+		if warmup_queries and self.warmup_on_init:
+			self.warmup(warmup_queries)
+
+	def _run_module(
+		self, module_index: int, context: Dict[str, List[Any]]
+	) -> Dict[str, List[Any]]:
+		return run_module_with_context(
+			self.module_instances[module_index],
+			self.module_params[module_index],
+			context,
+		)
+
+	def warmup(self, queries: List[str]):
+		"""
+		Run the synthetic queries through each module of the pipeline,
+		and record the warmup time of each module.
+
+		:param queries: The warmup queries.
+		"""
+		context = make_pipeline_context(queries)
+		for i, module_type in enumerate(self.module_types):
+			start_time = time.perf_counter()
+			context = self._run_module(i, context)
+			self.module_warmup_times[i] = time.perf_counter() - start_time
+			logger.info(
+				f"Warmed up {module_type} module in {self.module_warmup_times[i]:.2f} seconds."
+			)
+
+	def get_module_status(self) -> List[Dict[str, Any]]:
+		"""
+		Get the load time and the warmup time of each module in seconds.
+		The warmup time is None when the module is not warmed up.
+		"""
+		return [
+			{
+				"module_type": module_type,
+				"load_time": load_time,
+				"warmup_time": warmup_time,
+			}
+			for module_type, load_time, warmup_time in zip(
+				self.module_types, self.module_load_times, self.module_warmup_times
+			)
+		]
+
+	def run_pipeline(
+		self,
+		context: Dict[str, List[Any]],
+		module_indices: Optional[List[int]] = None,
+	) -> Dict[str, List[Any]]:
+		"""
+		Run the modules of the pipeline with the record-based pipeline context.
+
+		:param context: The pipeline context from make_pipeline_context.
+		:param module_indices: The indices of the modules to run.
+			Default is None, which runs every module.
+		:return: The pipeline context that has the result columns of the modules.
+		"""
+		if module_indices is None:
+			module_indices = range(len(self.module_instances))
+		for i in module_indices:
+			context = self._run_module(i, context)
+		return context
 
 	@classmethod
-	def from_yaml(cls, yaml_path: str, project_dir: Optional[str] = None):
+	def from_yaml(cls, yaml_path: str, project_dir: Optional[str] = None, **kwargs):
 		"""
 		Load Runner from the YAML file.
 		Must be extracted YAML file from the evaluated trial using the extract_best_config method.
@@ -181,23 +353,114 @@ class BaseRunner:
 		:param yaml_path: The path of the YAML file.
 		:param project_dir: The path of the project directory.
 			Default is the current directory.
+		:param kwargs: Other arguments for initializing the Runner.
 		:return: Initialized Runner.
 		"""
 		config = load_yaml_config(yaml_path)
-		return cls(config, project_dir=project_dir)
+		return cls(config, project_dir=project_dir, **kwargs)
+
+	def save_snapshot(self, path: str):
+		"""
+		Save the snapshot of the loaded pipeline to the directory.
+		The snapshot has the resolved config, the corpus table that is memory-mapped without decoding,
+		the prebuilt BM25 indexes and their tokenizers, and the vectordb config.
+		Restore it with the from_snapshot method,
+		so the new replica does not read the trial summaries or re-build the BM25 index.
+		The vector stores and the model weights are not copied,
+		so the vectordb paths and the model caches must be reachable from the restored runner.
+		The default chroma vectordb of the project is linked to the snapshot.
+
+		:param path: The directory to save the snapshot.
+		"""
+		data_dir = os.path.join(path, "data")
+		resources_dir = os.path.join(path, "resources")
+		os.makedirs(data_dir, exist_ok=True)
+		os.makedirs(resources_dir, exist_ok=True)
+
+		corpus_path = get_corpus_path(os.path.join(self.project_dir, "data"))
+		if os.path.exists(corpus_path):
+			save_corpus_table(
+				load_corpus_data(corpus_path), os.path.join(data_dir, CORPUS_TABLE_NAME)
+			)
+		# the modules that have the prebuilt indexes save them to the resources
+		for module_instance in iter_module_instances(self.module_instances):
+			save_index = getattr(module_instance, "save_index", None)
+			if callable(save_index):
+				save_index(resources_dir)
+
+		vectordb_config = self.config.get("vectordb")
+		vectordb_config_path = os.path.join(
+			self.project_dir, "resources", "vectordb.yaml"
+		)
+		if vectordb_config is None and os.path.exists(vectordb_config_path):
+			vectordb_config = load_yaml_config(vectordb_config_path).get("vectordb", [])
+		with open(os.path.join(resources_dir, "vectordb.yaml"), "w") as f:
+			yaml.safe_dump({"vectordb": vectordb_config or []}, f)
+		# the default vectordb is loaded from the resources of the project directory
+		default_chroma_path = os.path.join(self.project_dir, "resources", "chroma")
+		snapshot_chroma_path = os.path.join(resources_dir, "chroma")
+		if os.path.isdir(default_chroma_path) and not os.path.lexists(
+			snapshot_chroma_path
+		):
+			os.symlink(os.path.abspath(default_chroma_path), snapshot_chroma_path)
+
+		# the meta file is written at last, so a partial snapshot is never restored
+		meta_path = os.path.join(path, SNAPSHOT_META_FILE)
+		with open(f"{meta_path}.tmp", "w") as f:
+			yaml.safe_dump(
+				{
+					"format_version": SNAPSHOT_FORMAT_VERSION,
+					"autorag_version": autorag.__version__,
+					"created_at": time.time(),
+					"project_dir": os.path.abspath(self.project_dir),
+					"config": self.config,
+				},
+				f,
+			)
+		os.replace(f"{meta_path}.tmp", meta_path)
+		logger.info(f"Saved the runner snapshot to {path}.")
 
 	@classmethod
-	def from_trial_folder(cls, trial_path: str):
+	def from_snapshot(cls, path: str, **kwargs):
+		"""
+		Load Runner from the snapshot that is saved by the save_snapshot method.
+		The snapshot directory is the project directory of the runner,
+		so the corpus table and the BM25 indexes are memory-mapped from it.
+
+		:param path: The snapshot directory.
+		:param kwargs: Other arguments for initializing the Runner.
+		:return: Initialized Runner.
+		"""
+		meta_path = os.path.join(path, SNAPSHOT_META_FILE)
+		if not os.path.exists(meta_path):
+			raise ValueError(f"{SNAPSHOT_META_FILE} does not exist in {path}.")
+		with open(meta_path, "r") as f:
+			meta = yaml.safe_load(f)
+		if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+			raise ValueError(
+				f"Snapshot format version {meta.get('format_version')} is not supported. "
+				f"Supported version is {SNAPSHOT_FORMAT_VERSION}. Please save the snapshot again."
+			)
+		if meta.get("autorag_version") != autorag.__version__:
+			logger.warning(
+				f"The snapshot is saved with AutoRAG {meta.get('autorag_version')}, "
+				f"but the current version is {autorag.__version__}."
+			)
+		return cls(meta["config"], project_dir=path, **kwargs)
+
+	@classmethod
+	def from_trial_folder(cls, trial_path: str, **kwargs):
 		"""
 		Load Runner from the evaluated trial folder.
 		Must already be evaluated using Evaluator class.
 		It sets the project_dir as the parent directory of the trial folder.
 
 		:param trial_path: The path of the trial folder.
+		:param kwargs: Other arguments for initializing the Runner.
 		:return: Initialized Runner.
 		"""
 		config = extract_best_config(trial_path)
-		return cls(config, project_dir=os.path.dirname(trial_path))
+		return cls(config, project_dir=os.path.dirname(trial_path), **kwargs)
 
 
 class Runner(BaseRunner):
@@ -212,24 +475,5 @@ class Runner(BaseRunner):
 		    Default is `generated_texts`, which is the output of the `generation` module.
 		:return: The result of the pipeline.
 		"""
-		previous_result = pd.DataFrame(
-			{
-				"qid": str(uuid.uuid4()),
-				"query": [query],
-				"retrieval_gt": [[]],
-				"generation_gt": [""],
-			}
-		)  # pseudo qa data for execution
-		for module_instance, module_param in zip(
-			self.module_instances, self.module_params
-		):
-			new_result = module_instance.pure(
-				previous_result=previous_result, **module_param
-			)
-			duplicated_columns = previous_result.columns.intersection(
-				new_result.columns
-			)
-			drop_previous_result = previous_result.drop(columns=duplicated_columns)
-			previous_result = pd.concat([drop_previous_result, new_result], axis=1)
-
-		return previous_result[result_column].tolist()[0]
+		context = self.run_pipeline(make_pipeline_context([query]))
+		return context[result_column][0]
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+from typing import Callable, Awaitable, List, Tuple, Optional
+
+import pandas as pd
+
+logger = logging.getLogger("AutoRAG")
+
+
+class MicroBatcher:
+	"""
+	Collect the concurrent requests in a small time window and run them at once.
+	The rows of the requests are stacked to one dataframe, and each pipeline stage runs once on it.
+	The result rows are scattered back to each request in order.
+	"""
+
+	def __init__(
+		self,
+		run_batch: Callable[[pd.DataFrame], Awaitable[pd.DataFrame]],
+		max_batch_size: int = 32,
+		max_wait_ms: float = 10.0,
+	):
+		"""
+		:param run_batch: The async function that runs the stacked dataframe.
+			It must return the result dataframe that has the same number of rows in the same order.
+		:param max_batch_size: The maximum number of rows in a batch.
+			Default is 32.
+		:param max_wait_ms: The maximum milliseconds that the first request waits for the other requests.
+			Default is 10.
+		"""
+		if max_batch_size < 1:
+			raise ValueError("max_batch_size must be at least 1.")
+		self.run_batch = run_batch
+		self.max_batch_size = max_batch_size
+		self.max_wait_ms = max_wait_ms
+		self._pending: List[Tuple[pd.DataFrame, asyncio.Future]] = []
+		self._pending_rows = 0
+		self._timer: Optional[asyncio.TimerHandle] = None
+		self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+	async def run(self, rows: pd.DataFrame) -> pd.DataFrame:
+		"""
+		Run the rows with the other concurrent requests.
+
+		:param rows: The dataframe of the request.
+		:return: The result rows of the request.
+		"""
+		loop = asyncio.get_running_loop()
+		if self._loop is not loop:
+			# the pending requests of the other event loop never finish, so start over
+			self._loop = loop
+			self._pending = []
+			self._pending_rows = 0
+			self._timer = None
+		future = loop.create_future()
+		self._pending.append((rows, future))
+		self._pending_rows += len(rows)
+		if self._pending_rows >= self.max_batch_size:
+			self._flush()
+		elif self._timer is None:
+			self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+		return await future
+
+	def _flush(self):
+		if self._timer is not None:
+			self._timer.cancel()
+			self._timer = None
+		while self._pending:
+			batch, batch_rows = [], 0
+			while self._pending and (
+				not batch
+				or batch_rows + len(self._pending[0][0]) <= self.max_batch_size
+			):
+				rows, future = self._pending.pop(0)
+				batch.append((rows, future))
+				batch_rows += len(rows)
+			self._pending_rows -= batch_rows
+			self._loop.create_task(self._run(batch))
+			if self._pending_rows < self.max_batch_size:
+				break
+		if self._pending:
+			self._timer = self._loop.call_later(self.max_wait_ms / 1000, self._flush)
+
+	async def _run(self, batch: List[Tuple[pd.DataFrame, asyncio.Future]]):
+		try:
+			result = await self.run_batch(
+				pd.concat([rows for rows, _ in batch], ignore_index=True)
+			)
+		except Exception as e:
+			if len(batch) == 1:
+				if not batch[0][1].done():
+					batch[0][1].set_exception(e)
+				return
+			# one bad request must not fail the others, so run them one by one
+			logger.warning(
+				f"Failed to run a batch of {len(batch)} requests, so run them one by one: {e}"
+			)
+			await asyncio.gather(*[self._run([item]) for item in batch])
+			return
+		start = 0
+		for rows, future in batch:
+			end = start + len(rows)
+			if not future.done():
+				future.set_result(result.iloc[start:end].reset_index(drop=True))
+			start = end
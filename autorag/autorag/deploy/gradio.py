@@ -1,9 +1,6 @@
 import logging
-import uuid
 
-import pandas as pd
-
-from autorag.deploy.base import BaseRunner
+from autorag.deploy.base import BaseRunner, make_pipeline_context
 
 import gradio as gr
 
@@ -51,24 +48,5 @@ class GradioRunner(BaseRunner):
 		    Default is `generated_texts`, which is the output of the `generation` module.
 		:return: The result of the pipeline.
 		"""
-		previous_result = pd.DataFrame(
-			{
-				"qid": str(uuid.uuid4()),
-				"query": [query],
-				"retrieval_gt": [[]],
-				"generation_gt": [""],
-			}
-		)  # pseudo qa data for execution
-		for module_instance, module_param in zip(
-			self.module_instances, self.module_params
-		):
-			new_result = module_instance.pure(
-				previous_result=previous_result, **module_param
-			)
-			duplicated_columns = previous_result.columns.intersection(
-				new_result.columns
-			)
-			drop_previous_result = previous_result.drop(columns=duplicated_columns)
-			previous_result = pd.concat([drop_previous_result, new_result], axis=1)
-
-		return previous_result[result_column].tolist()[0]
+		context = self.run_pipeline(make_pipeline_context([query]))
+		return context[result_column][0]
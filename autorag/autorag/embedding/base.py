@@ -1,9 +1,12 @@
 import logging
 import sys
+import threading
+import weakref
 
 from random import random
 from typing import List, Union, Dict
 
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.embeddings.mock_embed_model import MockEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.embeddings.openai import OpenAIEmbeddingModelType
@@ -11,6 +14,7 @@ from llama_index.embeddings.ollama import OllamaEmbedding
 from langchain_openai.embeddings import OpenAIEmbeddings
 
 from autorag import LazyInit
+from autorag.embedding.cache import get_cached_embedding_class
 
 logger = logging.getLogger("AutoRAG")
 
@@ -67,17 +71,57 @@ except ImportError:
 	)
 
 
+_cached_lazy_inits: "weakref.WeakKeyDictionary[LazyInit, LazyInit]" = (
+	weakref.WeakKeyDictionary()
+)
+_cached_lazy_inits_lock = threading.Lock()
+
+
+def with_embedding_cache(lazy_init: LazyInit) -> LazyInit:
+	"""
+	Make the LazyInit of the embedding model to use the embedding cache.
+	The cached model is the subclass of the original llama index embedding class.
+	The same LazyInit results in the same cached LazyInit,
+	so the embedding model is still initialized once.
+	The LazyInit that is not llama index embedding model (like langchain) is returned as it is.
+
+	:param lazy_init: The LazyInit of the embedding model.
+	:return: The LazyInit of the cached embedding model.
+	"""
+	factory = lazy_init._factory
+	if not (isinstance(factory, type) and issubclass(factory, BaseEmbedding)):
+		return lazy_init
+	with _cached_lazy_inits_lock:
+		if lazy_init not in _cached_lazy_inits:
+			_cached_lazy_inits[lazy_init] = LazyInit(
+				get_cached_embedding_class(factory),
+				*lazy_init._args,
+				**lazy_init._kwargs,
+			)
+		return _cached_lazy_inits[lazy_init]
+
+
 class EmbeddingModel:
 	@staticmethod
 	def load(config: Union[str, Dict, List[Dict]]):
+		"""
+		Load the embedding model from the config.
+		The loaded llama index embedding model uses the embedding cache,
+		when the embedding cache directory is set.
+		Check autorag.embedding.cache.get_embedding_cache_dir for more information.
+
+		:param config: The embedding model name or the config dictionary.
+		:return: The LazyInit of the embedding model.
+		"""
 		if isinstance(config, str):
-			return EmbeddingModel.load_from_str(config)
+			lazy_init = EmbeddingModel.load_from_str(config)
 		elif isinstance(config, dict):
-			return EmbeddingModel.load_from_dict(config)
+			lazy_init = EmbeddingModel.load_from_dict(config)
 		elif isinstance(config, list):
-			return EmbeddingModel.load_from_list(config)
+			lazy_init = EmbeddingModel.load_from_list(config)
 		else:
 			raise ValueError("Invalid type of config")
+		return with_embedding_cache(lazy_init)
 
 	@staticmethod
 	def load_from_str(name: str):
@@ -0,0 +1,393 @@
+import atexit
+import functools
+import hashlib
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import List, Optional, Dict, Tuple, Any
+
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+
+logger = logging.getLogger("AutoRAG")
+
+EMBEDDING_CACHE_MAX_BYTES = 2 * 1024**3
+EMBEDDING_CACHE_FLUSH_SIZE = 1000
+EMBEDDING_CACHE_MAX_SEGMENTS = 8
+# the model fields that change the embedding result
+EMBEDDING_MODEL_KEY_FIELDS = [
+	"model_name",
+	"model",
+	"dimensions",
+	"embed_dim",
+	"query_instruction",
+	"text_instruction",
+	"normalize",
+	"api_base",
+	"base_url",
+]
+
+_embedding_caches: Dict[Tuple[str, str], "EmbeddingCache"] = {}
+_embedding_caches_lock = threading.Lock()
+
+
+class EmbeddingCache:
+	def __init__(
+		self,
+		cache_dir: str,
+		model_key: str,
+		max_bytes: int = EMBEDDING_CACHE_MAX_BYTES,
+	):
+		"""
+		The persistent content-addressed embedding cache of one embedding model.
+		The embeddings are saved at the segment files in the cache directory.
+		Each segment is a float64 matrix ``.npy`` file and the sha256 key ``.keys.npy`` file.
+		The segments are read with the memory map, and the key index is built at the first use.
+		The new embeddings are written as a new segment when there are enough of them,
+		and the segments are merged when there are too many segments or the cache is too big.
+		At the merge, the least recently used embeddings are evicted.
+
+		:param cache_dir: The cache directory of this embedding model.
+		:param model_key: The key string of the embedding model.
+		:param max_bytes: The maximum size of the saved embeddings in bytes.
+		"""
+		self.cache_dir = cache_dir
+		self.model_key = model_key
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self._lock = threading.RLock()
+		self._segments: Dict[str, np.ndarray] = {}
+		self._index: Optional[Dict[str, Tuple[str, int]]] = None
+		self._pending: Dict[str, np.ndarray] = {}
+		self._last_used: Dict[str, int] = {}
+		self._clock = 0
+
+	@staticmethod
+	def make_key(kind: str, text: str) -> str:
+		return hashlib.sha256(f"{kind}\0{text}".encode("utf-8")).hexdigest()
+
+	def _load(self):
+		if self._index is not None:
+			return
+		self._index = {}
+		if not os.path.isdir(self.cache_dir):
+			return
+		for filename in sorted(os.listdir(self.cache_dir)):
+			if not filename.endswith(".keys.npy"):
+				continue
+			name = filename[: -len(".keys.npy")]
+			try:
+				keys = np.load(os.path.join(self.cache_dir, filename))
+				vectors = np.load(
+					os.path.join(self.cache_dir, f"{name}.npy"), mmap_mode="r"
+				)
+			except (OSError, ValueError):
+				logger.warning(f"Skip the broken embedding cache segment {name}.")
+				continue
+			self._segments[name] = vectors
+			for row, key in enumerate(keys.tolist()):
+				self._index[key] = (name, row)
+
+	def get(self, kind: str, texts: List[str]) -> List[Optional[List[float]]]:
+		"""
+		Get the cached embeddings of the texts.
+
+		:param kind: The kind of the embedding, like "text" or "query".
+		:param texts: The texts to get the embeddings.
+		:return: The embedding of each text. It is None when the text is not in the cache.
+		"""
+		with self._lock:
+			self._load()
+			result = []
+			for text in texts:
+				key = self.make_key(kind, text)
+				if key in self._pending:
+					vector = self._pending[key]
+				elif key in self._index:
+					name, row = self._index[key]
+					vector = self._segments[name][row]
+				else:
+					self.misses += 1
+					result.append(None)
+					continue
+				self.hits += 1
+				self._clock += 1
+				self._last_used[key] = self._clock
+				result.append(vector.tolist())
+			return result
+
+	def put(self, kind: str, texts: List[str], embeddings: List[List[float]]):
+		"""
+		Put the embeddings of the texts to the cache.
+
+		:param kind: The kind of the embedding, like "text" or "query".
+		:param texts: The texts of the embeddings.
+		:param embeddings: The embedding of each text.
+		"""
+		with self._lock:
+			for text, embedding in zip(texts, embeddings):
+				key = self.make_key(kind, text)
+				self._clock += 1
+				self._last_used[key] = self._clock
+				self._pending[key] = np.asarray(embedding, dtype=np.float64)
+			if len(self._pending) >= EMBEDDING_CACHE_FLUSH_SIZE:
+				self.flush()
+
+	def flush(self):
+		"""
+		Write the new embeddings to a new segment.
+		"""
+		with self._lock:
+			if not self._pending:
+				return
+			self._load()
+			os.makedirs(self.cache_dir, exist_ok=True)
+			model_path = os.path.join(self.cache_dir, "model.json")
+			if not os.path.exists(model_path):
+				with open(model_path, "w") as f:
+					json.dump({"model_key": self.model_key}, f)
+
+			keys = list(self._pending.keys())
+			vectors = np.stack(list(self._pending.values()))
+			name = self._write_segment(keys, vectors)
+			for row, key in enumerate(keys):
+				self._index[key] = (name, row)
+			self._pending = {}
+
+			total_bytes = sum(segment.nbytes for segment in self._segments.values())
+			if (
+				len(self._segments) > EMBEDDING_CACHE_MAX_SEGMENTS
+				or total_bytes > self.max_bytes
+			):
+				self._compact()
+
+	def _write_segment(self, keys: List[str], vectors: np.ndarray) -> str:
+		name = uuid.uuid4().hex
+		# the keys file is renamed at last, so a segment without keys file is not read
+		for suffix, array in [(".npy", vectors), (".keys.npy", np.array(keys))]:
+			tmp_path = os.path.join(self.cache_dir, f".{name}{suffix}.tmp")
+			with open(tmp_path, "wb") as f:
+				np.save(f, array)
+			os.replace(tmp_path, os.path.join(self.cache_dir, f"{name}{suffix}"))
+		self._segments[name] = np.load(
+			os.path.join(self.cache_dir, f"{name}.npy"), mmap_mode="r"
+		)
+		return name
+
+	def _compact(self):
+		# keep the most recently used embeddings, the older segments are evicted first
+		keys = sorted(self._index.keys(), key=lambda x: self._last_used.get(x, 0))
+		if keys:
+			name, row = self._index[keys[0]]
+			max_size = self.max_bytes // self._segments[name][row].nbytes
+			keys = keys[max(0, len(keys) - max_size) :]
+		vectors = np.stack(
+			[self._segments[name][row] for name, row in map(self._index.get, keys)]
+		)
+		old_names = list(self._segments.keys())
+		name = self._write_segment(keys, vectors)
+		for old_name in old_names:
+			del self._segments[old_name]
+			for suffix in [".keys.npy", ".npy"]:
+				try:
+					os.remove(os.path.join(self.cache_dir, f"{old_name}{suffix}"))
+				except FileNotFoundError:
+					pass
+		self._index = {key: (name, row) for row, key in enumerate(keys)}
+		self._last_used = {
+			key: clock for key, clock in self._last_used.items() if key in self._index
+		}
+
+	def stats(self) -> Dict[str, Any]:
+		"""
+		Get the statistics of the cache.
+
+		:return: The dictionary of hits, misses, hit_rate and size (the count of cached embeddings).
+		"""
+		with self._lock:
+			self._load()
+			total = self.hits + self.misses
+			return {
+				"hits": self.hits,
+				"misses": self.misses,
+				"hit_rate": self.hits / total if total > 0 else 0.0,
+				"size": len(set(self._index.keys()) | set(self._pending.keys())),
+			}
+
+
+def get_embedding_cache_dir() -> Optional[str]:
+	"""
+	Get the embedding cache directory.
+	It is the AUTORAG_EMBEDDING_CACHE_DIR environment variable when it is set.
+	Set it to an empty string to disable the embedding cache.
+	If not, it is 'resources/embedding_cache' of the project directory (PROJECT_DIR environment variable).
+
+	:return: The embedding cache directory. None when the embedding cache is disabled.
+	"""
+	if "AUTORAG_EMBEDDING_CACHE_DIR" in os.environ:
+		return os.environ["AUTORAG_EMBEDDING_CACHE_DIR"] or None
+	project_dir = os.environ.get("PROJECT_DIR")
+	if project_dir is None or not os.path.isdir(os.path.join(project_dir, "resources")):
+		return None
+	return os.path.join(project_dir, "resources", "embedding_cache")
+
+
+def get_embedding_model_key(embedding: BaseEmbedding) -> str:
+	cls = type(embedding)
+	if issubclass(cls, CachedEmbeddingMixin):
+		cls = cls.__mro__[2]
+	fields = {
+		field: str(getattr(embedding, field))
+		for field in EMBEDDING_MODEL_KEY_FIELDS
+		if getattr(embedding, field, None) is not None
+	}
+	return json.dumps(
+		{"class": f"{cls.__module__}.{cls.__qualname__}", **fields}, sort_keys=True
+	)
+
+
+def get_embedding_cache(embedding: BaseEmbedding) -> Optional[EmbeddingCache]:
+	"""
+	Get the EmbeddingCache of the embedding model in the current embedding cache directory.
+
+	:param embedding: The embedding model instance.
+	:return: The EmbeddingCache instance. None when the embedding cache is disabled.
+	"""
+	cache_dir = get_embedding_cache_dir()
+	if cache_dir is None:
+		return None
+	model_key = get_embedding_model_key(embedding)
+	key = (os.path.abspath(cache_dir), model_key)
+	with _embedding_caches_lock:
+		if key not in _embedding_caches:
+			model_dir = hashlib.sha256(model_key.encode("utf-8")).hexdigest()[:16]
+			_embedding_caches[key] = EmbeddingCache(
+				os.path.join(cache_dir, model_dir), model_key
+			)
+		return _embedding_caches[key]
+
+
+def get_embedding_cache_stats() -> Dict[str, Dict[str, Any]]:
+	"""
+	Get the statistics of every embedding cache in this process.
+
+	:return: The dictionary of the cache directory and its statistics.
+	    The statistics have model_key, hits, misses, hit_rate and size.
+	"""
+	with _embedding_caches_lock:
+		caches = list(_embedding_caches.values())
+	return {
+		cache.cache_dir: {"model_key": cache.model_key, **cache.stats()}
+		for cache in caches
+	}
+
+
+@atexit.register
+def flush_embedding_caches():
+	"""
+	Write the new embeddings of every embedding cache to the disk.
+	"""
+	with _embedding_caches_lock:
+		caches = list(_embedding_caches.values())
+	for cache in caches:
+		try:
+			cache.flush()
+		except OSError as e:
+			logger.warning(f"Failed to save the embedding cache: {e}")
+
+
+class CachedEmbeddingMixin:
+	"""
+	The mixin that looks up the embedding cache before calling the embedding model.
+	The text embeddings and the query embeddings are cached separately.
+	"""
+
+	def _cached_embeddings(self, kind: str, texts: List[str], embed_func):
+		cache = get_embedding_cache(self)
+		if cache is None:
+			return embed_func(texts)
+		embeddings = cache.get(kind, texts)
+		missing_texts = list(
+			dict.fromkeys(
+				text for text, embedding in zip(texts, embeddings) if embedding is None
+			)
+		)
+		if missing_texts:
+			new_embeddings = dict(zip(missing_texts, embed_func(missing_texts)))
+			cache.put(kind, missing_texts, list(new_embeddings.values()))
+			embeddings = [
+				new_embeddings[text] if embedding is None else embedding
+				for text, embedding in zip(texts, embeddings)
+			]
+		return embeddings
+
+	async def _acached_embeddings(self, kind: str, texts: List[str], aembed_func):
+		cache = get_embedding_cache(self)
+		if cache is None:
+			return await aembed_func(texts)
+		embeddings = cache.get(kind, texts)
+		missing_texts = list(
+			dict.fromkeys(
+				text for text, embedding in zip(texts, embeddings) if embedding is None
+			)
+		)
+		if missing_texts:
+			new_embeddings = dict(zip(missing_texts, await aembed_func(missing_texts)))
+			cache.put(kind, missing_texts, list(new_embeddings.values()))
+			embeddings = [
+				new_embeddings[text] if embedding is None else embedding
+				for text, embedding in zip(texts, embeddings)
+			]
+		return embeddings
+
+	def get_text_embedding_batch(self, texts: List[str], *args, **kwargs):
+		return self._cached_embeddings(
+			"text",
+			texts,
+			lambda x: super(CachedEmbeddingMixin, self).get_text_embedding_batch(
+				x, *args, **kwargs
+			),
+		)
+
+	async def aget_text_embedding_batch(self, texts: List[str], *args, **kwargs):
+		return await self._acached_embeddings(
+			"text",
+			texts,
+			lambda x: super(CachedEmbeddingMixin, self).aget_text_embedding_batch(
+				x, *args, **kwargs
+			),
+		)
+
+	def get_text_embedding(self, text: str):
+		return self._cached_embeddings(
+			"text",
+			[text],
+			lambda x: [super(CachedEmbeddingMixin, self).get_text_embedding(x[0])],
+		)[0]
+
+	def get_query_embedding(self, query: str):
+		return self._cached_embeddings(
+			"query",
+			[query],
+			lambda x: [super(CachedEmbeddingMixin, self).get_query_embedding(x[0])],
+		)[0]
+
+
+@functools.lru_cache(maxsize=None)
+def get_cached_embedding_class(embedding_class: type) -> type:
+	"""
+	Get the subclass of the embedding class that uses the embedding cache.
+	The subclass is still an instance of the original class,
+	so it can be used everywhere the original class is used.
+
+	:param embedding_class: The llama index embedding class.
+	:return: The cached embedding class.
+	"""
+	return type(
+		f"Cached{embedding_class.__name__}",
+		(CachedEmbeddingMixin, embedding_class),
+		{"__module__": embedding_class.__module__},
+	)
@@ -1,4 +1,5 @@
 import asyncio
+import functools
 import itertools
 import os
 from typing import List, Optional
@@ -6,9 +7,11 @@ from typing import List, Optional
 import evaluate
 import nltk
 import pandas as pd
+import tiktoken
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 from openai import AsyncOpenAI
+from openai.types.chat import ChatCompletion
 from pydantic import BaseModel
 from rouge_score import tokenizers
 from rouge_score.rouge_scorer import RougeScorer
@@ -18,12 +21,15 @@ from autorag.embedding.base import embedding_models
 from autorag.evaluation.metric.deepeval_prompt import FaithfulnessTemplate
 from autorag.evaluation.metric.util import (
 	autorag_metric_loop,
-	calculate_cosine_similarity,
+	calculate_cosine_similarity_groups,
 )
 from autorag.nodes.generator import OpenAILLM
+from autorag.nodes.generator.openai_llm import make_openai_client, run_openai_request
 from autorag.nodes.generator.base import BaseGenerator
 from autorag.schema.metricinput import MetricInput
 from autorag.support import get_support_modules
+from autorag.utils.llm_cache import acached_llm_call
+from autorag.utils.rate_limit import AdaptiveRateLimiter
 from autorag.utils.util import (
 	get_event_loop,
 	process_batch,
@@ -358,12 +364,10 @@ def sem_score(
 		list(itertools.islice(iterator, length)) for length in gt_lengths
 	]
 
-	result = []
-	for gt, pred in zip(embedded_gt, embedded_pred):
-		similarity_scores: List[float] = list(
-			map(lambda x: calculate_cosine_similarity(x, pred), gt)
-		)
-		result.append(max(similarity_scores))
+	similarity_scores: List[List[float]] = calculate_cosine_similarity_groups(
+		embedded_pred, embedded_gt
+	)
+	result = list(map(max, similarity_scores))
 
 	del embedding_model
 	empty_cuda_cache()
@@ -389,15 +393,17 @@ def g_eval(
 	    Default is all metrics, which is ['coherence', 'consistency', 'fluency', 'relevance'].
 	:param model: OpenAI model name.
 	    Default is 'gpt-4-0125-preview'.
-	:param batch_size: The batch size for processing.
+	:param batch_size: The maximum number of the rows that are evaluated at once.
+	    The OpenAI calls are scheduled by the rate limiter shared with every caller of the model.
 	    Default is 8.
 	:return: G-Eval score.
 	"""
 	generations = [metric_input.generated_texts for metric_input in metric_inputs]
 	generation_gt = [metric_input.generation_gt for metric_input in metric_inputs]
 	loop = get_event_loop()
+	client, rate_limiter = make_openai_client(model)
 	tasks = [
-		async_g_eval(gt, pred, metrics, model)
+		async_g_eval(gt, pred, metrics, model, client, rate_limiter)
 		for gt, pred in zip(generation_gt, generations)
 	]
 	result = loop.run_until_complete(process_batch(tasks, batch_size=batch_size))
@@ -409,6 +415,8 @@ async def async_g_eval(
 	pred: str,
 	metrics: Optional[List[str]] = None,
 	model: str = "gpt-4-0125-preview",
+	client: Optional[AsyncOpenAI] = None,
+	rate_limiter: Optional[AdaptiveRateLimiter] = None,
 ) -> float:
 	available_metrics = ["coherence", "consistency", "fluency", "relevance"]
 	if metrics is None:
@@ -426,7 +434,12 @@ async def async_g_eval(
 		"relevance": open(os.path.join(prompt_path, "rel_detailed.txt")).read(),
 	}
 
-	client = AsyncOpenAI()
+	if client is None or rate_limiter is None:
+		client, rate_limiter = make_openai_client(model)
+	try:
+		tokenizer = tiktoken.encoding_for_model(model)
+	except KeyError:
+		tokenizer = tiktoken.get_encoding("o200k_base")
 
 	async def g_eval_score(prompt: str, gen_gt: List[str], pred: str):
 		scores = []
@@ -434,17 +447,38 @@ async def async_g_eval(
 			input_prompt = prompt.replace("{{Document}}", gt).replace(
 				"{{Summary}}", pred
 			)
-			response = await client.chat.completions.create(
-				model=model,
-				messages=[{"role": "system", "content": input_prompt}],
-				logprobs=True,
-				top_logprobs=5,
-				temperature=0,
-				max_tokens=2,
-				frequency_penalty=0,
-				presence_penalty=0,
-				stop=None,
-				n=20,
+			# two completion tokens for each of the 20 choices
+			token_count = (
+				len(tokenizer.encode(input_prompt, allowed_special="all")) + 2 * 20
+			)
+			chat_params = {
+				"logprobs": True,
+				"top_logprobs": 5,
+				"temperature": 0,
+				"max_tokens": 2,
+				"frequency_penalty": 0,
+				"presence_penalty": 0,
+				"stop": None,
+				"n": 20,
+			}
+			response = await acached_llm_call(
+				{"model": model, "base_url": str(client.base_url)},
+				input_prompt,
+				chat_params,
+				chat_params["temperature"],
+				functools.partial(
+					run_openai_request,
+					rate_limiter,
+					functools.partial(
+						client.chat.completions.create,
+						model=model,
+						messages=[{"role": "system", "content": input_prompt}],
+						**chat_params,
+					),
+					token_count,
+				),
+				dump=lambda x: x.model_dump(mode="json"),
+				load=ChatCompletion.model_validate,
 			)
 			if "(1-3):" in prompt:
 				scores.append(get_g_eval_score(response, max_score=3))
@@ -1,5 +1,6 @@
 import functools
-from typing import List
+import itertools
+from typing import List, Sequence
 
 import numpy as np
 
@@ -23,6 +24,114 @@ def calculate_inner_product(a, b):
 	return np.dot(a, b)
 
 
+def to_embedding_matrix(
+	embeddings: Sequence[Sequence[float]], dtype=np.float32
+) -> np.ndarray:
+	"""
+	Stack the embeddings to the 2D matrix shaped (embedding count, embedding dimension).
+
+	:param embeddings: The list of embeddings.
+	:param dtype: The dtype of the matrix. Default is float32.
+	:return: The embedding matrix.
+	"""
+	if len(embeddings) == 0:
+		return np.empty((0, 0), dtype=dtype)
+	return np.asarray(embeddings, dtype=dtype).reshape(len(embeddings), -1)
+
+
+def normalize_embedding_matrix(matrix: np.ndarray) -> np.ndarray:
+	"""
+	Normalize each row of the embedding matrix to the unit length.
+	Normalize once and reuse it when you compute the cosine similarity many times.
+
+	:param matrix: The embedding matrix.
+	:return: The normalized embedding matrix. The zero vector rows become NaN.
+	"""
+	norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+	with np.errstate(divide="ignore", invalid="ignore"):
+		return matrix / norms
+
+
+def calculate_cosine_similarity_matrix(
+	a: np.ndarray, b: np.ndarray, normalized: bool = False
+) -> np.ndarray:
+	"""
+	Calculate the cosine similarity of every row pair of the two embedding matrices with one matrix multiplication.
+
+	:param a: The embedding matrix shaped (n, dimension).
+	:param b: The embedding matrix shaped (m, dimension).
+	:param normalized: Whether a and b are already normalized with normalize_embedding_matrix.
+	    Default is False.
+	:return: The cosine similarity matrix shaped (n, m).
+	"""
+	if not normalized:
+		a, b = normalize_embedding_matrix(a), normalize_embedding_matrix(b)
+	return a @ b.T
+
+
+def calculate_inner_product_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+	"""
+	Calculate the inner product of every row pair of the two embedding matrices with one matrix multiplication.
+
+	:param a: The embedding matrix shaped (n, dimension).
+	:param b: The embedding matrix shaped (m, dimension).
+	:return: The inner product matrix shaped (n, m).
+	"""
+	return a @ b.T
+
+
+def calculate_l2_distance_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+	"""
+	Calculate the l2 distance of every row pair of the two embedding matrices with one matrix multiplication.
+	It uses ||a - b||^2 = ||a||^2 + ||b||^2 - 2ab.
+	The expansion is computed in float64, because it loses the precision of the close vectors at float32.
+
+	:param a: The embedding matrix shaped (n, dimension).
+	:param b: The embedding matrix shaped (m, dimension).
+	:return: The l2 distance matrix shaped (n, m).
+	"""
+	a, b = a.astype(np.float64), b.astype(np.float64)
+	squared = (
+		np.einsum("ij,ij->i", a, a)[:, None]
+		+ np.einsum("ij,ij->i", b, b)[None, :]
+		- 2 * (a @ b.T)
+	)
+	return np.sqrt(np.maximum(squared, 0.0))
+
+
+def calculate_cosine_similarity_groups(
+	query_embeddings: Sequence[Sequence[float]],
+	content_embeddings_list: Sequence[Sequence[Sequence[float]]],
+	dtype=np.float32,
+) -> List[List[float]]:
+	"""
+	Calculate the cosine similarity between each query and its own contents.
+	All contents are stacked and normalized once,
+	and the similarities of all groups are computed at once.
+
+	:param query_embeddings: The embedding of each query.
+	:param content_embeddings_list: The list of the content embeddings of each query.
+	:param dtype: The dtype of the embedding matrices. Default is float32.
+	:return: The list of the cosine similarities of the contents of each query.
+	"""
+	assert len(query_embeddings) == len(
+		content_embeddings_list
+	), "query_embeddings and content_embeddings_list must have same length."
+	content_lengths = list(map(len, content_embeddings_list))
+	if sum(content_lengths) == 0:
+		return [[] for _ in content_lengths]
+	queries = normalize_embedding_matrix(to_embedding_matrix(query_embeddings, dtype))
+	contents = normalize_embedding_matrix(
+		to_embedding_matrix(
+			list(itertools.chain.from_iterable(content_embeddings_list)), dtype
+		)
+	)
+	query_indices = np.repeat(np.arange(len(content_lengths)), content_lengths)
+	similarities = np.einsum("ij,ij->i", queries[query_indices], contents).tolist()
+	iterator = iter(similarities)
+	return [list(itertools.islice(iterator, length)) for length in content_lengths]
+
+
 def autorag_metric(fields_to_check: List[str]):
 	def decorator_autorag_metric(func):
 		@functools.wraps(func)
@@ -1,6 +1,6 @@
 import functools
 import warnings
-from typing import List, Callable, Any, Tuple, Union, Dict
+from typing import List, Callable, Any, Tuple, Union, Dict, Optional
 
 import pandas as pd
 
@@ -12,6 +12,7 @@ from autorag.evaluation.metric import (
 	retrieval_mrr,
 	retrieval_map,
 )
+from autorag.evaluation.metric.retrieval import RetrievalMetricBatch
 from autorag.evaluation.util import cast_metrics
 from autorag.schema.metricinput import MetricInput
 
@@ -49,25 +50,9 @@ def evaluate_retrieval(
 		@functools.wraps(func)
 		def wrapper(*args, **kwargs) -> pd.DataFrame:
 			contents, pred_ids, scores = func(*args, **kwargs)
-			for metric_input, pred_id in zip(metric_inputs, pred_ids):
-				metric_input.retrieved_ids = pred_id
-
-			metric_scores = {}
-			metric_names, metric_params = cast_metrics(metrics)
-
-			for metric_name, metric_param in zip(metric_names, metric_params):
-				if metric_name in RETRIEVAL_METRIC_FUNC_DICT:
-					metric_func = RETRIEVAL_METRIC_FUNC_DICT[metric_name]
-					metric_scores[metric_name] = metric_func(
-						metric_inputs=metric_inputs, **metric_param
-					)
-				else:
-					warnings.warn(
-						f"metric {metric_name} is not in supported metrics: {RETRIEVAL_METRIC_FUNC_DICT.keys()}"
-						f"{metric_name} will be ignored."
-					)
-
-			metric_result_df = pd.DataFrame(metric_scores)
+			metric_result_df = compute_retrieval_metrics(
+				metric_inputs, pred_ids, metrics
+			)
 			execution_result_df = pd.DataFrame(
 				{
 					"retrieved_contents": contents,
@@ -81,3 +66,56 @@ def evaluate_retrieval(
 		return wrapper
 
 	return decorator_evaluate_retrieval
+
+
+def compute_retrieval_metrics(
+	metric_inputs: List[MetricInput],
+	retrieved_ids: List[List[str]],
+	metrics: Union[List[str], List[Dict]],
+	metric_batch: Optional[RetrievalMetricBatch] = None,
+) -> pd.DataFrame:
+	"""
+	Compute the retrieval metrics of the retrieved ids.
+	It only needs the retrieved ids, so you can evaluate retrieval results without fetching the contents.
+	The metrics are computed for all rows at once with RetrievalMetricBatch.
+
+	:param metric_inputs: The list of MetricInput schema for AutoRAG.
+	    The retrieved_ids of each metric input will be set to the given retrieved ids.
+	:param retrieved_ids: The retrieved ids of each query.
+	:param metrics: The metric list from input strategies.
+	:param metric_batch: The RetrievalMetricBatch of the metric inputs.
+	    Pass it to reuse the encoded retrieval_gt when you evaluate many results of the same metric inputs.
+	    Default is None, which builds a new one.
+	:return: The dataframe that has the metric score columns.
+	"""
+	for metric_input, pred_id in zip(metric_inputs, retrieved_ids):
+		metric_input.retrieved_ids = pred_id
+
+	metric_scores = {}
+	metric_names, metric_params = cast_metrics(metrics)
+	batch_metric_names = [
+		metric_name
+		for metric_name, metric_param in zip(metric_names, metric_params)
+		if metric_name in RETRIEVAL_METRIC_FUNC_DICT and not metric_param
+	]
+	batch_scores = {}
+	if batch_metric_names:
+		if metric_batch is None:
+			metric_batch = RetrievalMetricBatch(metric_inputs)
+		batch_scores = metric_batch(retrieved_ids, batch_metric_names)
+
+	for metric_name, metric_param in zip(metric_names, metric_params):
+		if metric_name in batch_scores:
+			metric_scores[metric_name] = batch_scores[metric_name]
+		elif metric_name in RETRIEVAL_METRIC_FUNC_DICT:
+			metric_func = RETRIEVAL_METRIC_FUNC_DICT[metric_name]
+			metric_scores[metric_name] = metric_func(
+				metric_inputs=metric_inputs, **metric_param
+			)
+		else:
+			warnings.warn(
+				f"metric {metric_name} is not in supported metrics: {RETRIEVAL_METRIC_FUNC_DICT.keys()}"
+				f"{metric_name} will be ignored."
+			)
+
+	return pd.DataFrame(metric_scores)
@@ -12,7 +12,7 @@ import pandas as pd
 import yaml
 
 from autorag.node_line import run_node_line
-from autorag.nodes.retrieval.base import get_bm25_pkl_name
+from autorag.nodes.retrieval.base import get_bm25_index_dir_name
 from autorag.nodes.retrieval.bm25 import bm25_ingest
 from autorag.nodes.retrieval.vectordb import (
 	vectordb_ingest,
@@ -30,6 +30,7 @@ from autorag.utils import (
 	cast_corpus_dataset,
 	validate_qa_from_corpus_dataset,
 )
+from autorag.utils.module_cache import MODULE_CACHE_DIRNAME
 from autorag.utils.util import (
 	load_summary_file,
 	explode,
@@ -122,6 +123,11 @@ class Evaluator:
 		"""
 		# Make Resources directory
 		os.makedirs(os.path.join(self.project_dir, "resources"), exist_ok=True)
+		# The module results are reused across the trials of the project
+		os.makedirs(
+			os.path.join(self.project_dir, "resources", MODULE_CACHE_DIRNAME),
+			exist_ok=True,
+		)
 
 		if not skip_validation:
 			logger.info(ascii_art)
@@ -237,14 +243,33 @@ class Evaluator:
 
 			if len(bm25_tokenizer_list) == 0:
 				bm25_tokenizer_list = ["porter_stemmer"]
+			# the tokenizer process pool is opt-in, because spawning it needs the main guard
+			num_workers = max(
+				chain.from_iterable(
+					map(
+						lambda nodes: extract_values_from_nodes_strategy(
+							nodes, "bm25_num_workers"
+						),
+						node_lines.values(),
+					)
+				),
+				default=1,
+			)
 			for bm25_tokenizer in bm25_tokenizer_list:
 				bm25_dir = os.path.join(
-					self.project_dir, "resources", get_bm25_pkl_name(bm25_tokenizer)
+					self.project_dir,
+					"resources",
+					get_bm25_index_dir_name(bm25_tokenizer),
 				)
 				if not os.path.exists(os.path.dirname(bm25_dir)):
 					os.makedirs(os.path.dirname(bm25_dir))
 				# ingest because bm25 supports update new corpus data
-				bm25_ingest(bm25_dir, self.corpus_data, bm25_tokenizer=bm25_tokenizer)
+				bm25_ingest(
+					bm25_dir,
+					self.corpus_data,
+					bm25_tokenizer=bm25_tokenizer,
+					num_workers=num_workers,
+				)
 			logger.info("BM25 corpus embedding complete.")
 
 	def __get_new_trial_name(self) -> str:
@@ -287,6 +312,10 @@ class Evaluator:
 	def restart_trial(self, trial_path: str):
 		logger.info(ascii_art)
 		os.environ["PROJECT_DIR"] = self.project_dir
+		os.makedirs(
+			os.path.join(self.project_dir, "resources", MODULE_CACHE_DIRNAME),
+			exist_ok=True,
+		)
 		# Check if trial_path exists
 		if not os.path.exists(trial_path):
 			raise ValueError(f"Trial path {trial_path} does not exist.")
@@ -1,11 +1,15 @@
+import functools
 from typing import List, Tuple
 
 import pandas as pd
 from llama_index.core.base.llms.base import BaseLLM
+from llama_index.core.base.llms.types import CompletionResponse
 from transformers import AutoTokenizer
 
 from autorag import generator_models
 from autorag.nodes.generator.base import BaseGenerator
+from autorag.nodes.util import get_llm_resource
+from autorag.utils.llm_cache import acached_llm_call
 from autorag.utils.util import (
 	get_event_loop,
 	process_batch,
@@ -55,6 +59,10 @@ class LlamaIndexLLM(BaseGenerator):
 		super().__del__()
 		del self.llm_instance
 
+	@classmethod
+	def get_resource(cls, *args, **kwargs) -> str:
+		return get_llm_resource(kwargs.get("llm"))
+
 	@result_to_dataframe(["generated_texts", "generated_tokens", "generated_log_probs"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		prompts = self.cast_to_run(previous_result=previous_result)
@@ -76,7 +84,20 @@ class LlamaIndexLLM(BaseGenerator):
 			The second element is a list of generated text's token ids, used tokenizer is GPT2Tokenizer.
 			The third element is a list of generated text's pseudo log probs.
 		"""
-		tasks = [self.llm_instance.acomplete(prompt) for prompt in prompts]
+		cache_model = self.llm_instance.to_dict()
+		temperature = getattr(self.llm_instance, "temperature", None)
+		tasks = [
+			acached_llm_call(
+				cache_model,
+				prompt,
+				{},
+				temperature,
+				functools.partial(self.llm_instance.acomplete, prompt),
+				dump=lambda x: x.text,
+				load=lambda x: CompletionResponse(text=x),
+			)
+			for prompt in prompts
+		]
 		loop = get_event_loop()
 		results = loop.run_until_complete(process_batch(tasks, batch_size=self.batch))
 
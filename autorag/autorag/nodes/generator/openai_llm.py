@@ -1,12 +1,18 @@
+import functools
+import hashlib
 import logging
-from typing import List, Tuple
+import threading
+from typing import List, Tuple, Optional, Dict
 
+import httpx
 import pandas as pd
 import tiktoken
-from openai import AsyncOpenAI
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, RateLimitError
 from tiktoken import Encoding
 
 from autorag.nodes.generator.base import BaseGenerator
+from autorag.utils.llm_cache import acached_llm_call
+from autorag.utils.rate_limit import AdaptiveRateLimiter
 from autorag.utils.util import (
 	get_event_loop,
 	process_batch,
@@ -51,15 +57,150 @@ MAX_TOKEN_DICT = {  # model name : token limit
 	"gpt-3.5-turbo-16k-0613": 16_385,
 }
 
+# The default temperature of the OpenAI chat completion
+OPENAI_TEMPERATURE = 1.0
+
+# The rate limiters shared by all OpenAI clients of the same base url, API key and model
+openai_rate_limiters: Dict[Tuple[str, str, str], AdaptiveRateLimiter] = {}
+openai_rate_limiters_lock = threading.Lock()
+
+
+def get_openai_rate_limiter(
+	base_url: str,
+	api_key: str,
+	model: str,
+	requests_per_minute: Optional[int] = None,
+	tokens_per_minute: Optional[int] = None,
+) -> AdaptiveRateLimiter:
+	"""
+	Get the rate limiter of the OpenAI API key and model.
+	OpenAI limits the requests and tokens per minute for each organization and model,
+	so every node and metric that calls the same model shares one rate limiter.
+
+	:param base_url: The base url of the OpenAI API.
+	:param api_key: The OpenAI API key.
+	:param model: The model name.
+	:param requests_per_minute: The requests per minute quota.
+	    Default is None, which learns it from the response headers.
+	:param tokens_per_minute: The tokens per minute quota.
+	    Default is None, which learns it from the response headers.
+	:return: The shared AdaptiveRateLimiter instance.
+	"""
+	key = (str(base_url), hashlib.sha256(str(api_key).encode()).hexdigest(), model)
+	with openai_rate_limiters_lock:
+		if key not in openai_rate_limiters:
+			openai_rate_limiters[key] = AdaptiveRateLimiter()
+		rate_limiter = openai_rate_limiters[key]
+	if requests_per_minute is not None:
+		rate_limiter.requests_per_minute = requests_per_minute
+		rate_limiter.available_requests = requests_per_minute
+		rate_limiter.fixed_requests_per_minute = True
+	if tokens_per_minute is not None:
+		rate_limiter.tokens_per_minute = tokens_per_minute
+		rate_limiter.available_tokens = tokens_per_minute
+		rate_limiter.fixed_tokens_per_minute = True
+	return rate_limiter
+
+
+def make_openai_client(
+	model: str,
+	requests_per_minute: Optional[int] = None,
+	tokens_per_minute: Optional[int] = None,
+	**kwargs,
+) -> Tuple[AsyncOpenAI, AdaptiveRateLimiter]:
+	"""
+	Make the AsyncOpenAI client and get its shared rate limiter.
+	Every response of the client updates the rate limiter with its rate limit headers,
+	including the rate-limited responses that the client retries by itself.
+
+	:param model: The model name that the client calls.
+	:param requests_per_minute: The requests per minute quota.
+	    Default is None, which learns it from the response headers.
+	:param tokens_per_minute: The tokens per minute quota.
+	    Default is None, which learns it from the response headers.
+	:param kwargs: The parameters of the AsyncOpenAI client.
+	:return: The AsyncOpenAI client and its AdaptiveRateLimiter.
+	"""
+
+	async def update_rate_limiter(response: httpx.Response):
+		if response.status_code == 429:
+			rate_limiter.on_rate_limited(get_retry_after(response.headers))
+		else:
+			rate_limiter.update_from_headers(response.headers)
+
+	http_client = kwargs.pop("http_client", None) or DefaultAsyncHttpxClient()
+	http_client.event_hooks["response"].append(update_rate_limiter)
+	client = AsyncOpenAI(http_client=http_client, **kwargs)
+	rate_limiter = get_openai_rate_limiter(
+		client.base_url,
+		client.api_key,
+		model,
+		requests_per_minute=requests_per_minute,
+		tokens_per_minute=tokens_per_minute,
+	)
+	return client, rate_limiter
+
+
+def get_retry_after(headers: httpx.Headers) -> Optional[float]:
+	try:
+		if "retry-after-ms" in headers:
+			return float(headers["retry-after-ms"]) / 1000
+		if "retry-after" in headers:
+			return float(headers["retry-after"])
+	except ValueError:
+		pass
+	return None
+
+
+def get_used_tokens(response) -> Optional[int]:
+	usage = getattr(response, "usage", None)
+	return getattr(usage, "total_tokens", None)
+
+
+async def run_openai_request(
+	rate_limiter: AdaptiveRateLimiter, request, tokens: int = 0
+):
+	"""
+	Run the OpenAI request with the rate limiter.
+	The reserved tokens are corrected with the real token usage of the response.
+
+	:param rate_limiter: The rate limiter of the model.
+	:param request: The no-argument function that returns the awaitable of the OpenAI request.
+	:param tokens: The estimated tokens of the request. The prompt tokens plus the maximum completion tokens.
+	:return: The response of the request.
+	"""
+	return await rate_limiter.run(
+		request,
+		tokens=tokens,
+		rate_limit_exceptions=(RateLimitError,),
+		get_used_tokens=get_used_tokens,
+	)
+
 
 class OpenAILLM(BaseGenerator):
-	def __init__(self, project_dir, llm: str, batch: int = 16, *args, **kwargs):
+	resource = "api"
+
+	def __init__(
+		self,
+		project_dir,
+		llm: str,
+		batch: int = 16,
+		requests_per_minute: Optional[int] = None,
+		tokens_per_minute: Optional[int] = None,
+		*args,
+		**kwargs,
+	):
 		super().__init__(project_dir, llm, *args, **kwargs)
 		assert batch > 0, "batch size must be greater than 0."
 		self.batch = batch
 
 		client_init_params = pop_params(AsyncOpenAI.__init__, kwargs)
-		self.client = AsyncOpenAI(**client_init_params)
+		self.client, self.rate_limiter = make_openai_client(
+			self.llm,
+			requests_per_minute=requests_per_minute,
+			tokens_per_minute=tokens_per_minute,
+			**client_init_params,
+		)
 
 		if self.llm.startswith("gpt-4.5"):
 			self.tokenizer = tiktoken.get_encoding("o200k_base")
@@ -94,9 +235,14 @@ class OpenAILLM(BaseGenerator):
 		:param prompts: A list of prompts.
 		:param llm: A model name for openai.
 		    Default is gpt-3.5-turbo.
-		:param batch: Batch size for openai api call.
-		    If you get API limit errors, you should lower the batch size.
+		:param batch: The maximum number of the running openai api calls.
+		    The calls are scheduled by the rate limiter shared with every caller of the same model,
+		    which adapts the concurrency under this number to the rate limit of your account.
 		    Default is 16.
+		:param requests_per_minute: The requests per minute quota of the model.
+		    Default is None, which learns it from the response headers.
+		:param tokens_per_minute: The tokens per minute quota of the model.
+		    Default is None, which learns it from the response headers.
 		:param truncate: Whether to truncate the input prompt.
 		    Default is True.
 		:param api_key: OpenAI API key. You can set this by passing env variable `OPENAI_API_KEY`
@@ -117,26 +263,31 @@ class OpenAILLM(BaseGenerator):
 			logger.warning("parameter n does not effective. It always set to 1.")
 
 		# TODO: fix this after updating tiktoken for the gpt-4.5 model. It is not yet supported yet.
-		if truncate:
-			prompts = list(
-				map(
-					lambda prompt: truncate_by_token(
-						prompt, self.tokenizer, self.max_token_size
-					),
-					prompts,
-				)
-			)
+		prompts, token_counts = self.encode_prompts(prompts, truncate)
 
 		openai_chat_params = pop_params(self.client.chat.completions.create, kwargs)
+		token_counts = add_completion_tokens(token_counts, openai_chat_params)
 		loop = get_event_loop()
 		if self.llm.startswith("o1") or self.llm.startswith("o3"):
-			tasks = [
-				self.get_result_o1(prompt, **openai_chat_params) for prompt in prompts
-			]
+			get_result = self.get_result_o1
+			# the o1 and o3 models only support the temperature 1
+			temperature = 1.0
 		else:
-			tasks = [
-				self.get_result(prompt, **openai_chat_params) for prompt in prompts
-			]
+			get_result = self.get_result
+			temperature = openai_chat_params.get("temperature", OPENAI_TEMPERATURE)
+		tasks = [
+			acached_llm_call(
+				self.cache_model,
+				prompt,
+				openai_chat_params,
+				temperature,
+				functools.partial(
+					get_result, prompt, token_count, **openai_chat_params
+				),
+				load=tuple,
+			)
+			for prompt, token_count in zip(prompts, token_counts)
+		]
 		result = loop.run_until_complete(process_batch(tasks, self.batch))
 		answer_result = list(map(lambda x: x[0], result))
 		token_result = list(map(lambda x: x[1], result))
@@ -164,20 +315,31 @@ class OpenAILLM(BaseGenerator):
 			logger.warning("parameter n does not effective. It always set to 1.")
 
 		# TODO: fix this after updating tiktoken for the gpt-4.5 model. It is not yet supported yet.
-		prompts = list(
-			map(
-				lambda prompt: truncate_by_token(
-					prompt, self.tokenizer, self.max_token_size
-				),
-				prompts,
-			)
-		)
+		prompts, token_counts = self.encode_prompts(prompts, truncate=True)
 
 		openai_chat_params = pop_params(self.client.beta.chat.completions.parse, kwargs)
+		token_counts = add_completion_tokens(token_counts, openai_chat_params)
 		loop = get_event_loop()
 		tasks = [
-			self.get_structured_result(prompt, output_cls, **openai_chat_params)
-			for prompt in prompts
+			acached_llm_call(
+				self.cache_model,
+				prompt,
+				{
+					"response_format": output_cls.model_json_schema(),
+					**openai_chat_params,
+				},
+				openai_chat_params.get("temperature", OPENAI_TEMPERATURE),
+				functools.partial(
+					self.get_structured_result,
+					prompt,
+					output_cls,
+					token_count,
+					**openai_chat_params,
+				),
+				dump=lambda x: x.model_dump(mode="json"),
+				load=output_cls.model_validate,
+			)
+			for prompt, token_count in zip(prompts, token_counts)
 		]
 		result = loop.run_until_complete(process_batch(tasks, self.batch))
 		return result
@@ -216,35 +378,77 @@ class OpenAILLM(BaseGenerator):
 	def stream(self, prompt: str, **kwargs):
 		raise NotImplementedError("stream method is not implemented yet.")
 
-	async def get_structured_result(self, prompt: str, output_cls, **kwargs):
+	@property
+	def cache_model(self) -> Dict[str, str]:
+		return {"model": self.llm, "base_url": str(self.client.base_url)}
+
+	def encode_prompts(
+		self, prompts: List[str], truncate: bool = True
+	) -> Tuple[List[str], List[int]]:
+		"""
+		Count the tokens of the prompts, and truncate the prompts to the max token size of the model.
+
+		:param prompts: A list of prompts.
+		:param truncate: Whether to truncate the prompts.
+		:return: The prompts and their token counts.
+		"""
+		prompt_tokens = list(
+			map(
+				lambda prompt: self.tokenizer.encode(prompt, allowed_special="all"),
+				prompts,
+			)
+		)
+		if truncate:
+			prompts = list(
+				map(
+					lambda tokens: self.tokenizer.decode(tokens[: self.max_token_size]),
+					prompt_tokens,
+				)
+			)
+			prompt_tokens = list(
+				map(lambda tokens: tokens[: self.max_token_size], prompt_tokens)
+			)
+		return prompts, list(map(len, prompt_tokens))
+
+	async def get_structured_result(
+		self, prompt: str, output_cls, token_count: int = 0, **kwargs
+	):
 		logprobs = True
 		if self.llm.startswith("gpt-4.5"):
 			logprobs = False
-		response = await self.client.beta.chat.completions.parse(
-			model=self.llm,
-			messages=[
-				{"role": "user", "content": prompt},
-			],
-			response_format=output_cls,
-			logprobs=logprobs,
-			n=1,
-			**kwargs,
+		response = await run_openai_request(
+			self.rate_limiter,
+			lambda: self.client.beta.chat.completions.parse(
+				model=self.llm,
+				messages=[
+					{"role": "user", "content": prompt},
+				],
+				response_format=output_cls,
+				logprobs=logprobs,
+				n=1,
+				**kwargs,
+			),
+			token_count,
 		)
 		return response.choices[0].message.parsed
 
-	async def get_result(self, prompt: str, **kwargs):
+	async def get_result(self, prompt: str, token_count: int = 0, **kwargs):
 		# TODO: gpt-4.5-preview does not support logprobs. It should be fixed after the openai update.
 		logprobs = True
 		if self.llm.startswith("gpt-4.5"):
 			logprobs = False
-		response = await self.client.chat.completions.create(
-			model=self.llm,
-			messages=[
-				{"role": "user", "content": prompt},
-			],
-			logprobs=logprobs,
-			n=1,
-			**kwargs,
+		response = await run_openai_request(
+			self.rate_limiter,
+			lambda: self.client.chat.completions.create(
+				model=self.llm,
+				messages=[
+					{"role": "user", "content": prompt},
+				],
+				logprobs=logprobs,
+				n=1,
+				**kwargs,
+			),
+			token_count,
 		)
 		choice = response.choices[0]
 		answer = choice.message.content
@@ -266,7 +470,7 @@ class OpenAILLM(BaseGenerator):
 			), "tokens and logprobs size is different."
 		return answer, tokens, logprobs
 
-	async def get_result_o1(self, prompt: str, **kwargs):
+	async def get_result_o1(self, prompt: str, token_count: int = 0, **kwargs):
 		assert self.llm.startswith("o1") or self.llm.startswith(
 			"o3"
 		), "This function only supports o1 or o3 model."
@@ -276,14 +480,18 @@ class OpenAILLM(BaseGenerator):
 		kwargs["top_p"] = 1
 		kwargs["presence_penalty"] = 0
 		kwargs["frequency_penalty"] = 0
-		response = await self.client.chat.completions.create(
-			model=self.llm,
-			messages=[
-				{"role": "user", "content": prompt},
-			],
-			logprobs=False,
-			n=1,
-			**kwargs,
+		response = await run_openai_request(
+			self.rate_limiter,
+			lambda: self.client.chat.completions.create(
+				model=self.llm,
+				messages=[
+					{"role": "user", "content": prompt},
+				],
+				logprobs=False,
+				n=1,
+				**kwargs,
+			),
+			token_count,
 		)
 		answer = response.choices[0].message.content
 		tokens = self.tokenizer.encode(answer, allowed_special="all")
@@ -291,6 +499,21 @@ class OpenAILLM(BaseGenerator):
 		return answer, tokens, pseudo_log_probs
 
 
+def add_completion_tokens(
+	token_counts: List[int], openai_chat_params: Dict
+) -> List[int]:
+	"""
+	Add the maximum completion tokens to the prompt token counts,
+	because OpenAI counts them in the tokens per minute until the response is done.
+	"""
+	max_tokens = (
+		openai_chat_params.get("max_completion_tokens")
+		or openai_chat_params.get("max_tokens")
+		or 0
+	)
+	return list(map(lambda count: count + max_tokens, token_counts))
+
+
 def truncate_by_token(prompt: str, tokenizer: Encoding, max_token_size: int):
 	tokens = tokenizer.encode(prompt, allowed_special="all")
 	return tokenizer.decode(tokens[:max_token_size])
@@ -6,10 +6,13 @@ import pandas as pd
 
 from autorag.nodes.generator.base import BaseGenerator
 from autorag.utils import result_to_dataframe
+from autorag.utils.llm_cache import cached_llm_batch
 from autorag.utils.util import pop_params, to_list
 
 
 class Vllm(BaseGenerator):
+	resource = "gpu"
+
 	def __init__(self, project_dir: str, llm: str, **kwargs):
 		super().__init__(project_dir, llm, **kwargs)
 		try:
@@ -21,6 +24,7 @@ class Vllm(BaseGenerator):
 
 		model_from_kwargs = kwargs.pop("model", None)
 		model = llm if model_from_kwargs is None else model_from_kwargs
+		self.model_name = model
 
 		input_kwargs = deepcopy(kwargs)
 		sampling_params_init_params = pop_params(
@@ -94,24 +98,43 @@ class Vllm(BaseGenerator):
 
 		sampling_params = pop_params(SamplingParams.from_optional, kwargs)
 		generate_params = SamplingParams(**sampling_params)
-		results: List[RequestOutput] = self.vllm_model.generate(
-			prompts, generate_params
-		)
-		generated_texts = list(map(lambda x: x.outputs[0].text, results))
-		generated_token_ids = list(map(lambda x: x.outputs[0].token_ids, results))
-		log_probs: List[SampleLogprobs] = list(
-			map(lambda x: x.outputs[0].logprobs, results)
-		)
-		generated_log_probs = list(
-			map(
-				lambda x: list(map(lambda y: y[0][y[1]].logprob, zip(x[0], x[1]))),
-				zip(log_probs, generated_token_ids),
+
+		def generate(target_prompts: List[str]) -> List[Tuple]:
+			results: List[RequestOutput] = self.vllm_model.generate(
+				target_prompts, generate_params
+			)
+			generated_texts = list(map(lambda x: x.outputs[0].text, results))
+			generated_token_ids = list(map(lambda x: x.outputs[0].token_ids, results))
+			log_probs: List[SampleLogprobs] = list(
+				map(lambda x: x.outputs[0].logprobs, results)
 			)
+			generated_log_probs = list(
+				map(
+					lambda x: list(map(lambda y: y[0][y[1]].logprob, zip(x[0], x[1]))),
+					zip(log_probs, generated_token_ids),
+				)
+			)
+			return list(
+				zip(
+					to_list(generated_texts),
+					to_list(generated_token_ids),
+					to_list(generated_log_probs),
+				)
+			)
+
+		# only the prompts that are not in the LLM response cache are generated
+		generated = cached_llm_batch(
+			self.model_name,
+			prompts,
+			sampling_params,
+			generate_params.temperature,
+			generate,
+			load=tuple,
 		)
 		return (
-			to_list(generated_texts),
-			to_list(generated_token_ids),
-			to_list(generated_log_probs),
+			list(map(lambda x: x[0], generated)),
+			list(map(lambda x: x[1], generated)),
+			list(map(lambda x: x[2], generated)),
 		)
 
 	async def astream(self, prompt: str, **kwargs):
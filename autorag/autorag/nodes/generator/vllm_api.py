@@ -1,3 +1,4 @@
+import functools
 import logging
 from typing import List, Tuple
 import time
@@ -7,14 +8,18 @@ import requests
 from asyncio import to_thread
 
 from autorag.nodes.generator.base import BaseGenerator
+from autorag.utils.llm_cache import acached_llm_call
 from autorag.utils.util import get_event_loop, process_batch, result_to_dataframe
 
 logger = logging.getLogger("AutoRAG")
 
 DEFAULT_MAX_TOKENS = 4096  # Default token limit
+DEFAULT_TEMPERATURE = 0.4
 
 
 class VllmAPI(BaseGenerator):
+	resource = "api"
+
 	def __init__(
 		self,
 		project_dir,
@@ -73,7 +78,24 @@ class VllmAPI(BaseGenerator):
 		if truncate:
 			prompts = list(map(lambda p: self.truncate_by_token(p), prompts))
 		loop = get_event_loop()
-		tasks = [to_thread(self.get_result, prompt, **kwargs) for prompt in prompts]
+		temperature = kwargs.get("temperature", DEFAULT_TEMPERATURE)
+		cache_params = {
+			"temperature": temperature,
+			"max_tokens": min(
+				kwargs.get("max_tokens", self.max_token_size), self.max_token_size
+			),
+		}
+		tasks = [
+			acached_llm_call(
+				{"model": self.llm, "uri": self.uri},
+				prompt,
+				cache_params,
+				temperature,
+				functools.partial(to_thread, self.get_result, prompt, **kwargs),
+				load=tuple,
+			)
+			for prompt in prompts
+		]
 		results = loop.run_until_complete(process_batch(tasks, self.batch))
 
 		answer_result = list(map(lambda x: x[0], results))
@@ -99,7 +121,7 @@ class VllmAPI(BaseGenerator):
 		payload = {
 			"model": self.llm,
 			"messages": [{"role": "user", "content": prompt}],
-			"temperature": kwargs.get("temperature", 0.4),
+			"temperature": kwargs.get("temperature", DEFAULT_TEMPERATURE),
 			"max_tokens": min(
 				kwargs.get("max_tokens", self.max_token_size), self.max_token_size
 			),
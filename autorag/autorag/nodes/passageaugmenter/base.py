@@ -8,9 +8,8 @@ from autorag.schema import BaseModule
 from autorag.utils import (
 	validate_qa_dataset,
 	sort_by_scores,
-	validate_corpus_dataset,
-	cast_corpus_dataset,
 )
+from autorag.utils.corpus import get_corpus_path, load_corpus_data
 from autorag.utils.util import select_top_k
 
 logger = logging.getLogger("AutoRAG")
@@ -22,12 +21,7 @@ class BasePassageAugmenter(BaseModule, metaclass=abc.ABCMeta):
 			f"Initialize passage augmenter node - {self.__class__.__name__} module..."
 		)
 		data_dir = os.path.join(project_dir, "data")
-		corpus_df = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-		)
-		validate_corpus_dataset(corpus_df)
-		corpus_df = cast_corpus_dataset(corpus_df)
-		self.corpus_df = corpus_df
+		self.corpus_df = load_corpus_data(get_corpus_path(data_dir), cast=True)
 
 	def __del__(self):
 		logger.info(
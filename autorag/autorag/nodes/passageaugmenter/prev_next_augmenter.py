@@ -1,25 +1,30 @@
-from typing import List, Union
+import os
+from typing import List, Union, Optional
 
-import numpy as np
 import pandas as pd
 
 from autorag.embedding.base import EmbeddingModel
-from autorag.evaluation.metric.util import calculate_cosine_similarity
+from autorag.evaluation.metric.util import calculate_cosine_similarity_groups
 from autorag.nodes.passageaugmenter.base import BasePassageAugmenter
+from autorag.vectordb import load_vectordb_from_yaml
 from autorag.utils.util import (
 	filter_dict_keys,
 	fetch_contents,
 	embedding_query_content,
+	embedding_query_content_from_vectordb,
 	result_to_dataframe,
 	empty_cuda_cache,
 )
 
 
 class PrevNextPassageAugmenter(BasePassageAugmenter):
+	resource = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
 		embedding_model: Union[str, dict] = "openai",
+		vectordb: Optional[str] = None,
 		*args,
 		**kwargs,
 	):
@@ -29,6 +34,10 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		:param project_dir:
 		:param embedding_model: The embedding model name to use for calculating cosine similarity
 			Default is openai (text-embedding-ada-002)
+		:param vectordb: The vectordb name that has the corpus embeddings.
+			If it is set, the stored embeddings are fetched instead of embedding the augmented passages again,
+			and the embedding model of the vectordb is used instead of embedding_model.
+			Default is None.
 		:param kwargs:
 		"""
 		super().__init__(project_dir, *args, **kwargs)
@@ -39,9 +48,19 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		self.slim_corpus_df = slim_corpus_df
 
 		# init embedding model
-		self.embedding_model = EmbeddingModel.load(embedding_model)()
+		if vectordb is not None:
+			self.vector_store = load_vectordb_from_yaml(
+				os.path.join(project_dir, "resources", "vectordb.yaml"),
+				vectordb,
+				project_dir,
+			)
+			self.embedding_model = self.vector_store.embedding
+		else:
+			self.vector_store = None
+			self.embedding_model = EmbeddingModel.load(embedding_model)()
 
 	def __del__(self):
+		del self.vector_store
 		del self.embedding_model
 		empty_cuda_cache()
 		super().__del__()
@@ -72,22 +91,25 @@ class PrevNextPassageAugmenter(BasePassageAugmenter):
 		# fetch contents from corpus to use augmented ids
 		augmented_contents = fetch_contents(self.corpus_df, augmented_ids)
 
-		query_embeddings, contents_embeddings = embedding_query_content(
-			queries, augmented_contents, self.embedding_model, batch=128
-		)
+		if self.vector_store is not None:
+			query_embeddings, contents_embeddings = (
+				embedding_query_content_from_vectordb(
+					queries,
+					augmented_contents,
+					augmented_ids,
+					self.vector_store,
+					batch=128,
+				)
+			)
+		else:
+			query_embeddings, contents_embeddings = embedding_query_content(
+				queries, augmented_contents, self.embedding_model, batch=128
+			)
 
 		# get scores from calculated cosine similarity
-		augmented_scores = [
-			np.array(
-				[
-					calculate_cosine_similarity(query_embedding, x)
-					for x in content_embeddings
-				]
-			).tolist()
-			for query_embedding, content_embeddings in zip(
-				query_embeddings, contents_embeddings
-			)
-		]
+		augmented_scores = calculate_cosine_similarity_groups(
+			query_embeddings, contents_embeddings
+		)
 		return self.sort_by_scores(
 			augmented_contents, augmented_ids, augmented_scores, top_k
 		)
@@ -6,6 +6,7 @@ import pandas as pd
 from llama_index.core.llms import LLM
 
 from autorag import generator_models
+from autorag.nodes.util import get_llm_resource
 from autorag.schema import BaseModule
 from autorag.utils import result_to_dataframe
 
@@ -44,6 +45,7 @@ class BasePassageCompressor(BaseModule, metaclass=abc.ABCMeta):
 
 
 class LlamaIndexCompressor(BasePassageCompressor, metaclass=abc.ABCMeta):
+	llm_sampling = True
 	param_list = ["prompt", "chat_prompt", "batch"]
 
 	def __init__(self, project_dir: str, **kwargs):
@@ -66,6 +68,10 @@ class LlamaIndexCompressor(BasePassageCompressor, metaclass=abc.ABCMeta):
 		del self.llm
 		super().__del__()
 
+	@classmethod
+	def get_resource(cls, *args, **kwargs) -> str:
+		return get_llm_resource(kwargs.get("llm"))
+
 	@result_to_dataframe(["retrieved_contents"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		queries, retrieved_contents = self.cast_to_run(previous_result)
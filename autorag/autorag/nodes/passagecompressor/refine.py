@@ -1,3 +1,4 @@
+import functools
 from typing import List, Optional
 
 from llama_index.core import PromptTemplate
@@ -6,6 +7,7 @@ from llama_index.core.prompts.utils import is_chat_model
 from llama_index.core.response_synthesizers import Refine as rf
 
 from autorag.nodes.passagecompressor.base import LlamaIndexCompressor
+from autorag.utils.llm_cache import acached_llm_call
 from autorag.utils.util import get_event_loop, process_batch
 
 
@@ -45,8 +47,20 @@ class Refine(LlamaIndexCompressor):
 		else:
 			refine_template = None
 		summarizer = rf(llm=self.llm, refine_template=refine_template, verbose=True)
+		cache_model = self.llm.to_dict()
+		cache_params = {
+			"synthesizer": "refine",
+			"prompt": prompt,
+			"chat_prompt": chat_prompt,
+		}
 		tasks = [
-			summarizer.aget_response(query, content)
+			acached_llm_call(
+				cache_model,
+				{"query": query, "contents": content},
+				cache_params,
+				getattr(self.llm, "temperature", None),
+				functools.partial(summarizer.aget_response, query, content),
+			)
 			for query, content in zip(queries, contents)
 		]
 		loop = get_event_loop()
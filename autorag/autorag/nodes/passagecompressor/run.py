@@ -9,8 +9,10 @@ from autorag.evaluation.metric import (
 	retrieval_token_precision,
 	retrieval_token_f1,
 )
+from autorag.nodes.util import run_modules
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import filter_by_threshold, select_best
+from autorag.utils.corpus import load_corpus_data
 from autorag.utils.util import fetch_contents
 
 
@@ -46,25 +48,19 @@ def run_passage_compressor_node(
 
 	# make retrieval contents gt
 	qa_data = pd.read_parquet(os.path.join(data_dir, "qa.parquet"), engine="pyarrow")
-	corpus_data = pd.read_parquet(
-		os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-	)
+	corpus_data = load_corpus_data(os.path.join(data_dir, "corpus.parquet"))
 	# check qa_data have retrieval_gt
 	assert all(
 		len(x[0]) > 0 for x in qa_data["retrieval_gt"].tolist()
 	), "Can't use passage compressor if you don't have retrieval gt values in QA dataset."
 
 	# run modules
-	results, execution_times = zip(
-		*map(
-			lambda task: measure_speed(
-				task[0].run_evaluator,
-				project_dir=project_dir,
-				previous_result=previous_result,
-				**task[1],
-			),
-			zip(modules, module_params),
-		)
+	results, execution_times = run_modules(
+		modules,
+		module_params,
+		project_dir,
+		previous_result,
+		max_workers=strategies.get("max_workers", 1),
 	)
 	results = list(results)
 	average_times = list(map(lambda x: x / len(results[0]), execution_times))
@@ -1,3 +1,4 @@
+import functools
 from typing import List, Optional
 
 from llama_index.core import PromptTemplate
@@ -6,6 +7,7 @@ from llama_index.core.prompts.utils import is_chat_model
 from llama_index.core.response_synthesizers import TreeSummarize as ts
 
 from autorag.nodes.passagecompressor.base import LlamaIndexCompressor
+from autorag.utils.llm_cache import acached_llm_call
 from autorag.utils.util import get_event_loop, process_batch
 
 
@@ -47,8 +49,20 @@ class TreeSummarize(LlamaIndexCompressor):
 		else:
 			summary_template = None
 		summarizer = ts(llm=self.llm, summary_template=summary_template, use_async=True)
+		cache_model = self.llm.to_dict()
+		cache_params = {
+			"synthesizer": "tree_summarize",
+			"prompt": prompt,
+			"chat_prompt": chat_prompt,
+		}
 		tasks = [
-			summarizer.aget_response(query, content)
+			acached_llm_call(
+				cache_model,
+				{"query": query, "contents": content},
+				cache_params,
+				getattr(self.llm, "temperature", None),
+				functools.partial(summarizer.aget_response, query, content),
+			)
 			for query, content in zip(queries, contents)
 		]
 		loop = get_event_loop()
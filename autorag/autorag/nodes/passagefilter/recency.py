@@ -8,6 +8,7 @@ import pandas as pd
 
 from autorag.nodes.passagefilter.base import BasePassageFilter
 from autorag.utils import fetch_contents, result_to_dataframe
+from autorag.utils.corpus import get_corpus_path, load_corpus_data
 
 logger = logging.getLogger("AutoRAG")
 
@@ -15,8 +16,8 @@ logger = logging.getLogger("AutoRAG")
 class RecencyFilter(BasePassageFilter):
 	def __init__(self, project_dir: Union[str, Path], *args, **kwargs):
 		super().__init__(project_dir, *args, **kwargs)
-		self.corpus_df = pd.read_parquet(
-			os.path.join(project_dir, "data", "corpus.parquet"), engine="pyarrow"
+		self.corpus_df = load_corpus_data(
+			get_corpus_path(os.path.join(project_dir, "data"))
 		)
 
 	@result_to_dataframe(["retrieved_contents", "retrieved_ids", "retrieve_scores"])
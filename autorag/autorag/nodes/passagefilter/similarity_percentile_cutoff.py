@@ -1,20 +1,27 @@
+import os
 from pathlib import Path
 from typing import List, Tuple, Union
 
-import numpy as np
 import pandas as pd
 
 from autorag.embedding.base import EmbeddingModel
-from autorag.evaluation.metric.util import calculate_cosine_similarity
+from autorag.evaluation.metric.util import calculate_cosine_similarity_groups
 from autorag.nodes.passagefilter.base import BasePassageFilter
 from autorag.nodes.passagefilter.similarity_threshold_cutoff import (
 	embedding_query_content,
 )
 from autorag.utils import result_to_dataframe
-from autorag.utils.util import empty_cuda_cache, pop_params
+from autorag.utils.util import (
+	empty_cuda_cache,
+	pop_params,
+	embedding_query_content_from_vectordb,
+)
+from autorag.vectordb import load_vectordb_from_yaml
 
 
 class SimilarityPercentileCutoff(BasePassageFilter):
+	resource = "gpu"
+
 	def __init__(self, project_dir: Union[str, Path], *args, **kwargs):
 		"""
 		Initialize the SimilarityPercentileCutoff module
@@ -22,13 +29,28 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 		:param project_dir: The project directory to use for initializing the module
 		:param embedding_model: The embedding model string to use for calculating similarity
 		        Default is "openai" which is OpenAI text-embedding-ada-002 embedding model.
+		:param vectordb: The vectordb name that has the corpus embeddings.
+		        If it is set, the stored embeddings are fetched instead of embedding the contents again,
+		        and the embedding model of the vectordb is used instead of embedding_model.
+		        Default is None.
 		"""
 		super().__init__(project_dir, *args, **kwargs)
 		embedding_model = kwargs.pop("embedding_model", "openai")
-		self.embedding_model = EmbeddingModel.load(embedding_model)()
+		vectordb = kwargs.pop("vectordb", None)
+		if vectordb is not None:
+			self.vector_store = load_vectordb_from_yaml(
+				os.path.join(project_dir, "resources", "vectordb.yaml"),
+				vectordb,
+				project_dir,
+			)
+			self.embedding_model = self.vector_store.embedding
+		else:
+			self.vector_store = None
+			self.embedding_model = EmbeddingModel.load(embedding_model)()
 
 	def __del__(self):
 		super().__del__()
+		del self.vector_store
 		del self.embedding_model
 
 		empty_cuda_cache()
@@ -63,16 +85,25 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 		    Default is 128.
 		:return: Tuple of lists containing the filtered contents, ids, and scores
 		"""
-		query_embeddings, content_embeddings = embedding_query_content(
-			queries, contents_list, self.embedding_model, batch
-		)
+		if self.vector_store is not None:
+			query_embeddings, content_embeddings = (
+				embedding_query_content_from_vectordb(
+					queries, contents_list, ids_list, self.vector_store, batch
+				)
+			)
+		else:
+			query_embeddings, content_embeddings = embedding_query_content(
+				queries, contents_list, self.embedding_model, batch
+			)
 
+		similarities_list = calculate_cosine_similarity_groups(
+			query_embeddings, content_embeddings
+		)
 		results = list(
 			map(
-				lambda x: self.__row_pure(x[0], x[1], x[2], x[3], x[4], percentile),
+				lambda x: self.__row_pure(x[0], x[1], x[2], x[3], percentile),
 				zip(
-					query_embeddings,
-					content_embeddings,
+					similarities_list,
 					contents_list,
 					ids_list,
 					scores_list,
@@ -88,8 +119,7 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 
 	@staticmethod
 	def __row_pure(
-		query_embedding: str,
-		content_embeddings: List[List[float]],
+		similarities: List[float],
 		content_list: List[str],
 		ids_list: List[str],
 		scores_list: List[float],
@@ -98,30 +128,20 @@ class SimilarityPercentileCutoff(BasePassageFilter):
 		"""
 		Return tuple of lists containing the filtered contents, ids, and scores
 
-		:param query_embedding: Query embedding
-		:param content_embeddings: Each content embedding
+		:param similarities: The cosine similarity of each content with the query
 		:param content_list: Each content
 		:param ids_list: Each id
 		:param scores_list: Each score
 		:param percentile: The percentile to cut off
 		:return: Tuple of lists containing the filtered contents, ids, and scores
 		"""
-		num_top_k = int(len(content_embeddings) * percentile)
+		num_top_k = int(len(similarities) * percentile)
 
 		if num_top_k == 0:
 			num_top_k = 1
 
-		similarities = np.array(
-			list(
-				map(
-					lambda x: calculate_cosine_similarity(query_embedding, x),
-					content_embeddings,
-				)
-			)
-		).tolist()
-
 		content_id_score_similarity = list(
-			zip(ids_list, content_list, scores_list, similarities)
+			zip(content_list, ids_list, scores_list, similarities)
 		)
 
 		sorted_content_id_score_similarity = sorted(
@@ -1,13 +1,16 @@
+import os
 from typing import List, Tuple
 
 import numpy as np
 import pandas as pd
 
 from autorag.embedding.base import EmbeddingModel
-from autorag.evaluation.metric.util import calculate_cosine_similarity
+from autorag.evaluation.metric.util import calculate_cosine_similarity_groups
 from autorag.nodes.passagefilter.base import BasePassageFilter
+from autorag.vectordb import load_vectordb_from_yaml
 from autorag.utils.util import (
 	embedding_query_content,
+	embedding_query_content_from_vectordb,
 	empty_cuda_cache,
 	result_to_dataframe,
 	pop_params,
@@ -15,6 +18,8 @@ from autorag.utils.util import (
 
 
 class SimilarityThresholdCutoff(BasePassageFilter):
+	resource = "gpu"
+
 	def __init__(self, project_dir: str, *args, **kwargs):
 		"""
 		Initialize the SimilarityThresholdCutoff module
@@ -22,12 +27,27 @@ class SimilarityThresholdCutoff(BasePassageFilter):
 		:param project_dir: The project directory to use for initializing the module
 		:param embedding_model: The embedding model string to use for calculating similarity
 		        Default is "openai" which is OpenAI text-embedding-ada-002 embedding model.
+		:param vectordb: The vectordb name that has the corpus embeddings.
+		        If it is set, the stored embeddings are fetched instead of embedding the contents again,
+		        and the embedding model of the vectordb is used instead of embedding_model.
+		        Default is None.
 		"""
 		super().__init__(project_dir, *args, **kwargs)
-		embedding_model = kwargs.get("embedding_model", "openai")
-		self.embedding_model = EmbeddingModel.load(embedding_model)()
+		vectordb = kwargs.get("vectordb")
+		if vectordb is not None:
+			self.vector_store = load_vectordb_from_yaml(
+				os.path.join(project_dir, "resources", "vectordb.yaml"),
+				vectordb,
+				project_dir,
+			)
+			self.embedding_model = self.vector_store.embedding
+		else:
+			self.vector_store = None
+			embedding_model = kwargs.get("embedding_model", "openai")
+			self.embedding_model = EmbeddingModel.load(embedding_model)()
 
 	def __del__(self):
+		del self.vector_store
 		del self.embedding_model
 		empty_cuda_cache()
 		super().__del__()
@@ -62,15 +82,22 @@ class SimilarityThresholdCutoff(BasePassageFilter):
 		    Default is 128.
 		:return: Tuple of lists containing the filtered contents, ids, and scores
 		"""
-		query_embeddings, content_embeddings = embedding_query_content(
-			queries, contents_list, self.embedding_model, batch
-		)
+		if self.vector_store is not None:
+			query_embeddings, content_embeddings = (
+				embedding_query_content_from_vectordb(
+					queries, contents_list, ids_list, self.vector_store, batch
+				)
+			)
+		else:
+			query_embeddings, content_embeddings = embedding_query_content(
+				queries, contents_list, self.embedding_model, batch
+			)
 
+		similarities_list = calculate_cosine_similarity_groups(
+			query_embeddings, content_embeddings
+		)
 		remain_indices = list(
-			map(
-				lambda x: self.__row_pure(x[0], x[1], threshold),
-				zip(query_embeddings, content_embeddings),
-			)
+			map(lambda x: self.__row_pure(x, threshold), similarities_list)
 		)
 
 		remain_content_list = list(
@@ -85,27 +112,16 @@ class SimilarityThresholdCutoff(BasePassageFilter):
 		return remain_content_list, remain_ids_list, remain_scores_list
 
 	@staticmethod
-	def __row_pure(
-		query_embedding: str, content_embeddings: List[List[float]], threshold: float
-	) -> List[int]:
+	def __row_pure(similarities: List[float], threshold: float) -> List[int]:
 		"""
 		Return indices that have to remain.
 		Return at least one index if there is nothing to remain.
 
-		:param query_embedding: Query embedding
-		:param content_embeddings: Each content embedding
+		:param similarities: The cosine similarity of each content with the query
 		:param threshold: The threshold to cut off
 		:return: Indices to remain at the contents
 		"""
-
-		similarities = np.array(
-			list(
-				map(
-					lambda x: calculate_cosine_similarity(query_embedding, x),
-					content_embeddings,
-				)
-			)
-		)
+		similarities = np.array(similarities)
 		result = np.where(similarities >= threshold)[0].tolist()
 		if len(result) > 0:
 			return result
@@ -10,6 +10,8 @@ from autorag.utils.util import get_event_loop, process_batch, result_to_datafram
 
 
 class CohereReranker(BasePassageReranker):
+	resource = "api"
+
 	def __init__(self, project_dir: str, *args, **kwargs):
 		"""
 		Initialize Cohere rerank node.
@@ -15,6 +15,8 @@ from autorag.utils.util import (
 
 
 class FlagEmbeddingReranker(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(
 		self, project_dir, model_name: str = "BAAI/bge-reranker-large", *args, **kwargs
 	):
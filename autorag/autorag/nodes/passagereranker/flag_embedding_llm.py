@@ -15,6 +15,8 @@ from autorag.utils.util import (
 
 
 class FlagEmbeddingLLMReranker(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(
 		self,
 		project_dir,
@@ -33,6 +33,8 @@ model_file_map = {
 
 
 class FlashRankReranker(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(
 		self, project_dir: str, model: str = "ms-marco-TinyBERT-L-2-v2", *args, **kwargs
 	):
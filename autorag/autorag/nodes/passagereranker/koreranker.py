@@ -15,6 +15,8 @@ from autorag.utils.util import (
 
 
 class KoReranker(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(self, project_dir: str, *args, **kwargs):
 		super().__init__(project_dir)
 		try:
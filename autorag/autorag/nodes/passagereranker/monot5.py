@@ -39,6 +39,8 @@ prediction_tokens = {
 
 
 class MonoT5(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
@@ -11,6 +11,7 @@ from llama_index.llms.openai import OpenAI
 
 from autorag import generator_models
 from autorag.nodes.passagereranker.base import BasePassageReranker
+from autorag.nodes.util import get_llm_resource
 from autorag.utils.util import (
 	get_event_loop,
 	process_batch,
@@ -21,6 +22,8 @@ from autorag.utils.util import (
 
 
 class RankGPT(BasePassageReranker):
+	llm_sampling = True
+
 	def __init__(
 		self, project_dir: str, llm: Optional[Union[str, LLM]] = None, **kwargs
 	):
@@ -49,6 +52,10 @@ class RankGPT(BasePassageReranker):
 		empty_cuda_cache()
 		super().__del__()
 
+	@classmethod
+	def get_resource(cls, *args, **kwargs) -> str:
+		return get_llm_resource(kwargs.get("llm"))
+
 	@result_to_dataframe(["retrieved_contents", "retrieved_ids", "retrieve_scores"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		queries, contents, scores, ids = self.cast_to_run(previous_result)
@@ -15,6 +15,8 @@ from autorag.utils.util import (
 
 
 class SentenceTransformerReranker(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
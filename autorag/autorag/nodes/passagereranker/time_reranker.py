@@ -6,13 +6,14 @@ import pandas as pd
 
 from autorag.nodes.passagereranker.base import BasePassageReranker
 from autorag.utils import result_to_dataframe, fetch_contents
+from autorag.utils.corpus import get_corpus_path, load_corpus_data
 
 
 class TimeReranker(BasePassageReranker):
 	def __init__(self, project_dir: str, *args, **kwargs):
 		super().__init__(project_dir, *args, **kwargs)
-		self.corpus_df = pd.read_parquet(
-			os.path.join(project_dir, "data", "corpus.parquet"), engine="pyarrow"
+		self.corpus_df = load_corpus_data(
+			get_corpus_path(os.path.join(project_dir, "data"))
 		)
 
 	@result_to_dataframe(["retrieved_contents", "retrieved_ids", "retrieve_scores"])
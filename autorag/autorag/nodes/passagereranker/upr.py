@@ -11,6 +11,8 @@ logger = logging.getLogger("AutoRAG")
 
 
 class Upr(BasePassageReranker):
+	resource = "gpu"
+
 	def __init__(
 		self,
 		project_dir: str,
@@ -8,6 +8,8 @@ from autorag.utils.util import result_to_dataframe, get_event_loop, process_batc
 
 
 class VoyageAIReranker(BasePassageReranker):
+	resource = "api"
+
 	def __init__(self, project_dir: str, *args, **kwargs):
 		super().__init__(project_dir)
 		api_key = kwargs.pop("api_key", None)
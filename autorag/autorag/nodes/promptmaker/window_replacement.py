@@ -6,6 +6,7 @@ import pandas as pd
 
 from autorag.nodes.promptmaker.base import BasePromptMaker
 from autorag.utils import result_to_dataframe, fetch_contents
+from autorag.utils.corpus import get_corpus_path, load_corpus_data
 
 logger = logging.getLogger("AutoRAG")
 
@@ -15,9 +16,7 @@ class WindowReplacement(BasePromptMaker):
 		super().__init__(project_dir, *args, **kwargs)
 		# load corpus
 		data_dir = os.path.join(project_dir, "data")
-		self.corpus_data = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-		)
+		self.corpus_data = load_corpus_data(get_corpus_path(data_dir))
 
 	@result_to_dataframe(["prompts"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
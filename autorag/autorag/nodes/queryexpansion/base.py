@@ -13,6 +13,8 @@ logger = logging.getLogger("AutoRAG")
 
 
 class BaseQueryExpansion(BaseModule, metaclass=abc.ABCMeta):
+	llm_sampling = True
+
 	def __init__(self, project_dir: Union[str, Path], *args, **kwargs):
 		logger.info(
 			f"Initialize query expansion node - {self.__class__.__name__} module..."
@@ -21,6 +23,11 @@ class BaseQueryExpansion(BaseModule, metaclass=abc.ABCMeta):
 		generator_class, generator_param = make_generator_callable_param(kwargs)
 		self.generator = generator_class(project_dir, **generator_param)
 
+	@classmethod
+	def get_resource(cls, *args, **kwargs) -> str:
+		generator_class, generator_param = make_generator_callable_param(dict(kwargs))
+		return generator_class.get_resource(**generator_param)
+
 	def __del__(self):
 		del self.generator
 		logger.info(
@@ -5,6 +5,12 @@ from autorag.utils import result_to_dataframe
 
 
 class PassQueryExpansion(BaseQueryExpansion):
+	llm_sampling = False
+
+	@classmethod
+	def get_resource(cls, *args, **kwargs) -> str:
+		return cls.resource
+
 	@result_to_dataframe(["queries"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		"""
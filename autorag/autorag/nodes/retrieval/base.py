@@ -1,17 +1,23 @@
 import abc
+import itertools
 import logging
 import os
-from typing import List, Union, Tuple
+from typing import List, Union, Tuple, Callable, Sequence
 
+import numpy as np
 import pandas as pd
 
 from autorag.schema import BaseModule
 from autorag.support import get_support_modules
 from autorag.utils import fetch_contents, result_to_dataframe, validate_qa_dataset
+from autorag.utils.corpus import get_corpus_path, load_corpus_data
 from autorag.utils.util import pop_params
 
 logger = logging.getLogger("AutoRAG")
 
+# The maximum element count of the (weights, queries, candidates) array at once
+HYBRID_SWEEP_MAX_ELEMENTS = 2**23
+
 
 class BaseRetrieval(BaseModule, metaclass=abc.ABCMeta):
 	def __init__(self, project_dir: str, *args, **kwargs):
@@ -20,9 +26,7 @@ class BaseRetrieval(BaseModule, metaclass=abc.ABCMeta):
 		self.resources_dir = os.path.join(project_dir, "resources")
 		data_dir = os.path.join(project_dir, "data")
 		# fetch data from corpus_data
-		self.corpus_df = pd.read_parquet(
-			os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-		)
+		self.corpus_df = load_corpus_data(get_corpus_path(data_dir))
 
 	def __del__(self):
 		logger.info(f"Deleting retrieval node - {self.__class__.__name__} module...")
@@ -122,6 +126,100 @@ def evenly_distribute_passages(
 	return new_ids, new_scores
 
 
+def align_fusion_candidates(
+	ids: Tuple, scores: Tuple
+) -> Tuple[List[List[str]], np.ndarray]:
+	"""
+	Align the retrieval results of the modules to the candidates of each query.
+	The candidates are the union of the retrieved ids of the modules,
+	in the order of the first appearance.
+	When an id is retrieved twice by one module, its last score is used.
+
+	:param ids: The tuple of the retrieved ids of each module.
+	:param scores: The tuple of the retrieve scores of each module.
+	:return: The candidate ids of each query,
+	    and the score array shaped (modules, queries, max candidate count).
+	    The score is NaN when the module did not retrieve the candidate.
+	"""
+	candidate_ids = [
+		list(dict.fromkeys(itertools.chain.from_iterable(query_ids)))
+		for query_ids in zip(*ids)
+	]
+	max_candidate_len = max(map(len, candidate_ids), default=0)
+	score_array = np.full((len(ids), len(candidate_ids), max_candidate_len), np.nan)
+	for query_idx, candidates in enumerate(candidate_ids):
+		positions = {id_: i for i, id_ in enumerate(candidates)}
+		for module_idx in range(len(ids)):
+			for id_, score in zip(
+				ids[module_idx][query_idx], scores[module_idx][query_idx]
+			):
+				score_array[module_idx, query_idx, positions[id_]] = score
+	return candidate_ids, score_array
+
+
+def sweep_fusion(
+	ids: Tuple,
+	scores: Tuple,
+	top_k: int,
+	weights: Sequence,
+	fuse_func: Callable[[np.ndarray, np.ndarray], np.ndarray],
+) -> List[Tuple[List[List[str]], List[List[float]]]]:
+	"""
+	Fuse the retrieval results with every weight at once.
+	The candidates of each query are aligned once,
+	and the fused scores of all weights are computed as one (weights, queries, candidates) array.
+	The queries are split into chunks to bound the memory usage.
+
+	:param ids: The tuple of the retrieved ids of each module.
+	:param scores: The tuple of the retrieve scores of each module.
+	:param top_k: The number of passages to be retrieved.
+	:param weights: The weight values to fuse with.
+	:param fuse_func: The function that gets the score array shaped (modules, queries, candidates)
+	    and the weights array, and returns the fused scores shaped (weights, queries, candidates).
+	    NaN fused scores are ranked last.
+	:return: The fused ids and scores of each weight.
+	"""
+	candidate_ids, score_array = align_fusion_candidates(ids, scores)
+	weights = np.asarray(weights)
+	candidate_lens = np.array(list(map(len, candidate_ids)), dtype=np.int64)
+	max_candidate_len = score_array.shape[-1]
+	chunk_size = max(
+		1, HYBRID_SWEEP_MAX_ELEMENTS // max(1, len(weights) * max_candidate_len)
+	)
+
+	results = [([], []) for _ in range(len(weights))]
+	for start in range(0, len(candidate_ids), chunk_size):
+		end = start + chunk_size
+		fused_scores = fuse_func(score_array[:, start:end], weights)
+		# the padding is NaN, so it is ranked after every candidate
+		is_padding = np.arange(max_candidate_len) >= candidate_lens[start:end, None]
+		fused_scores[:, is_padding] = np.nan
+		# stable sort keeps the candidate order for the tied scores
+		order = np.argsort(-fused_scores, axis=-1, kind="stable")[..., :top_k]
+		top_scores = np.take_along_axis(fused_scores, order, axis=-1)
+		for weight_idx, (result_ids, result_scores) in enumerate(results):
+			for query_idx in range(order.shape[1]):
+				candidates = candidate_ids[start + query_idx]
+				result_len = min(top_k, len(candidates))
+				result_ids.append(
+					[candidates[i] for i in order[weight_idx, query_idx, :result_len]]
+				)
+				result_scores.append(
+					top_scores[weight_idx, query_idx, :result_len].tolist()
+				)
+	return results
+
+
 def get_bm25_pkl_name(bm25_tokenizer: str):
 	bm25_tokenizer = bm25_tokenizer.replace("/", "")
 	return f"bm25_{bm25_tokenizer}.pkl"
+
+
+def get_bm25_index_dir_name(bm25_tokenizer: str):
+	bm25_tokenizer = bm25_tokenizer.replace("/", "")
+	return f"bm25_{bm25_tokenizer}"
+
+
+def get_bm25_tokenizer_dir_name(bm25_tokenizer: str):
+	bm25_tokenizer = bm25_tokenizer.replace("/", "")
+	return f"bm25_tokenizer_{bm25_tokenizer}"
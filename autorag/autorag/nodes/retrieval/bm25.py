@@ -1,29 +1,60 @@
-import asyncio
+import functools
+import logging
+import multiprocessing as mp
 import os
 import pickle
 import re
-from typing import List, Dict, Tuple, Callable, Union, Iterable, Optional
+from itertools import chain
+from typing import List, Dict, Tuple, Callable, Union, Iterable, Optional, Iterator
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from llama_index.core.indices.keyword_table.utils import simple_extract_keywords
 from nltk import PorterStemmer
-from rank_bm25 import BM25Okapi
 from transformers import AutoTokenizer, PreTrainedTokenizerBase
 
 from autorag.nodes.retrieval.base import (
 	evenly_distribute_passages,
 	BaseRetrieval,
 	get_bm25_pkl_name,
+	get_bm25_index_dir_name,
+	get_bm25_tokenizer_dir_name,
+)
+from autorag.nodes.retrieval.bm25_index import (
+	BM25Index,
+	BM25RowMap,
+	append_bm25_index,
+	load_bm25_index,
+	migrate_bm25_pkl,
+	read_bm25_index_meta,
+	save_bm25_index,
 )
 from autorag.utils import validate_corpus_dataset, fetch_contents
 from autorag.utils.util import (
-	get_event_loop,
 	normalize_string,
 	result_to_dataframe,
 	pop_params,
 )
 
+logger = logging.getLogger("AutoRAG")
+
+# The number of texts that one worker process tokenizes at once.
+BM25_TOKENIZE_CHUNK_SIZE = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def _load_tokenizer_instance(tokenizer_class):
+	# Tokenizer instances such as Kiwi and Okt load the model or the JVM when created,
+	# so they are created once per process and reused across the calls.
+	return tokenizer_class()
+
+
+@functools.lru_cache(maxsize=None)
+def _load_sudachipy_tokenizer(dictionary_class):
+	return dictionary_class(dict="core").create()
+
 
 def tokenize_ko_kiwi(texts: List[str]) -> List[List[str]]:
 	try:
@@ -35,7 +66,7 @@ def tokenize_ko_kiwi(texts: List[str]) -> List[List[str]]:
 			"Or install Korean version of AutoRAG by running 'pip install AutoRAG[ko]'."
 		)
 	texts = list(map(lambda x: x.strip().lower(), texts))
-	kiwi = Kiwi()
+	kiwi = _load_tokenizer_instance(Kiwi)
 	tokenized_list: Iterable[List[Token]] = kiwi.tokenize(texts)
 	return [list(map(lambda x: x.form, token_list)) for token_list in tokenized_list]
 
@@ -49,7 +80,7 @@ def tokenize_ko_kkma(texts: List[str]) -> List[List[str]]:
 			"Please install konlpy by running 'pip install konlpy'. "
 			"Or install Korean version of AutoRAG by running 'pip install AutoRAG[ko]'."
 		)
-	tokenizer = Kkma()
+	tokenizer = _load_tokenizer_instance(Kkma)
 	tokenized_list: List[List[str]] = list(map(lambda x: tokenizer.morphs(x), texts))
 	return tokenized_list
 
@@ -63,7 +94,7 @@ def tokenize_ko_okt(texts: List[str]) -> List[List[str]]:
 			"Please install konlpy by running 'pip install konlpy'. "
 			"Or install Korean version of AutoRAG by running 'pip install AutoRAG[ko]'."
 		)
-	tokenizer = Okt()
+	tokenizer = _load_tokenizer_instance(Okt)
 	tokenized_list: List[List[str]] = list(map(lambda x: tokenizer.morphs(x), texts))
 	return tokenized_list
 
@@ -74,7 +105,7 @@ def tokenize_porter_stemmer(texts: List[str]) -> List[List[str]]:
 		words = list(simple_extract_keywords(text))
 		return [stemmer.stem(word) for word in words]
 
-	stemmer = PorterStemmer()
+	stemmer = _load_tokenizer_instance(PorterStemmer)
 	tokenized_list: List[List[str]] = list(
 		map(lambda x: tokenize_remove_stopword(x, stemmer), texts)
 	)
@@ -107,7 +138,7 @@ def tokenize_ja_sudachipy(texts: List[str]) -> List[List[str]]:
 		)
 
 	# Initialize SudachiPy with the default tokenizer
-	tokenizer_obj = dictionary.Dictionary(dict="core").create()
+	tokenizer_obj = _load_sudachipy_tokenizer(dictionary.Dictionary)
 
 	# Choose the tokenizer mode: NORMAL, SEARCH, A
 	mode = tokenizer.Tokenizer.SplitMode.A
@@ -150,25 +181,65 @@ class BM25(BaseRetrieval):
 		bm25_tokenizer = kwargs.get("bm25_tokenizer", None)
 		if bm25_tokenizer is None:
 			bm25_tokenizer = "porter_stemmer"
+		bm25_index_dir = os.path.join(
+			self.resources_dir, get_bm25_index_dir_name(bm25_tokenizer)
+		)
 		bm25_path = os.path.join(self.resources_dir, get_bm25_pkl_name(bm25_tokenizer))
 
-		assert (
-			bm25_path is not None
-		), "bm25_path must be specified for using bm25 retrieval."
-		assert os.path.exists(
-			bm25_path
-		), f"bm25_path {bm25_path} does not exist. Please ingest first."
-
-		self.bm25_corpus = load_bm25_corpus(bm25_path)
-		assert (
-			"tokens" and "passage_id" in list(self.bm25_corpus.keys())
-		), "bm25_corpus must contain tokens and passage_id. Please check you ingested bm25 corpus correctly."
-		self.tokenizer = select_bm25_tokenizer(bm25_tokenizer)
+		if read_bm25_index_meta(bm25_index_dir) is not None:
+			self.bm25_instance, self.bm25_corpus = load_bm25_index(bm25_index_dir)
+		else:
+			assert os.path.exists(
+				bm25_path
+			), f"bm25 index {bm25_index_dir} does not exist. Please ingest first."
+			logger.warning(
+				f"Loading the legacy bm25 corpus {bm25_path}. "
+				f"It is slow to load, so please migrate it to the bm25 index with "
+				f"'autorag migrate_bm25' command."
+			)
+			self.bm25_corpus = load_bm25_corpus(bm25_path)
+			assert (
+				"tokens" and "passage_id" in list(self.bm25_corpus.keys())
+			), "bm25_corpus must contain tokens and passage_id. Please check you ingested bm25 corpus correctly."
+			self.bm25_instance = BM25Index.from_tokens(
+				self.bm25_corpus["tokens"], self.bm25_corpus["passage_id"]
+			)
+			self.bm25_corpus["passage_id"] = self.bm25_instance.passage_ids
+			self.bm25_corpus["passage_row_map"] = BM25RowMap(
+				self.bm25_instance.passage_ids
+			)
+
+		# the tokenizer that is saved at the resources loads without the download
+		tokenizer_dir = os.path.join(
+			self.resources_dir, get_bm25_tokenizer_dir_name(bm25_tokenizer)
+		)
+		self.tokenizer = select_bm25_tokenizer(
+			tokenizer_dir if os.path.isdir(tokenizer_dir) else bm25_tokenizer
+		)
 		assert self.bm25_corpus["tokenizer_name"] == bm25_tokenizer, (
 			f"The bm25 corpus tokenizer is {self.bm25_corpus['tokenizer_name']}, but your input is {bm25_tokenizer}. "
-			f"You need to ingest again. Delete bm25 pkl file and re-ingest it."
+			f"You need to ingest again. Delete bm25 index directory and re-ingest it."
+		)
+
+	def save_index(self, resources_dir: str):
+		"""
+		Save the loaded BM25 index and its tokenizer to the resources directory.
+		The index is saved as the memory-mapped BM25 index directory,
+		even when it is loaded from the legacy bm25 corpus pickle file.
+		The huggingface tokenizer is saved with its vocab files, so it loads without the download.
+
+		:param resources_dir: The resources directory to save.
+		"""
+		tokenizer_name = self.bm25_corpus["tokenizer_name"]
+		save_bm25_index(
+			os.path.join(resources_dir, get_bm25_index_dir_name(tokenizer_name)),
+			self.bm25_instance,
+			tokenizer_name,
 		)
-		self.bm25_instance = BM25Okapi(self.bm25_corpus["tokens"])
+		if isinstance(self.tokenizer, PreTrainedTokenizerBase):
+			self.tokenizer.save_pretrained(
+				os.path.join(resources_dir, get_bm25_tokenizer_dir_name(tokenizer_name))
+			)
 
 	@result_to_dataframe(["retrieved_contents", "retrieved_ids", "retrieve_scores"])
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
@@ -186,7 +257,7 @@ class BM25(BaseRetrieval):
 	) -> Tuple[List[List[str]], List[List[float]]]:
 		"""
 		BM25 retrieval function.
-		You have to load a pickle file that is already ingested.
+		You have to load a bm25 index that is already ingested.
 
 		:param queries: 2-d list of query strings.
 		    Each element of the list is a query strings of each row.
@@ -213,26 +284,13 @@ class BM25(BaseRetrieval):
 			)
 			return ids, score_result
 
-		# run async bm25_pure function
-		tasks = [
-			bm25_pure(
-				input_queries,
-				top_k,
-				self.tokenizer,
-				self.bm25_instance,
-				self.bm25_corpus,
-			)
-			for input_queries in queries
-		]
-		loop = get_event_loop()
-		results = loop.run_until_complete(asyncio.gather(*tasks))
-		id_result = list(map(lambda x: x[0], results))
-		score_result = list(map(lambda x: x[1], results))
-		return id_result, score_result
+		return bm25_pure_batch(
+			queries, top_k, self.tokenizer, self.bm25_instance, self.bm25_corpus
+		)
 
 
 async def bm25_pure(
-	queries: List[str], top_k: int, tokenizer, bm25_api: BM25Okapi, bm25_corpus: Dict
+	queries: List[str], top_k: int, tokenizer, bm25_api: BM25Index, bm25_corpus: Dict
 ) -> Tuple[List[str], List[float]]:
 	"""
 	Async BM25 retrieval function.
@@ -241,15 +299,16 @@ async def bm25_pure(
 	:param queries: A list of query strings.
 	:param top_k: The number of passages to be retrieved.
 	:param tokenizer: A tokenizer that will be used to tokenize queries.
-	:param bm25_api: A bm25 api instance that will be used to retrieve passages.
+	:param bm25_api: A bm25 index instance that will be used to retrieve passages.
 	:param bm25_corpus: A dictionary containing the bm25 corpus, which is doc_id from corpus and tokenized corpus.
 	    Its data structure looks like this:
 
 	    .. Code:: python
 
 	        {
-	            "tokens": [], # 2d list of tokens
-	            "passage_id": [], # 2d list of passage_id. Type must be str.
+	            "passage_id": pa.ChunkedArray, # passage_id of each passage in the index. Type must be str.
+	            "passage_row_map": BM25RowMap, # passage_id to the row index of the index.
+	            "tokenizer_name": str, # the tokenizer name that is used to ingest.
 	        }
 	:return: The tuple contains a list of passage ids that retrieved from bm25 and its scores.
 	"""
@@ -258,13 +317,67 @@ async def bm25_pure(
 	id_result = []
 	score_result = []
 	for query in tokenized_queries:
-		scores = bm25_api.get_scores(query)
-		sorted_scores = sorted(scores, reverse=True)
-		top_n_index = np.argsort(scores)[::-1][:top_k]
-		ids = [bm25_corpus["passage_id"][i] for i in top_n_index]
+		top_n_index, top_n_scores = bm25_api.get_top_k(query, top_k)
+		ids = bm25_corpus["passage_id"].take(top_n_index).to_pylist()
 		id_result.append(ids)
-		score_result.append(sorted_scores[:top_k])
+		score_result.append(top_n_scores.tolist())
+	return merge_query_results(id_result, score_result, top_k)
+
+
+def bm25_pure_batch(
+	queries: List[List[str]],
+	top_k: int,
+	tokenizer,
+	bm25_api: BM25Index,
+	bm25_corpus: Dict,
+) -> Tuple[List[List[str]], List[List[float]]]:
+	"""
+	BM25 retrieval function for all rows at once.
+	The queries of all rows are tokenized together and scored with one sparse matrix multiplication.
 
+	:param queries: 2-d list of query strings.
+	    Each element of the list is a query strings of each row.
+	:param top_k: The number of passages to be retrieved.
+	:param tokenizer: A tokenizer that will be used to tokenize queries.
+	:param bm25_api: A bm25 index instance that will be used to retrieve passages.
+	:param bm25_corpus: A dictionary containing the bm25 corpus. See ``bm25_pure``.
+	:return: The 2-d list contains a list of passage ids that retrieved from bm25 and 2-d list of its scores.
+	"""
+	flatten_queries = list(chain.from_iterable(queries))
+	if len(flatten_queries) == 0:
+		return [[] for _ in queries], [[] for _ in queries]
+	top_n_indices, top_n_scores = bm25_api.get_batch_top_k(
+		tokenize(flatten_queries, tokenizer), top_k
+	)
+	passage_ids = bm25_corpus["passage_id"]
+
+	id_result, score_result = [], []
+	query_start = 0
+	for query_list in queries:
+		query_end = query_start + len(query_list)
+		row_ids = [
+			passage_ids.take(indices).to_pylist()
+			for indices in top_n_indices[query_start:query_end]
+		]
+		row_scores = [scores.tolist() for scores in top_n_scores[query_start:query_end]]
+		row_ids, row_scores = merge_query_results(row_ids, row_scores, top_k)
+		id_result.append(row_ids)
+		score_result.append(row_scores)
+		query_start = query_end
+	return id_result, score_result
+
+
+def merge_query_results(
+	id_result: List[List[str]], score_result: List[List[float]], top_k: int
+) -> Tuple[List[str], List[float]]:
+	"""
+	Merge the results of the multiple queries in one row to the top_k result.
+
+	:param id_result: The retrieved passage ids of each query.
+	:param score_result: The scores of each query.
+	:param top_k: The number of passages to be retrieved.
+	:return: The merged passage ids and scores, sorted by score in descending order.
+	"""
 	# make a total result to top_k
 	id_result, score_result = evenly_distribute_passages(id_result, score_result, top_k)
 	# sort id_result and score_result by score
@@ -282,19 +395,31 @@ def get_bm25_scores(
 	queries: List[str],
 	ids: List[str],
 	tokenizer,
-	bm25_api: BM25Okapi,
+	bm25_api: BM25Index,
 	bm25_corpus: Dict,
 ) -> List[float]:
+	"""
+	Get the BM25 scores of the given passage ids.
+	Only the given passages are scored, and the maximum score of the queries is returned.
+
+	:param queries: A list of query strings.
+	:param ids: The passage ids to score.
+	:param tokenizer: A tokenizer that will be used to tokenize queries.
+	:param bm25_api: A bm25 index instance.
+	:param bm25_corpus: A dictionary containing the bm25 corpus.
+	    It uses 'passage_row_map' to find the rows of the ids.
+	:return: The score of each passage id.
+	:raises ValueError: When some passage ids are not in the bm25 index.
+	"""
 	if len(ids) == 0 or not bool(ids):
 		return []
+	row_map = bm25_corpus.get("passage_row_map")
+	if row_map is None:
+		row_map = BM25RowMap(bm25_corpus["passage_id"])
+	rows = row_map.get_rows(ids)
 	tokenized_queries = tokenize(queries, tokenizer)
-	result_dict = {id_: [] for id_ in ids}
-	for query in tokenized_queries:
-		scores = bm25_api.get_scores(query)
-		for i, id_ in enumerate(ids):
-			result_dict[id_].append(scores[bm25_corpus["passage_id"].index(id_)])
-	result_df = pd.DataFrame(result_dict)
-	return result_df.max(axis=0).tolist()
+	scores = [bm25_api.get_scores_by_rows(query, rows) for query in tokenized_queries]
+	return np.max(scores, axis=0).tolist()
 
 
 def tokenize(queries: List[str], tokenizer) -> List[List[int]]:
@@ -305,57 +430,123 @@ def tokenize(queries: List[str], tokenizer) -> List[List[int]]:
 	return tokenized_queries
 
 
+def iter_tokenize_parallel(
+	texts: List[str],
+	bm25_tokenizer: str,
+	num_workers: Optional[int] = None,
+	chunk_size: int = BM25_TOKENIZE_CHUNK_SIZE,
+) -> Iterator[List[List[Union[int, str]]]]:
+	"""
+	Tokenize the texts with the process pool.
+	The texts are split into the chunks, and each worker process tokenizes a chunk
+	with its own cached tokenizer instance.
+	The tokenized chunks are yielded in the order of the texts as soon as they are ready.
+	When the texts fit in one chunk, they are tokenized in the current process.
+
+	:param texts: The texts to tokenize.
+	:param bm25_tokenizer: The tokenizer name. The name of BM25_TOKENIZER or huggingface tokenizer.
+	:param num_workers: The number of worker processes.
+	    Default is None, which tokenizes in the current process.
+	    The worker processes are spawned, so the script that calls it with more than one worker
+	    must guard its entry point with ``if __name__ == "__main__":``.
+	:param chunk_size: The number of texts in each chunk.
+	    Default is BM25_TOKENIZE_CHUNK_SIZE.
+	:return: The iterator of the tokenized chunks.
+	"""
+	num_workers = num_workers or 1
+	chunks = [texts[i : i + chunk_size] for i in range(0, len(texts), chunk_size)]
+	if num_workers <= 1 or len(chunks) <= 1:
+		tokenizer = select_bm25_tokenizer(bm25_tokenizer)
+		for chunk in chunks:
+			yield tokenize(chunk, tokenizer)
+		return
+
+	# spawn the workers, because the forked process can not use the JVM of konlpy
+	# or the threads that are already running in the parent process.
+	with mp.get_context("spawn").Pool(min(num_workers, len(chunks))) as pool:
+		yield from pool.imap(
+			_tokenize_chunk, [(chunk, bm25_tokenizer) for chunk in chunks]
+		)
+
+
+def tokenize_parallel(
+	texts: List[str],
+	bm25_tokenizer: str,
+	num_workers: Optional[int] = None,
+	chunk_size: int = BM25_TOKENIZE_CHUNK_SIZE,
+) -> List[List[Union[int, str]]]:
+	"""
+	Tokenize the texts with the process pool.
+	See ``iter_tokenize_parallel`` for the details.
+
+	:return: The tokens of each text.
+	"""
+	return list(
+		chain.from_iterable(
+			iter_tokenize_parallel(texts, bm25_tokenizer, num_workers, chunk_size)
+		)
+	)
+
+
+def _tokenize_chunk(args: Tuple[List[str], str]) -> List[List[Union[int, str]]]:
+	texts, bm25_tokenizer = args
+	return tokenize(texts, select_bm25_tokenizer(bm25_tokenizer))
+
+
 def bm25_ingest(
-	corpus_path: str, corpus_data: pd.DataFrame, bm25_tokenizer: str = "porter_stemmer"
+	index_dir: str,
+	corpus_data: pd.DataFrame,
+	bm25_tokenizer: str = "porter_stemmer",
+	num_workers: Optional[int] = None,
 ):
-	if not corpus_path.endswith(".pkl"):
-		raise ValueError(f"Corpus path {corpus_path} is not a pickle file.")
+	"""
+	Ingest the corpus data to the bm25 index.
+	The passages that already exist in the index are skipped.
+	If there is a legacy ``.pkl`` bm25 corpus next to the index directory,
+	it is migrated to the index first.
+
+	:param index_dir: The bm25 index directory path.
+	:param corpus_data: The corpus dataframe to ingest.
+	:param bm25_tokenizer: The tokenizer name that is used to the BM25.
+	    Default is porter_stemmer.
+	:param num_workers: The number of processes to tokenize the corpus.
+	    Default is None, which tokenizes in the current process.
+	"""
+	if index_dir.endswith(".pkl"):
+		raise ValueError(
+			f"BM25 index path {index_dir} is a pickle file. "
+			f"BM25 corpus is ingested to the bm25 index directory."
+		)
 	validate_corpus_dataset(corpus_data)
-	ids = corpus_data["doc_id"].tolist()
-
-	# Initialize bm25_corpus
-	bm25_corpus = pd.DataFrame()
-
-	# Load the BM25 corpus if it exists and get the passage ids
-	if os.path.exists(corpus_path) and os.path.getsize(corpus_path) > 0:
-		with open(corpus_path, "rb") as r:
-			corpus = pickle.load(r)
-			bm25_corpus = pd.DataFrame.from_dict(corpus)
-		duplicated_passage_rows = bm25_corpus[bm25_corpus["passage_id"].isin(ids)]
-		new_passage = corpus_data[
-			~corpus_data["doc_id"].isin(duplicated_passage_rows["passage_id"])
-		]
+	index_dir = index_dir.rstrip(os.sep)
+	legacy_pkl_path = f"{index_dir}.pkl"
+	if read_bm25_index_meta(index_dir) is None and os.path.exists(legacy_pkl_path):
+		migrate_bm25_pkl(legacy_pkl_path, index_dir)
+
+	index_exists = read_bm25_index_meta(index_dir) is not None
+	if index_exists:
+		_, bm25_corpus = load_bm25_index(index_dir)
+		is_ingested = pc.is_in(
+			pa.array(corpus_data["doc_id"].tolist(), type=pa.string()),
+			value_set=bm25_corpus["passage_id"].combine_chunks(),
+		)
+		new_passage = corpus_data[~is_ingested.to_numpy(zero_copy_only=False)]
 	else:
 		new_passage = corpus_data
 
 	if not new_passage.empty:
-		tokenizer = select_bm25_tokenizer(bm25_tokenizer)
-		if isinstance(tokenizer, PreTrainedTokenizerBase):
-			tokenized_corpus = tokenizer(new_passage["contents"].tolist()).input_ids
-		else:
-			tokenized_corpus = tokenizer(new_passage["contents"].tolist())
-		new_bm25_corpus = pd.DataFrame(
-			{
-				"tokens": tokenized_corpus,
-				"passage_id": new_passage["doc_id"].tolist(),
-			}
+		tokenized_corpus = tokenize_parallel(
+			new_passage["contents"].tolist(), bm25_tokenizer, num_workers
 		)
-
-		if not bm25_corpus.empty:
-			bm25_corpus_updated = pd.concat(
-				[bm25_corpus, new_bm25_corpus], ignore_index=True
-			)
-			bm25_dict = bm25_corpus_updated.to_dict("list")
+		passage_ids = new_passage["doc_id"].tolist()
+		if index_exists:
+			append_bm25_index(index_dir, tokenized_corpus, passage_ids)
 		else:
-			bm25_dict = new_bm25_corpus.to_dict("list")
-
-		# add tokenizer name to bm25_dict
-		bm25_dict["tokenizer_name"] = bm25_tokenizer
-
-		with open(corpus_path, "wb") as w:
-			pickle.dump(bm25_dict, w)
+			bm25_index = BM25Index.from_tokens(tokenized_corpus, passage_ids)
+			save_bm25_index(index_dir, bm25_index, bm25_tokenizer)
 
 
+@functools.lru_cache(maxsize=None)
 def select_bm25_tokenizer(
 	bm25_tokenizer: str,
 ) -> Callable[[str], List[Union[int, str]]]:
@@ -0,0 +1,1012 @@
+import bisect
+import json
+import logging
+import math
+import os
+import pickle
+import shutil
+import threading
+import uuid
+from typing import List, Dict, Tuple, Union, Hashable, Optional, Iterator
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from scipy import sparse
+
+logger = logging.getLogger("AutoRAG")
+
+BM25_INDEX_FORMAT_VERSION = 2
+BM25_INDEX_META_FILE = "meta.json"
+BM25_SEGMENT_ARRAYS = ("terms", "indptr", "postings", "term_freqs", "doc_len")
+BM25_STATS_ARRAYS = ("doc_freqs", "idf")
+# The saved index is compacted at the background when it has more segments than this.
+BM25_MAX_SEGMENTS = 8
+
+_index_locks = {}
+_compacting_dirs = set()
+_index_locks_guard = threading.Lock()
+
+
+class BM25Vocab:
+	def __init__(self, sorted_tokens: pa.Array, term_ids: np.ndarray):
+		"""
+		Read-only token to term id mapping over the memory-mapped vocab table.
+		The tokens are sorted, so a token is found by the binary search
+		without building a python dictionary of the whole vocab when the index is opened.
+
+		:param sorted_tokens: The sorted tokens.
+		:param term_ids: The term id of each sorted token.
+		"""
+		self._tokens = _ArrowSequence(sorted_tokens)
+		self._term_ids = term_ids
+
+	def __len__(self) -> int:
+		return len(self._term_ids)
+
+	def get(self, token, default=None):
+		try:
+			position = bisect.bisect_left(self._tokens, token)
+		except TypeError:  # the token type is different with the vocab
+			return default
+		if position < len(self._tokens) and self._tokens[position] == token:
+			return int(self._term_ids[position])
+		return default
+
+	def keys(self) -> List[Union[str, int]]:
+		"""
+		:return: The tokens in the order of the term id.
+		"""
+		return self._tokens.array.take(np.argsort(self._term_ids)).to_pylist()
+
+	def items(self) -> Iterator[Tuple[Union[str, int], int]]:
+		return zip(self.keys(), range(len(self)))
+
+
+class _ArrowSequence:
+	def __init__(self, array: pa.Array):
+		self.array = array
+
+	def __len__(self) -> int:
+		return len(self.array)
+
+	def __getitem__(self, i):
+		return self.array[i].as_py()
+
+
+class BM25Segment:
+	def __init__(
+		self,
+		terms: np.ndarray,
+		indptr: np.ndarray,
+		postings: np.ndarray,
+		term_freqs: np.ndarray,
+		doc_len: np.ndarray,
+		passage_ids: Optional[pa.Array] = None,
+		name: Optional[str] = None,
+	):
+		"""
+		A part of the BM25 index that holds the postings of the contiguous passages.
+		The postings of the term ``terms[i]`` are ``postings[indptr[i]:indptr[i + 1]]``,
+		which are the passage indices inside the segment, with the matching ``term_freqs``.
+
+		:param terms: The sorted term ids that appear in the segment.
+		:param indptr: The CSR index pointer array. Its length is ``len(terms) + 1``.
+		:param postings: The passage indices of each term.
+		:param term_freqs: The term frequency of each posting.
+		:param doc_len: The token count of each passage.
+		:param passage_ids: The passage id of each passage. Default is None.
+		:param name: The directory name of the saved segment.
+		    It is None when the segment is not saved yet.
+		"""
+		self.terms = terms
+		self.indptr = indptr
+		self.postings = postings
+		self.term_freqs = term_freqs
+		self.doc_len = doc_len
+		self.passage_ids = passage_ids
+		self.name = name
+
+	@property
+	def corpus_size(self) -> int:
+		return len(self.doc_len)
+
+	@classmethod
+	def from_tokens(
+		cls,
+		tokens: List[List[Union[str, int]]],
+		vocab: Dict[Hashable, int],
+		passage_ids: Optional[List[str]] = None,
+	) -> "BM25Segment":
+		"""
+		Build a segment from the tokenized passages.
+
+		:param tokens: 2-d list of tokens. Each element is the tokens of one passage.
+		:param vocab: The dictionary that maps a token to its term id.
+		    The new tokens are added to it in place.
+		:param passage_ids: The passage id of each passage. Default is None.
+		:return: The BM25Segment instance.
+		"""
+		pair_terms, postings, term_freqs, doc_len = tokens_to_postings(tokens, vocab)
+		terms, term_counts = np.unique(pair_terms, return_counts=True)
+		return cls(
+			terms,
+			_counts_to_indptr(term_counts),
+			postings,
+			term_freqs,
+			doc_len,
+			passage_ids=_to_passage_id_array(passage_ids),
+		)
+
+	@classmethod
+	def merge(cls, segments: List["BM25Segment"]) -> "BM25Segment":
+		"""
+		Merge the segments to one segment, keeping the order of the passages.
+
+		:param segments: The segments to merge.
+		:return: The merged BM25Segment instance.
+		"""
+		pair_terms = np.concatenate(
+			[np.repeat(seg.terms, np.diff(seg.indptr)) for seg in segments]
+		)
+		offsets = np.cumsum([0] + [seg.corpus_size for seg in segments])
+		postings = np.concatenate(
+			[seg.postings + offset for seg, offset in zip(segments, offsets)]
+		)
+		term_freqs = np.concatenate([seg.term_freqs for seg in segments])
+		# stable sort keeps the earlier passages before the later passages in each term
+		order = np.argsort(pair_terms, kind="stable")
+		terms, term_counts = np.unique(pair_terms, return_counts=True)
+		passage_ids = None
+		if all(seg.passage_ids is not None for seg in segments):
+			passage_ids = pa.concat_arrays([seg.passage_ids for seg in segments])
+		return cls(
+			terms,
+			_counts_to_indptr(term_counts),
+			postings[order],
+			term_freqs[order],
+			np.concatenate([seg.doc_len for seg in segments]),
+			passage_ids=passage_ids,
+		)
+
+	def get_postings(self, term_id: int) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+		"""
+		:param term_id: The term id.
+		:return: The passage indices and term frequencies of the term.
+		    It is None when the term does not appear in the segment.
+		"""
+		position = np.searchsorted(self.terms, term_id)
+		if position == len(self.terms) or self.terms[position] != term_id:
+			return None
+		start, end = self.indptr[position], self.indptr[position + 1]
+		return self.postings[start:end], self.term_freqs[start:end]
+
+	def doc_freqs(self, vocab_size: int) -> np.ndarray:
+		"""
+		:param vocab_size: The size of the whole vocab.
+		:return: The number of passages in the segment that contain each term.
+		"""
+		doc_freqs = np.zeros(vocab_size, dtype=np.int64)
+		doc_freqs[self.terms] = np.diff(self.indptr)
+		return doc_freqs
+
+
+class BM25Index:
+	def __init__(
+		self,
+		vocab: Union[Dict[Hashable, int], BM25Vocab],
+		doc_freqs: np.ndarray,
+		segments: List[BM25Segment],
+		k1: float = 1.5,
+		b: float = 0.75,
+		epsilon: float = 0.25,
+		idf: Optional[np.ndarray] = None,
+	):
+		"""
+		Sparse inverted index for Okapi BM25.
+		The passages are stored in the append-only segments,
+		and the corpus statistics (vocab, document frequency, and idf) are shared by the segments.
+		Only the postings of the query tokens are touched at query time,
+		instead of scanning the whole corpus like ``rank_bm25.BM25Okapi.get_scores``.
+		The scores are the same as ``BM25Okapi`` with the same k1, b, and epsilon
+		that is built with the passages of all segments in order.
+
+		:param vocab: The dictionary (or BM25Vocab) that maps a token to its term id.
+		    The term ids must follow the order of the first appearance in the corpus.
+		:param doc_freqs: The number of passages that contain each term.
+		:param segments: The segments in the order of the passages.
+		:param k1: The BM25 k1 parameter. Default is 1.5.
+		:param b: The BM25 b parameter. Default is 0.75.
+		:param epsilon: The floor ratio of the average idf for negative idf terms.
+		    Default is 0.25.
+		:param idf: The pre-computed idf of each term.
+		    It is computed from the doc_freqs when it is None.
+		"""
+		self.vocab = vocab
+		self.doc_freqs = doc_freqs
+		self.segments = segments
+		self.k1 = k1
+		self.b = b
+		self.epsilon = epsilon
+		# The directory name of the saved corpus statistics. None when it is not saved yet.
+		self.stats_name = None
+		# The BM25-weighted term-passage matrix for the batch scoring. It is built lazily.
+		self._term_doc_matrix: Optional[sparse.csr_matrix] = None
+
+		segment_sizes = [seg.corpus_size for seg in segments]
+		self.offsets = np.cumsum([0] + segment_sizes)[:-1]
+		self.corpus_size = sum(segment_sizes)
+		self.avgdl = sum(int(seg.doc_len.sum()) for seg in segments) / self.corpus_size
+		self.idf = self._calc_idf(doc_freqs) if idf is None else idf
+
+	@classmethod
+	def from_tokens(
+		cls,
+		tokens: List[List[Union[str, int]]],
+		passage_ids: Optional[List[str]] = None,
+		**kwargs,
+	) -> "BM25Index":
+		"""
+		Build a BM25 index from the tokenized passages.
+
+		:param tokens: 2-d list of tokens. Each element is the tokens of one passage.
+		:param passage_ids: The passage id of each passage. Default is None.
+		:param kwargs: The BM25 parameters (k1, b, epsilon).
+		:return: The BM25Index instance.
+		"""
+		vocab = {}
+		segment = BM25Segment.from_tokens(tokens, vocab, passage_ids)
+		return cls(vocab, segment.doc_freqs(len(vocab)), [segment], **kwargs)
+
+	def add_tokens(
+		self,
+		tokens: List[List[Union[str, int]]],
+		passage_ids: Optional[List[str]] = None,
+	) -> "BM25Index":
+		"""
+		Make a new BM25 index that has the new passages as a delta segment.
+		The existing segments are shared without copying,
+		and the document frequency and idf are updated with the delta segment only.
+		The scores are the same as building the index with the whole tokens at once.
+
+		:param tokens: 2-d list of tokens of the new passages.
+		:param passage_ids: The passage id of each new passage. Default is None.
+		:return: The new BM25Index instance.
+		"""
+		vocab = dict(self.vocab.items())
+		segment = BM25Segment.from_tokens(tokens, vocab, passage_ids)
+		doc_freqs = segment.doc_freqs(len(vocab))
+		doc_freqs[: len(self.doc_freqs)] += self.doc_freqs
+		return BM25Index(
+			vocab,
+			doc_freqs,
+			self.segments + [segment],
+			k1=self.k1,
+			b=self.b,
+			epsilon=self.epsilon,
+		)
+
+	def compact(self) -> "BM25Index":
+		"""
+		Make a new BM25 index that merges all segments to one segment.
+		The corpus statistics are not changed, so the scores are the same.
+
+		:return: The new BM25Index instance.
+		"""
+		index = BM25Index(
+			self.vocab,
+			self.doc_freqs,
+			[BM25Segment.merge(self.segments)],
+			k1=self.k1,
+			b=self.b,
+			epsilon=self.epsilon,
+			idf=self.idf,
+		)
+		index.stats_name = self.stats_name
+		return index
+
+	@property
+	def passage_ids(self) -> Optional[pa.ChunkedArray]:
+		"""
+		:return: The passage ids of all segments in order.
+		    It is None when some segments do not have the passage ids.
+		"""
+		if any(seg.passage_ids is None for seg in self.segments):
+			return None
+		return pa.chunked_array(
+			[seg.passage_ids for seg in self.segments], type=pa.string()
+		)
+
+	def _calc_idf(self, doc_freqs: np.ndarray) -> np.ndarray:
+		# Loop in the python float to keep the same rounding with BM25Okapi.
+		idf = np.zeros(len(doc_freqs), dtype=np.float64)
+		idf_sum = 0.0
+		negative_idfs = []
+		for term_id, freq in enumerate(doc_freqs.tolist()):
+			term_idf = math.log(self.corpus_size - freq + 0.5) - math.log(freq + 0.5)
+			idf[term_id] = term_idf
+			idf_sum += term_idf
+			if term_idf < 0:
+				negative_idfs.append(term_id)
+		if len(idf) > 0:
+			average_idf = idf_sum / len(idf)
+			idf[negative_idfs] = self.epsilon * average_idf
+		return idf
+
+	def _calc_weights(
+		self,
+		term_id: Union[int, np.ndarray],
+		term_freqs: np.ndarray,
+		doc_len: np.ndarray,
+	) -> np.ndarray:
+		"""
+		Compute the BM25 score of the term (or the term of each posting) in each posting passage.
+		The weights are not saved to the index files, because the idf and avgdl
+		of the old segments are changed whenever the new segment is appended.
+		"""
+		norms = self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
+		term_freqs = term_freqs.astype(np.float64)
+		return self.idf[term_id] * (term_freqs * (self.k1 + 1) / (term_freqs + norms))
+
+	def get_scores(self, query: List[Union[str, int]]) -> np.ndarray:
+		"""
+		Get the BM25 scores of all passages for the tokenized query.
+
+		:param query: The tokenized query.
+		:return: The score array. Its length is the corpus size.
+		"""
+		scores = np.zeros(self.corpus_size, dtype=np.float64)
+		for token in query:
+			term_id = self.vocab.get(token)
+			if term_id is None:
+				continue
+			for segment, offset in zip(self.segments, self.offsets):
+				segment_postings = segment.get_postings(term_id)
+				if segment_postings is None:
+					continue
+				postings, term_freqs = segment_postings
+				scores[postings + offset] += self._calc_weights(
+					term_id, term_freqs, segment.doc_len[postings]
+				)
+		return scores
+
+	def get_scores_by_rows(
+		self, query: List[Union[str, int]], rows: np.ndarray
+	) -> np.ndarray:
+		"""
+		Get the BM25 scores of the given passage rows only.
+		Each row is looked up in the postings of the query tokens with the binary search,
+		so the cost does not depend on the corpus size.
+		The scores are the same as ``get_scores(query)[rows]``.
+
+		:param query: The tokenized query.
+		:param rows: The passage row indices in the index.
+		:return: The score array. Its length is the same as rows.
+		"""
+		rows = np.asarray(rows, dtype=np.int64)
+		scores = np.zeros(len(rows), dtype=np.float64)
+		segment_ends = self.offsets + [seg.corpus_size for seg in self.segments]
+		segment_masks = [
+			(rows >= start) & (rows < end)
+			for start, end in zip(self.offsets, segment_ends)
+		]
+		for token in query:
+			term_id = self.vocab.get(token)
+			if term_id is None:
+				continue
+			for segment, offset, mask in zip(
+				self.segments, self.offsets, segment_masks
+			):
+				segment_postings = segment.get_postings(term_id)
+				if segment_postings is None or not mask.any():
+					continue
+				postings, term_freqs = segment_postings
+				score_positions = np.flatnonzero(mask)
+				local_rows = rows[score_positions] - offset
+				positions = np.searchsorted(postings, local_rows)
+				positions[positions == len(postings)] = 0
+				found = postings[positions] == local_rows
+				score_positions, local_rows = score_positions[found], local_rows[found]
+				# The same row can be requested more than once, so add with np.add.at.
+				np.add.at(
+					scores,
+					score_positions,
+					self._calc_weights(
+						term_id,
+						term_freqs[positions[found]],
+						segment.doc_len[local_rows],
+					),
+				)
+		return scores
+
+	@property
+	def term_doc_matrix(self) -> sparse.csr_matrix:
+		"""
+		The sparse matrix of the BM25 score of each term in each passage.
+		Its shape is (vocab size, corpus size).
+		It is built at the first access, and the index is not changed after that,
+		because ``add_tokens`` and ``compact`` make a new index.
+		"""
+		if self._term_doc_matrix is None:
+			posting_terms, posting_docs, weights = [], [], []
+			for segment, offset in zip(self.segments, self.offsets):
+				terms = np.repeat(np.asarray(segment.terms), np.diff(segment.indptr))
+				postings = np.asarray(segment.postings)
+				posting_terms.append(terms)
+				posting_docs.append(postings + offset)
+				weights.append(
+					self._calc_weights(
+						terms, segment.term_freqs, segment.doc_len[postings]
+					)
+				)
+			self._term_doc_matrix = sparse.csr_matrix(
+				(
+					np.concatenate(weights),
+					(np.concatenate(posting_terms), np.concatenate(posting_docs)),
+				),
+				shape=(len(self.vocab), self.corpus_size),
+			)
+		return self._term_doc_matrix
+
+	def get_batch_scores(
+		self, queries: List[List[Union[str, int]]]
+	) -> sparse.csr_matrix:
+		"""
+		Get the BM25 scores of all passages for many tokenized queries at once.
+		The query-term count matrix is multiplied with ``term_doc_matrix``,
+		so it is one sparse matrix multiplication instead of the python loop of each query.
+		The scores can be different from ``get_scores`` in the last bits of float,
+		because the terms are summed in the different order.
+
+		:param queries: The tokenized queries.
+		:return: The sparse score matrix. Its shape is (query count, corpus size).
+		    The passages that have none of the query tokens are not stored.
+		"""
+		query_rows, query_terms = [], []
+		for row, query in enumerate(queries):
+			for token in query:
+				term_id = self.vocab.get(token)
+				if term_id is not None:
+					query_rows.append(row)
+					query_terms.append(term_id)
+		# the duplicated tokens are summed, which is the same as adding the term score twice
+		query_matrix = sparse.csr_matrix(
+			(np.ones(len(query_rows)), (query_rows, query_terms)),
+			shape=(len(queries), len(self.vocab)),
+		)
+		return (query_matrix @ self.term_doc_matrix).tocsr()
+
+	def get_batch_top_k(
+		self, queries: List[List[Union[str, int]]], top_k: int
+	) -> Tuple[List[np.ndarray], List[np.ndarray]]:
+		"""
+		Get the top_k passage indices and its scores for many tokenized queries at once.
+		The top_k of each query is selected among its non-zero scores with the partition.
+		The passages without the query tokens are filled by the same order as ``get_top_k``
+		when there are fewer than top_k passages with the positive score.
+
+		:param queries: The tokenized queries.
+		:param top_k: The number of passages to be retrieved for each query.
+		:return: The passage indices and scores of each query, sorted by score in descending order.
+		"""
+		score_matrix = self.get_batch_scores(queries)
+		top_k = min(top_k, self.corpus_size)
+		indices_result, scores_result = [], []
+		for row in range(score_matrix.shape[0]):
+			start, end = score_matrix.indptr[row], score_matrix.indptr[row + 1]
+			docs = score_matrix.indices[start:end]
+			scores = score_matrix.data[start:end]
+			positive = scores > 0
+			if positive.sum() >= top_k:
+				docs, scores = docs[positive], scores[positive]
+				# sort the docs to break ties by the passage order like get_top_k
+				order = np.argsort(docs)
+				docs, scores = docs[order], scores[order]
+				top_positions = select_top_k_indices(scores, top_k)
+				indices_result.append(docs[top_positions])
+				scores_result.append(scores[top_positions])
+			else:
+				dense_scores = np.zeros(self.corpus_size, dtype=np.float64)
+				dense_scores[docs] = scores
+				top_indices = select_top_k_indices(dense_scores, top_k)
+				indices_result.append(top_indices)
+				scores_result.append(dense_scores[top_indices])
+		return indices_result, scores_result
+
+	def get_top_k(
+		self, query: List[Union[str, int]], top_k: int
+	) -> Tuple[np.ndarray, np.ndarray]:
+		"""
+		Get the top_k passage indices and its scores for the tokenized query.
+
+		:param query: The tokenized query.
+		:param top_k: The number of passages to be retrieved.
+		:return: The passage indices and scores, sorted by score in descending order.
+		"""
+		scores = self.get_scores(query)
+		top_indices = select_top_k_indices(scores, top_k)
+		return top_indices, scores[top_indices]
+
+
+class BM25RowMap:
+	def __init__(self, passage_ids: Union[pa.Array, pa.ChunkedArray]):
+		"""
+		Passage id to row index mapping of the BM25 index.
+		The hash table is built at the first lookup and reused after that.
+		When the same passage id is in the index more than once, its first row is used.
+
+		:param passage_ids: The passage id of each row.
+		"""
+		self.passage_ids = passage_ids
+		self._id_index: Optional[pd.Index] = None
+		self._first_rows: Optional[np.ndarray] = None
+
+	def _build(self):
+		unique_ids, first_rows = np.unique(
+			self.passage_ids.to_numpy(zero_copy_only=False).astype(str),
+			return_index=True,
+		)
+		self._id_index = pd.Index(unique_ids)
+		self._first_rows = first_rows
+
+	def get_rows(self, ids: List[str]) -> np.ndarray:
+		"""
+		:param ids: The passage ids to look up.
+		:return: The row index of each passage id.
+		:raises ValueError: When some passage ids are not in the index.
+		"""
+		if self._id_index is None:
+			self._build()
+		positions = self._id_index.get_indexer(np.asarray(ids, dtype=str))
+		if (positions < 0).any():
+			missing_ids = np.asarray(ids)[positions < 0].tolist()
+			raise ValueError(f"Passage ids {missing_ids} are not in the BM25 index.")
+		return self._first_rows[positions]
+
+
+def tokens_to_postings(
+	tokens: List[List[Union[str, int]]], vocab: Dict[Hashable, int]
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+	"""
+	Count the term frequencies of the tokenized passages.
+	The new tokens are added to the vocab in the order of the first appearance.
+
+	:param tokens: 2-d list of tokens. Each element is the tokens of one passage.
+	:param vocab: The dictionary that maps a token to its term id.
+	    It is updated in place.
+	:return: The term id, passage index, and term frequency of each posting,
+	    sorted by term id and passage index, and the token count of each passage.
+	"""
+	term_ids = np.fromiter(
+		(vocab.setdefault(token, len(vocab)) for doc in tokens for token in doc),
+		dtype=np.int64,
+	)
+	corpus_size = len(tokens)
+	doc_len = np.fromiter(map(len, tokens), dtype=np.int64, count=corpus_size)
+	doc_ids = np.repeat(np.arange(corpus_size, dtype=np.int64), doc_len)
+
+	# unique (term, passage) pairs are sorted by term first, which is the CSR order
+	pair_keys, term_freqs = np.unique(
+		term_ids * corpus_size + doc_ids, return_counts=True
+	)
+	if corpus_size == 0:
+		return pair_keys, pair_keys, term_freqs.astype(np.int64), doc_len
+	return (
+		pair_keys // corpus_size,
+		pair_keys % corpus_size,
+		term_freqs.astype(np.int64),
+		doc_len,
+	)
+
+
+def select_top_k_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+	"""
+	Select the top_k indices of the scores without sorting the whole array.
+	The order is the same as ``np.argsort(scores, kind="stable")[::-1][:top_k]``,
+	so the passage that comes later in the corpus is ranked first when scores are tied.
+	The previous ``np.argsort(scores)[::-1]`` used the unstable sort,
+	so its order of tied passages was not fixed for the corpus bigger than 16 passages.
+
+	:param scores: 1-d score array.
+	:param top_k: The number of indices to select.
+	:return: The selected indices, sorted by score in descending order.
+	"""
+	top_k = min(top_k, len(scores))
+	if top_k <= 0:
+		return np.array([], dtype=np.int64)
+	threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+	above = np.flatnonzero(scores > threshold)
+	tied = np.flatnonzero(scores == threshold)[::-1][: top_k - len(above)]
+	candidates = np.concatenate([above, tied])
+	order = np.lexsort((-candidates, -scores[candidates]))
+	return candidates[order]
+
+
+def save_bm25_index(index_dir: str, index: BM25Index, tokenizer_name: str):
+	"""
+	Save the BM25 index to the index directory.
+	The numeric arrays are saved as ``.npy`` files and the vocab and passage ids
+	are saved as Arrow IPC files, so all of them can be memory-mapped when loading.
+
+	Each segment and the corpus statistics are saved to its own directory,
+	and only the ones that are not saved yet are written,
+	so saving the index with a new delta segment does not rewrite the old segments.
+	The meta file that lists the current directories is replaced atomically at last,
+	so a process that opens the index during the save reads the previous complete index.
+	The directories of the previous index are kept for those processes.
+	Concurrent writers are serialized in one process, but not across processes.
+
+	:param index_dir: The directory to save the index.
+	:param index: The BM25Index instance. Every segment must have the passage ids.
+	:param tokenizer_name: The tokenizer name that is used to tokenize the passages.
+	"""
+	if index.passage_ids is None:
+		raise ValueError("Every segment of the BM25 index must have the passage ids.")
+	os.makedirs(index_dir, exist_ok=True)
+	with _get_index_lock(index_dir):
+		for segment in index.segments:
+			if segment.name is None or not os.path.isdir(
+				os.path.join(index_dir, segment.name)
+			):
+				segment.name = _publish_dir(
+					index_dir, *_write_segment(index_dir, segment)
+				)
+		if index.stats_name is None or not os.path.isdir(
+			os.path.join(index_dir, index.stats_name)
+		):
+			index.stats_name = _publish_dir(index_dir, *_write_stats(index_dir, index))
+		_swap_meta(
+			index_dir,
+			{
+				"format_version": BM25_INDEX_FORMAT_VERSION,
+				"tokenizer_name": tokenizer_name,
+				"corpus_size": index.corpus_size,
+				"vocab_size": len(index.vocab),
+				"k1": index.k1,
+				"b": index.b,
+				"epsilon": index.epsilon,
+				"stats": index.stats_name,
+				"segments": [segment.name for segment in index.segments],
+			},
+		)
+
+
+def append_bm25_index(
+	index_dir: str,
+	tokens: List[List[Union[str, int]]],
+	passage_ids: List[str],
+	compaction: bool = True,
+) -> BM25Index:
+	"""
+	Append the tokenized passages to the saved BM25 index as a delta segment.
+	Only the delta segment and the corpus statistics are written,
+	so the cost depends on the new passages and the vocab size, not the corpus size.
+	When the index has more than ``BM25_MAX_SEGMENTS`` segments,
+	the segments are compacted at the background thread.
+
+	:param index_dir: The directory that the index is saved.
+	:param tokens: 2-d list of tokens of the new passages.
+	:param passage_ids: The passage id of each new passage.
+	:param compaction: Whether to start the background compaction. Default is True.
+	:return: The appended BM25Index instance.
+	"""
+	with _get_index_lock(index_dir):
+		index, bm25_corpus = load_bm25_index(index_dir)
+		index = index.add_tokens(tokens, passage_ids)
+		save_bm25_index(index_dir, index, bm25_corpus["tokenizer_name"])
+	if compaction and len(index.segments) > BM25_MAX_SEGMENTS:
+		start_bm25_compaction(index_dir)
+	return index
+
+
+def compact_bm25_index(index_dir: str) -> bool:
+	"""
+	Merge all segments of the saved BM25 index to one segment.
+	The merged segment is built and written without holding the index lock,
+	so the appends during the compaction are not blocked.
+	The segments that are appended during the compaction are kept after the merged segment.
+
+	:param index_dir: The directory that the index is saved.
+	:return: True if the segments are compacted.
+	"""
+	meta = read_bm25_index_meta(index_dir)
+	if (
+		meta is None
+		or meta.get("format_version") != BM25_INDEX_FORMAT_VERSION
+		or len(meta["segments"]) <= 1
+	):
+		return False
+	compacted_names = meta["segments"]
+	segments = [_read_segment(index_dir, name) for name in compacted_names]
+	merged_name, merged_tmp_dir = _write_segment(index_dir, BM25Segment.merge(segments))
+
+	with _get_index_lock(index_dir):
+		current_meta = read_bm25_index_meta(index_dir)
+		if current_meta.get("segments", [])[: len(compacted_names)] != compacted_names:
+			# the index is re-built during the compaction
+			shutil.rmtree(merged_tmp_dir, ignore_errors=True)
+			return False
+		current_meta["segments"] = [
+			_publish_dir(index_dir, merged_name, merged_tmp_dir)
+		] + current_meta["segments"][len(compacted_names) :]
+		_swap_meta(index_dir, current_meta)
+	logger.info(f"Compacted {len(compacted_names)} BM25 segments at {index_dir}.")
+	return True
+
+
+def start_bm25_compaction(index_dir: str) -> Optional[threading.Thread]:
+	"""
+	Start compacting the BM25 index at the background thread.
+	The thread is not a daemon, so the process waits for the compaction before it exits.
+
+	:param index_dir: The directory that the index is saved.
+	:return: The compaction thread. It is None when the index is already being compacted.
+	"""
+	key = os.path.abspath(index_dir)
+	with _index_locks_guard:
+		if key in _compacting_dirs:
+			return None
+		_compacting_dirs.add(key)
+
+	def compact():
+		try:
+			compact_bm25_index(index_dir)
+		except Exception as e:
+			logger.warning(f"Failed to compact the BM25 index at {index_dir}: {e}")
+		finally:
+			with _index_locks_guard:
+				_compacting_dirs.discard(key)
+
+	thread = threading.Thread(target=compact, name="bm25_compaction")
+	thread.start()
+	return thread
+
+
+def read_bm25_index_meta(index_dir: str) -> Optional[Dict]:
+	"""
+	Read the meta file of the BM25 index.
+
+	:param index_dir: The BM25 index directory.
+	:return: The meta dictionary. It is None when the index does not exist.
+	"""
+	meta_path = os.path.join(index_dir, BM25_INDEX_META_FILE)
+	if not os.path.exists(meta_path):
+		return None
+	with open(meta_path, "r") as f:
+		return json.load(f)
+
+
+def load_bm25_index(index_dir: str, mmap: bool = True) -> Tuple[BM25Index, Dict]:
+	"""
+	Load the BM25 index from the index directory.
+
+	:param index_dir: The directory that the index is saved by ``save_bm25_index``.
+	:param mmap: Whether to memory-map the index files or read them to the memory.
+	    The memory-mapped pages are shared between the processes that open the same index.
+	    Default is True.
+	:return: The BM25Index instance and the bm25 corpus dictionary.
+	    The bm25 corpus dictionary contains 'passage_id' as a pyarrow ChunkedArray,
+	    'passage_row_map' as a BM25RowMap, and 'tokenizer_name'.
+	"""
+	meta = read_bm25_index_meta(index_dir)
+	if meta is None:
+		raise FileNotFoundError(f"BM25 index {index_dir} does not exist.")
+	if meta.get("format_version") == 1:
+		index = _load_bm25_index_v1(index_dir, meta, mmap)
+	elif meta.get("format_version") == BM25_INDEX_FORMAT_VERSION:
+		stats_dir = os.path.join(index_dir, meta["stats"])
+		stats = {
+			name: _load_array(os.path.join(stats_dir, f"{name}.npy"), mmap)
+			for name in BM25_STATS_ARRAYS
+		}
+		index = BM25Index(
+			_read_vocab(os.path.join(stats_dir, "vocab.arrow"), mmap),
+			stats["doc_freqs"],
+			[_read_segment(index_dir, name, mmap) for name in meta["segments"]],
+			k1=meta["k1"],
+			b=meta["b"],
+			epsilon=meta["epsilon"],
+			idf=stats["idf"],
+		)
+		index.stats_name = meta["stats"]
+	else:
+		raise ValueError(
+			f"BM25 index format version {meta.get('format_version')} is not supported. "
+			f"Supported version is {BM25_INDEX_FORMAT_VERSION}. Please re-ingest the BM25 corpus."
+		)
+	bm25_corpus = {
+		"passage_id": index.passage_ids,
+		"passage_row_map": BM25RowMap(index.passage_ids),
+		"tokenizer_name": meta["tokenizer_name"],
+	}
+	return index, bm25_corpus
+
+
+def migrate_bm25_pkl(pkl_path: str, index_dir: Optional[str] = None) -> str:
+	"""
+	Migrate the legacy pickled BM25 corpus to the BM25 index directory.
+
+	:param pkl_path: The path of the legacy ``bm25_<tokenizer>.pkl`` file.
+	:param index_dir: The directory to save the index.
+	    Default is the pkl path without the ``.pkl`` extension.
+	:return: The index directory path.
+	"""
+	if not pkl_path.endswith(".pkl"):
+		raise ValueError(f"BM25 corpus path {pkl_path} is not a pickle file.")
+	if index_dir is None:
+		index_dir = pkl_path[: -len(".pkl")]
+	with open(pkl_path, "rb") as f:
+		bm25_corpus = pickle.load(f)
+	index = BM25Index.from_tokens(bm25_corpus["tokens"], bm25_corpus["passage_id"])
+	save_bm25_index(index_dir, index, bm25_corpus["tokenizer_name"])
+	logger.info(f"Migrated BM25 corpus {pkl_path} to {index_dir}.")
+	return index_dir
+
+
+def _load_bm25_index_v1(index_dir: str, meta: Dict, mmap: bool) -> BM25Index:
+	# The first format saves the postings of all terms to one generation directory.
+	# It is loaded as one segment and saved with the current format at the next save.
+	generation_dir = os.path.join(index_dir, meta["generation"])
+	arrays = {
+		name: _load_array(os.path.join(generation_dir, f"{name}.npy"), mmap)
+		for name in ("indptr", "postings", "term_freqs", "doc_len", "idf")
+	}
+	segment = BM25Segment(
+		np.arange(len(arrays["indptr"]) - 1, dtype=np.int64),
+		arrays["indptr"],
+		arrays["postings"],
+		arrays["term_freqs"],
+		arrays["doc_len"],
+		passage_ids=_read_arrow_table(
+			os.path.join(generation_dir, "passage_id.arrow"), mmap
+		)
+		.column("passage_id")
+		.combine_chunks(),
+	)
+	return BM25Index(
+		_read_vocab(os.path.join(generation_dir, "vocab.arrow"), mmap),
+		np.diff(arrays["indptr"]),
+		[segment],
+		k1=meta["k1"],
+		b=meta["b"],
+		epsilon=meta["epsilon"],
+		idf=arrays["idf"],
+	)
+
+
+def _get_index_lock(index_dir: str) -> threading.RLock:
+	key = os.path.abspath(index_dir)
+	with _index_locks_guard:
+		if key not in _index_locks:
+			_index_locks[key] = threading.RLock()
+		return _index_locks[key]
+
+
+def _swap_meta(index_dir: str, meta: Dict):
+	"""
+	Replace the meta file atomically and remove the directories
+	that are used by neither the new index nor the previous index.
+	"""
+	previous_meta = read_bm25_index_meta(index_dir)
+	meta_path = os.path.join(index_dir, BM25_INDEX_META_FILE)
+	with open(f"{meta_path}.tmp", "w") as f:
+		json.dump(meta, f, indent=2)
+	os.replace(f"{meta_path}.tmp", meta_path)
+
+	used_names = set(_meta_dir_names(meta)) | set(_meta_dir_names(previous_meta))
+	for name in os.listdir(index_dir):
+		if name.startswith(("seg-", "stats-", "gen-")) and name not in used_names:
+			shutil.rmtree(os.path.join(index_dir, name), ignore_errors=True)
+
+
+def _meta_dir_names(meta: Optional[Dict]) -> List[str]:
+	if meta is None:
+		return []
+	if meta.get("format_version") == 1:
+		return [meta["generation"]]
+	return [meta["stats"]] + meta["segments"]
+
+
+def _make_tmp_dir(index_dir: str, prefix: str) -> Tuple[str, str]:
+	# The directory is written with the hidden temporary name,
+	# so it is not removed by _swap_meta before it is published.
+	name = f"{prefix}-{uuid.uuid4().hex}"
+	tmp_dir = os.path.join(index_dir, f".{name}.tmp")
+	os.makedirs(tmp_dir)
+	return name, tmp_dir
+
+
+def _publish_dir(index_dir: str, name: str, tmp_dir: str) -> str:
+	os.rename(tmp_dir, os.path.join(index_dir, name))
+	return name
+
+
+def _write_segment(index_dir: str, segment: BM25Segment) -> Tuple[str, str]:
+	name, tmp_dir = _make_tmp_dir(index_dir, "seg")
+	for array_name in BM25_SEGMENT_ARRAYS:
+		np.save(
+			os.path.join(tmp_dir, f"{array_name}.npy"),
+			np.asarray(getattr(segment, array_name)),
+		)
+	_write_arrow_table(
+		os.path.join(tmp_dir, "passage_id.arrow"),
+		pa.table({"passage_id": segment.passage_ids.cast(pa.string())}),
+	)
+	return name, tmp_dir
+
+
+def _read_segment(index_dir: str, name: str, mmap: bool = True) -> BM25Segment:
+	segment_dir = os.path.join(index_dir, name)
+	arrays = {
+		array_name: _load_array(os.path.join(segment_dir, f"{array_name}.npy"), mmap)
+		for array_name in BM25_SEGMENT_ARRAYS
+	}
+	passage_id_table = _read_arrow_table(
+		os.path.join(segment_dir, "passage_id.arrow"), mmap
+	)
+	return BM25Segment(
+		**arrays,
+		passage_ids=passage_id_table.column("passage_id").combine_chunks(),
+		name=name,
+	)
+
+
+def _write_stats(index_dir: str, index: BM25Index) -> Tuple[str, str]:
+	name, tmp_dir = _make_tmp_dir(index_dir, "stats")
+	np.save(os.path.join(tmp_dir, "doc_freqs.npy"), np.asarray(index.doc_freqs))
+	np.save(os.path.join(tmp_dir, "idf.npy"), np.asarray(index.idf))
+	_write_vocab(os.path.join(tmp_dir, "vocab.arrow"), list(index.vocab.keys()))
+	return name, tmp_dir
+
+
+def _counts_to_indptr(counts: np.ndarray) -> np.ndarray:
+	indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+	np.cumsum(counts, out=indptr[1:])
+	return indptr
+
+
+def _to_passage_id_array(passage_ids) -> Optional[pa.Array]:
+	if passage_ids is None:
+		return None
+	if isinstance(passage_ids, pa.ChunkedArray):
+		return passage_ids.combine_chunks()
+	if isinstance(passage_ids, pa.Array):
+		return passage_ids
+	return pa.array(list(passage_ids), type=pa.string())
+
+
+def _load_array(path: str, mmap: bool = True) -> np.ndarray:
+	return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def _write_vocab(path: str, tokens: List[Union[str, int]]):
+	# sort tokens to look up the term id with the binary search at BM25Vocab
+	order = sorted(range(len(tokens)), key=tokens.__getitem__)
+	_write_arrow_table(
+		path,
+		pa.table(
+			{
+				"token": pa.array([tokens[i] for i in order]),
+				"term_id": pa.array(order, type=pa.int64()),
+			}
+		),
+	)
+
+
+def _read_vocab(path: str, mmap: bool = True) -> BM25Vocab:
+	vocab_table = _read_arrow_table(path, mmap)
+	return BM25Vocab(
+		vocab_table.column("token").combine_chunks(),
+		vocab_table.column("term_id").to_numpy(),
+	)
+
+
+def _write_arrow_table(path: str, table: pa.Table):
+	with pa.OSFile(path, "wb") as sink:
+		with pa.ipc.new_file(sink, table.schema) as writer:
+			writer.write_table(table)
+
+
+def _read_arrow_table(path: str, mmap: bool = True) -> pa.Table:
+	source = pa.memory_map(path, "r") if mmap else pa.OSFile(path, "rb")
+	return pa.ipc.open_file(source).read_all()
@@ -5,7 +5,8 @@ from typing import Tuple, List, Union
 import numpy as np
 import pandas as pd
 
-from autorag.nodes.retrieval.base import HybridRetrieval
+from autorag.nodes.retrieval.base import HybridRetrieval, sweep_fusion
+from autorag.utils.corpus import load_corpus_data
 from autorag.utils.util import pop_params, fetch_contents, result_to_dataframe
 
 
@@ -81,9 +82,7 @@ class HybridCC(HybridRetrieval):
 	):
 		if "ids" in kwargs and "scores" in kwargs:
 			data_dir = os.path.join(project_dir, "data")
-			corpus_df = pd.read_parquet(
-				os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-			)
+			corpus_df = load_corpus_data(os.path.join(data_dir, "corpus.parquet"))
 
 			params = pop_params(hybrid_cc, kwargs)
 			assert (
@@ -103,10 +102,7 @@ class HybridCC(HybridRetrieval):
 			assert (
 				"target_modules" in kwargs and "target_module_params" in kwargs
 			), "target_modules and target_module_params must be specified if there is not ids and scores."
-			instance = cls(project_dir, *args, **kwargs)
-			result = instance.pure(previous_result, *args, **kwargs)
-			del instance
-			return result
+			return super().run_evaluator(project_dir, previous_result, *args, **kwargs)
 
 
 def hybrid_cc(
@@ -157,33 +153,74 @@ def hybrid_cc(
 	assert weight >= 0, "The weight must be greater than 0."
 	assert weight <= 1, "The weight must be less than 1."
 
-	df = pd.DataFrame(
-		{
-			"semantic_ids": ids[0],
-			"lexical_ids": ids[1],
-			"semantic_score": scores[0],
-			"lexical_score": scores[1],
-		}
+	return hybrid_cc_sweep(
+		ids,
+		scores,
+		top_k,
+		[weight],
+		normalize_method,
+		semantic_theoretical_min_value,
+		lexical_theoretical_min_value,
+	)[0]
+
+
+def hybrid_cc_sweep(
+	ids: Tuple,
+	scores: Tuple,
+	top_k: int,
+	weights: List[float],
+	normalize_method: str = "mm",
+	semantic_theoretical_min_value: float = -1.0,
+	lexical_theoretical_min_value: float = 0.0,
+) -> List[Tuple[List[List[str]], List[List[float]]]]:
+	"""
+	Run hybrid CC with every weight at once.
+	The scores are normalized once,
+	and the weighted sums of all weights are computed as one NumPy array.
+	It is used to find the best weight without running hybrid_cc for each weight.
+
+	:param ids: The tuple of ids that you want to fuse.
+	    The semantic retrieval ids must be the first index.
+	:param scores: The retrieve scores that you want to fuse.
+	    The semantic retrieval scores must be the first index.
+	:param top_k: The number of passages to be retrieved.
+	:param weights: The weight values to test.
+	    Each weight is the weight to the semantic module.
+	:param normalize_method: The normalization method to use.
+	    It is the same as hybrid_cc.
+	:param semantic_theoretical_min_value: This value used by `tmm` normalization method.
+	:param lexical_theoretical_min_value: This value used by `tmm` normalization method.
+	:return: The tuple of fused ids and scores of each weight, in the same order of weights.
+	"""
+	assert len(ids) == len(scores), "The length of ids and scores must be the same."
+	assert len(ids) > 1, "You must input more than one retrieval results."
+	assert top_k > 0, "top_k must be greater than 0."
+	assert all(weight >= 0 for weight in weights), "The weight must be greater than 0."
+	assert all(weight <= 1 for weight in weights), "The weight must be less than 1."
+
+	normalize_func = normalize_method_dict[normalize_method]
+	norm_scores = (
+		[
+			normalize_func(query_scores, semantic_theoretical_min_value)
+			for query_scores in scores[0]
+		],
+		[
+			normalize_func(query_scores, lexical_theoretical_min_value)
+			for query_scores in scores[1]
+		],
 	)
+	return sweep_fusion(ids[:2], norm_scores, top_k, weights, fuse_cc)
 
-	def cc_pure_apply(row):
-		return fuse_per_query(
-			row["semantic_ids"],
-			row["lexical_ids"],
-			row["semantic_score"],
-			row["lexical_score"],
-			normalize_method=normalize_method,
-			weight=weight,
-			top_k=top_k,
-			semantic_theoretical_min_value=semantic_theoretical_min_value,
-			lexical_theoretical_min_value=lexical_theoretical_min_value,
-		)
 
-	# fixed weight
-	df[["cc_id", "cc_score"]] = df.apply(
-		lambda row: cc_pure_apply(row), axis=1, result_type="expand"
+def fuse_cc(score_array: np.ndarray, weights: np.ndarray) -> np.ndarray:
+	# the missing scores are zero, and NaN terms are skipped at the sum like pandas
+	score_array = np.where(np.isnan(score_array), 0.0, score_array)
+	weights = weights[:, None, None]
+	semantic = weights * score_array[0]
+	lexical = (1.0 - weights) * score_array[1]
+	return np.where(np.isnan(semantic), 0.0, semantic) + np.where(
+		np.isnan(lexical), 0.0, lexical
 	)
-	return df["cc_id"].tolist(), df["cc_score"].tolist()
 
 
 def fuse_per_query(
@@ -197,18 +234,13 @@ def fuse_per_query(
 	semantic_theoretical_min_value: float,
 	lexical_theoretical_min_value: float,
 ):
-	normalize_func = normalize_method_dict[normalize_method]
-	norm_semantic_scores = normalize_func(
-		semantic_scores, semantic_theoretical_min_value
-	)
-	norm_lexical_scores = normalize_func(lexical_scores, lexical_theoretical_min_value)
-	ids = [semantic_ids, lexical_ids]
-	scores = [norm_semantic_scores, norm_lexical_scores]
-	df = pd.concat(
-		[pd.Series(dict(zip(_id, score))) for _id, score in zip(ids, scores)], axis=1
+	ids, scores = hybrid_cc(
+		([semantic_ids], [lexical_ids]),
+		([semantic_scores], [lexical_scores]),
+		top_k,
+		weight,
+		normalize_method,
+		semantic_theoretical_min_value,
+		lexical_theoretical_min_value,
 	)
-	df.columns = ["semantic", "lexical"]
-	df = df.fillna(0)
-	df["weighted_sum"] = df.mul((weight, 1.0 - weight)).sum(axis=1)
-	df = df.sort_values(by="weighted_sum", ascending=False)
-	return df.index.tolist()[:top_k], df["weighted_sum"][:top_k].tolist()
+	return ids[0], scores[0]
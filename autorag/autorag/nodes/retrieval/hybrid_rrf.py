@@ -2,9 +2,11 @@ import os
 from pathlib import Path
 from typing import List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from autorag.nodes.retrieval.base import HybridRetrieval
+from autorag.nodes.retrieval.base import HybridRetrieval, sweep_fusion
+from autorag.utils.corpus import load_corpus_data
 from autorag.utils.util import pop_params, fetch_contents, result_to_dataframe
 
 
@@ -22,9 +24,7 @@ class HybridRRF(HybridRetrieval):
 	):
 		if "ids" in kwargs and "scores" in kwargs:
 			data_dir = os.path.join(project_dir, "data")
-			corpus_df = pd.read_parquet(
-				os.path.join(data_dir, "corpus.parquet"), engine="pyarrow"
-			)
+			corpus_df = load_corpus_data(os.path.join(data_dir, "corpus.parquet"))
 
 			params = pop_params(hybrid_rrf, kwargs)
 			assert (
@@ -44,10 +44,7 @@ class HybridRRF(HybridRetrieval):
 			assert (
 				"target_modules" in kwargs and "target_module_params" in kwargs
 			), "target_modules and target_module_params must be specified if there is not ids and scores."
-			instance = cls(project_dir, *args, **kwargs)
-			result = instance.pure(previous_result, *args, **kwargs)
-			del instance
-			return result
+			return super().run_evaluator(project_dir, previous_result, *args, **kwargs)
 
 
 def hybrid_rrf(
@@ -91,32 +88,63 @@ def hybrid_rrf(
 	else:
 		weight = int(weight)
 
-	id_df = pd.DataFrame({f"id_{i}": id_list for i, id_list in enumerate(ids)})
-	score_df = pd.DataFrame(
-		{f"score_{i}": score_list for i, score_list in enumerate(scores)}
-	)
-	df = pd.concat([id_df, score_df], axis=1)
+	return hybrid_rrf_sweep(ids, scores, top_k, [weight])[0]
+
+
+def hybrid_rrf_sweep(
+	ids: Tuple,
+	scores: Tuple,
+	top_k: int,
+	weights: List[int],
+) -> List[Tuple[List[List[str]], List[List[float]]]]:
+	"""
+	Run hybrid RRF with every weight at once.
+	The ranks of each retrieval result are computed once,
+	and the RRF scores of all weights are computed as one NumPy array.
+	It is used to find the best weight without running hybrid_rrf for each weight.
+
+	:param ids: The tuple of ids that you want to fuse.
+	    The length of this must be the same as the length of scores.
+	:param scores: The retrieve scores that you want to fuse.
+	    The length of this must be the same as the length of ids.
+	:param top_k: The number of passages to be retrieved.
+	:param weights: The weight (rrf_k) values to test.
+	    Each weight is cast to int.
+	:return: The tuple of fused ids and scores of each weight, in the same order of weights.
+	"""
+	assert len(ids) == len(scores), "The length of ids and scores must be the same."
+	assert len(ids) > 1, "You must input more than one retrieval results."
+	assert top_k > 0, "top_k must be greater than 0."
+	assert all(weight > 0 for weight in weights), "rrf_k must be greater than 0."
+
+	weights = [int(weight) for weight in weights]
+	return sweep_fusion(ids, scores, top_k, weights, fuse_rrf)
 
-	def rrf_pure_apply(row):
-		ids_tuple = tuple(row[[f"id_{i}" for i in range(len(ids))]].values)
-		scores_tuple = tuple(row[[f"score_{i}" for i in range(len(scores))]].values)
-		return pd.Series(rrf_pure(ids_tuple, scores_tuple, weight, top_k))
 
-	df[["rrf_id", "rrf_score"]] = df.apply(rrf_pure_apply, axis=1)
-	return df["rrf_id"].tolist(), df["rrf_score"].tolist()
+def fuse_rrf(score_array: np.ndarray, weights: np.ndarray) -> np.ndarray:
+	weights = weights[:, None, None]
+	rrf_scores = np.zeros((len(weights),) + score_array.shape[1:])
+	for module_scores in score_array:
+		# the missing scores are NaN, so they do not have ranks
+		ranks = (
+			pd.DataFrame(module_scores)
+			.rank(axis=1, ascending=False, method="min")
+			.to_numpy()
+		)
+		rrf_scores += np.where(np.isnan(ranks), 0.0, 1 / (ranks + weights))
+	return rrf_scores
 
 
 def rrf_pure(
 	ids: Tuple, scores: Tuple, rrf_k: int, top_k: int
 ) -> Tuple[List[str], List[float]]:
-	df = pd.concat(
-		[pd.Series(dict(zip(_id, score))) for _id, score in zip(ids, scores)], axis=1
+	result_ids, result_scores = hybrid_rrf(
+		tuple([module_ids] for module_ids in ids),
+		tuple([module_scores] for module_scores in scores),
+		top_k,
+		rrf_k,
 	)
-	rank_df = df.rank(ascending=False, method="min")
-	rank_df = rank_df.fillna(0)
-	rank_df["rrf"] = rank_df.apply(lambda row: rrf_calculate(row, rrf_k), axis=1)
-	rank_df = rank_df.sort_values(by="rrf", ascending=False)
-	return rank_df.index.tolist()[:top_k], rank_df["rrf"].tolist()[:top_k]
+	return result_ids[0], result_scores[0]
 
 
 def rrf_calculate(row, rrf_k):
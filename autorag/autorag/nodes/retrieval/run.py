@@ -8,10 +8,15 @@ import numpy as np
 import pandas as pd
 
 from autorag.evaluation import evaluate_retrieval
+from autorag.evaluation.metric.retrieval import RetrievalMetricBatch
+from autorag.evaluation.retrieval import compute_retrieval_metrics
+from autorag.nodes.retrieval.hybrid_cc import hybrid_cc_sweep
+from autorag.nodes.retrieval.hybrid_rrf import hybrid_rrf_sweep
+from autorag.nodes.util import run_modules
 from autorag.schema.metricinput import MetricInput
-from autorag.strategy import measure_speed, filter_by_threshold, select_best
+from autorag.strategy import filter_by_threshold, select_best
 from autorag.support import get_support_modules
-from autorag.utils.util import get_best_row, to_list, apply_recursive
+from autorag.utils.util import get_best_row, to_list, apply_recursive, pop_params
 
 logger = logging.getLogger("AutoRAG")
 
@@ -68,16 +73,12 @@ def run_retrieval_node(
 		:return: First, it returns list of result dataframe.
 		Second, it returns list of execution times.
 		"""
-		result, execution_times = zip(
-			*map(
-				lambda task: measure_speed(
-					task[0].run_evaluator,
-					project_dir=project_dir,
-					previous_result=previous_result,
-					**task[1],
-				),
-				zip(input_modules, input_module_params),
-			)
+		result, execution_times = run_modules(
+			input_modules,
+			input_module_params,
+			project_dir,
+			previous_result,
+			max_workers=strategies.get("max_workers", 1),
 		)
 		average_times = list(map(lambda x: x / len(result[0]), execution_times))
 
@@ -497,12 +498,14 @@ def optimize_hybrid(
 	):
 		weight_range = hybrid_module_param.pop("weight_range", (4, 80))
 		test_weight_size = weight_range[1] - weight_range[0] + 1
+		sweep_func = hybrid_rrf_sweep
 	elif (
 		hybrid_module_func.__name__ == "HybridCC"
 		or hybrid_module_func.__name__ == "hybrid_cc"
 	):
 		weight_range = hybrid_module_param.pop("weight_range", (0.0, 1.0))
 		test_weight_size = hybrid_module_param.pop("test_weight_size", 101)
+		sweep_func = hybrid_cc_sweep
 	else:
 		raise ValueError("You must input hybrid module function at hybrid_module_func.")
 
@@ -510,35 +513,38 @@ def optimize_hybrid(
 		weight_range[0], weight_range[1], test_weight_size
 	).tolist()
 
-	result_list = []
-	for weight_value in weight_candidates:
-		result_df = hybrid_module_func.run_evaluator(
-			project_dir=project_dir,
-			previous_result=previous_result,
-			weight=weight_value,
-			**hybrid_module_param,
-		)
-		result_list.append(result_df)
-
-		# evaluate here
 	if strategy.get("metrics") is None:
 		raise ValueError("You must at least one metrics for retrieval evaluation.")
-	result_list = list(
+
+	# fuse with every weight at once, and evaluate only the retrieved ids
+	sweep_params = pop_params(sweep_func, hybrid_module_param.copy())
+	sweep_results = sweep_func(weights=weight_candidates, **sweep_params)
+	metric_batch = RetrievalMetricBatch(input_metrics)
+	metric_result_list = list(
 		map(
-			lambda x: evaluate_retrieval_node(
-				x,
-				input_metrics,
-				strategy.get("metrics"),
+			lambda x: compute_retrieval_metrics(
+				input_metrics, x[0], strategy.get("metrics"), metric_batch
 			),
-			result_list,
+			sweep_results,
 		)
 	)
 
-	# select best result
-	best_result_df, best_weight = select_best(
-		result_list,
+	# select best weight
+	_, best_weight = select_best(
+		metric_result_list,
 		strategy.get("metrics"),
 		metadatas=weight_candidates,
 		strategy_name=strategy.get("strategy", "normalize_mean"),
 	)
+
+	# fetch contents only for the best weight
+	best_result_df = hybrid_module_func.run_evaluator(
+		project_dir=project_dir,
+		previous_result=previous_result,
+		weight=best_weight,
+		**hybrid_module_param,
+	)
+	best_result_df = evaluate_retrieval_node(
+		best_result_df, input_metrics, strategy.get("metrics")
+	)
 	return best_result_df, best_weight
@@ -3,15 +3,15 @@ import logging
 import os
 from typing import List, Tuple, Optional
 
-import numpy as np
 import pandas as pd
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from autorag.evaluation.metric.util import (
-	calculate_l2_distance,
-	calculate_inner_product,
-	calculate_cosine_similarity,
+	calculate_l2_distance_matrix,
+	calculate_inner_product_matrix,
+	calculate_cosine_similarity_matrix,
+	to_embedding_matrix,
 )
 from autorag.nodes.retrieval.base import evenly_distribute_passages, BaseRetrieval
 from autorag.utils import (
@@ -22,7 +22,6 @@ from autorag.utils import (
 )
 from autorag.utils.util import (
 	get_event_loop,
-	process_batch,
 	openai_truncate_by_token,
 	flatten_apply,
 	result_to_dataframe,
@@ -39,6 +38,8 @@ logger = logging.getLogger("AutoRAG")
 
 
 class VectorDB(BaseRetrieval):
+	resource = "gpu"
+
 	def __init__(self, project_dir: str, vectordb: str = "default", **kwargs):
 		"""
 		Initialize VectorDB retrieval node.
@@ -88,8 +89,8 @@ class VectorDB(BaseRetrieval):
 		:param queries: 2-d list of query strings.
 		    Each element of the list is a query strings of each row.
 		:param top_k: The number of passages to be retrieved.
-		:param embedding_batch: The number of queries to be processed in parallel.
-		    This is used to prevent API error at the query embedding.
+		:param embedding_batch: The number of queries to be searched in one bulk search request.
+		    This is used to prevent API error at the query embedding and the search.
 		    Default is 128.
 		:param ids: The optional list of ids that you want to retrieve.
 		    You don't need to specify this in the general use cases.
@@ -102,14 +103,18 @@ class VectorDB(BaseRetrieval):
 		if ids is not None:
 			return self.__get_ids_scores(queries, ids, embedding_batch)
 
-		# run async vector_db_pure function
-		tasks = [
-			vectordb_pure(query_list, top_k, self.vector_store)
-			for query_list in queries
-		]
+		# search the queries of every row with the bulk search requests
 		loop = get_event_loop()
-		results = loop.run_until_complete(
-			process_batch(tasks, batch_size=embedding_batch)
+		ids_list, scores_list = loop.run_until_complete(
+			self.vector_store.batch_query(
+				queries, top_k=top_k, search_batch=embedding_batch
+			)
+		)
+		results = list(
+			map(
+				lambda x: merge_query_results(x[0], x[1], top_k),
+				zip(ids_list, scores_list),
+			)
 		)
 		id_result = list(map(lambda x: x[0], results))
 		score_result = list(map(lambda x: x[1], results))
@@ -178,7 +183,20 @@ async def vectordb_pure(
 	:return: The tuple contains a list of passage ids that are retrieved from vectordb and a list of its scores.
 	"""
 	id_result, score_result = await vectordb.query(queries=queries, top_k=top_k)
+	return merge_query_results(id_result, score_result, top_k)
+
 
+def merge_query_results(
+	id_result: List[List[str]], score_result: List[List[float]], top_k: int
+) -> Tuple[List[str], List[float]]:
+	"""
+	Merge the retrieval results of the queries of one row to top_k passages.
+
+	:param id_result: The retrieved ids of each query.
+	:param score_result: The scores of the retrieved ids of each query.
+	:param top_k: The number of passages to be retrieved.
+	:return: The tuple contains a list of passage ids and a list of its scores, sorted by score.
+	"""
 	# Distribute passages evenly
 	id_result, score_result = evenly_distribute_passages(id_result, score_result, top_k)
 	# sort id_result and score_result by score
@@ -286,18 +304,16 @@ def get_id_scores(  # To find the uncalculated score when fuse the scores for th
 	:return: A list of the highest similarity scores for each content embedding.
 	"""
 	metric_func_dict = {
-		"l2": lambda x, y: 1 - calculate_l2_distance(x, y),
-		"ip": calculate_inner_product,
-		"cosine": calculate_cosine_similarity,
+		"l2": lambda x, y: 1 - calculate_l2_distance_matrix(x, y),
+		"ip": calculate_inner_product_matrix,
+		"cosine": calculate_cosine_similarity_matrix,
 	}
 	metric_func = metric_func_dict[similarity_metric]
 
-	result = []
-	for content_embedding in content_embeddings:
-		scores = []
-		for query_embedding in query_embeddings:
-			scores.append(
-				metric_func(np.array(query_embedding), np.array(content_embedding))
-			)
-		result.append(max(scores))
-	return result
+	if len(content_embeddings) == 0:
+		return []
+	# scores shaped (contents, queries)
+	scores = metric_func(
+		to_embedding_matrix(content_embeddings), to_embedding_matrix(query_embeddings)
+	)
+	return scores.max(axis=1).tolist()
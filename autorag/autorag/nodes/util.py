@@ -1,5 +1,10 @@
-from typing import Optional, Dict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union
 
+import pandas as pd
+
+from autorag.strategy import measure_speed
 from autorag.support import get_support_modules
 
 
@@ -14,3 +19,90 @@ def make_generator_callable_param(generator_dict: Optional[Dict]):
 	module_class = get_support_modules(module_str)
 	module_param = generator_dict
 	return module_class, module_param
+
+
+def get_llm_resource(llm: Any) -> str:
+	"""
+	Get the resource tag of the module that uses the given LlamaIndex LLM.
+	The huggingfacellm runs a local model, and the others call APIs.
+
+	:param llm: The llm name or the LlamaIndex LLM instance.
+	:return: "gpu" for the local model, "api" for the others.
+	"""
+	return "gpu" if llm == "huggingfacellm" else "api"
+
+
+def run_module(
+	module,
+	module_param: Dict,
+	project_dir: Union[str, Path],
+	previous_result: pd.DataFrame,
+) -> Tuple[pd.DataFrame, float]:
+	return measure_speed(
+		module.run_evaluator,
+		project_dir=project_dir,
+		previous_result=previous_result,
+		**module_param,
+	)
+
+
+def run_modules(
+	modules: List,
+	module_params: List[Dict],
+	project_dir: Union[str, Path],
+	previous_result: pd.DataFrame,
+	max_workers: int = 1,
+) -> Tuple[List[pd.DataFrame], List[float]]:
+	"""
+	Run the module candidates of a node and measure the execution time of each module.
+	With max_workers bigger than one, the candidates run in parallel by their resource tags.
+	The "cpu" modules run at a process pool, and the "api" modules run at a thread pool.
+	The other modules, like the "gpu" modules with local models, run one at a time in this process.
+	The execution time is measured inside the worker that runs the module.
+
+	:param modules: The module classes.
+	:param module_params: The parameters of each module.
+	:param project_dir: The project directory.
+	:param previous_result: The previous result dataframe.
+	:param max_workers: The maximum number of workers of each pool.
+	    Default is 1, which runs the modules one by one.
+	:return: The list of the result dataframes and the list of the execution times.
+	    They are in the order of the modules.
+	"""
+	tasks = list(zip(modules, module_params))
+	if max_workers <= 1 or len(tasks) <= 1:
+		outputs = [
+			run_module(module, module_param, project_dir, previous_result)
+			for module, module_param in tasks
+		]
+		return [output[0] for output in outputs], [output[1] for output in outputs]
+
+	resources = [module.get_resource(**module_param) for module, module_param in tasks]
+	cpu_indices = [i for i, resource in enumerate(resources) if resource == "cpu"]
+	api_indices = [i for i, resource in enumerate(resources) if resource == "api"]
+	pools = []
+	futures = {}
+	outputs = [None] * len(tasks)
+	try:
+		# start the processes before the threads, so the forked processes do not copy running threads
+		for indices, executor_class in [
+			(cpu_indices, ProcessPoolExecutor),
+			(api_indices, ThreadPoolExecutor),
+		]:
+			if len(indices) <= 1:
+				continue
+			pool = executor_class(max_workers=min(max_workers, len(indices)))
+			pools.append(pool)
+			for i in indices:
+				futures[i] = pool.submit(
+					run_module, *tasks[i], project_dir, previous_result
+				)
+		for i, task in enumerate(tasks):
+			if i not in futures:
+				outputs[i] = run_module(*task, project_dir, previous_result)
+		for i, future in futures.items():
+			outputs[i] = future.result()
+	finally:
+		for pool in pools:
+			pool.shutdown(wait=True, cancel_futures=True)
+	return [output[0] for output in outputs], [output[1] for output in outputs]
@@ -1,11 +1,56 @@
+import logging
+import time
 from abc import ABCMeta, abstractmethod
 from pathlib import Path
 from typing import Union
 
 import pandas as pd
 
+from autorag.utils.llm_cache import is_llm_cacheable
+from autorag.utils.module_cache import (
+	MODULE_CACHE_TIME_ATTR,
+	get_module_cache_dir,
+	load_module_result,
+	make_module_cache_key,
+	save_module_result,
+)
+
+logger = logging.getLogger("AutoRAG")
+
 
 class BaseModule(metaclass=ABCMeta):
+	# The resource that the module runs on, when a node runs its modules in parallel.
+	# The "cpu" modules run at a process pool, the "api" modules run at a thread pool,
+	# and the others (like the "gpu" modules with local models) run one at a time.
+	resource: str = "cpu"
+
+	@classmethod
+	def get_resource(cls, *args, **kwargs) -> str:
+		"""
+		Get the resource tag of the module with the given module parameters.
+
+		:return: The resource tag. "cpu", "api" or "gpu".
+		"""
+		return cls.resource
+
+	# Whether the module result is sampled from an LLM.
+	# Its result is cached only with the zero temperature, like the LLM response cache.
+	llm_sampling: bool = False
+
+	@classmethod
+	def is_result_cacheable(cls, *args, **kwargs) -> bool:
+		"""
+		Whether the evaluation result of the module with the given module parameters can be cached.
+		The result with a non-zero or an unknown sampling temperature is not cached,
+		unless the AUTORAG_LLM_CACHE_FORCE environment variable is set.
+
+		:return: Whether to use the module result cache.
+		"""
+		temperature = kwargs.get("temperature")
+		if temperature is None and not cls.llm_sampling:
+			return True
+		return is_llm_cacheable(temperature)
+
 	@abstractmethod
 	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
 		pass
@@ -21,6 +66,46 @@ class BaseModule(metaclass=ABCMeta):
 		previous_result: pd.DataFrame,
 		*args,
 		**kwargs,
+	):
+		"""
+		Run the module for the evaluation.
+		The result is memoized at the module result cache of the project,
+		so the module with the same parameters, previous result, corpus and qa data
+		reuses the result of the earlier trial instead of running again.
+		The reused result keeps the execution time of the run that made it
+		at the DataFrame.attrs, and measure_speed reports it.
+		The result that is sampled with a non-zero temperature is not cached.
+		"""
+		cache_dir = get_module_cache_dir(project_dir)
+		if cache_dir is None or not cls.is_result_cacheable(*args, **kwargs):
+			return cls._run_evaluator(project_dir, previous_result, *args, **kwargs)
+
+		module_name = f"{cls.__module__}.{cls.__qualname__}"
+		key = make_module_cache_key(
+			module_name, project_dir, previous_result, args, kwargs
+		)
+		cached = load_module_result(cache_dir, key)
+		if cached is not None:
+			result, execution_time = cached
+			logger.info(f"Reuse the cached result of {cls.__name__}.")
+			result.attrs[MODULE_CACHE_TIME_ATTR] = execution_time
+			return result
+
+		start_time = time.time()
+		result = cls._run_evaluator(project_dir, previous_result, *args, **kwargs)
+		if isinstance(result, pd.DataFrame):
+			save_module_result(
+				cache_dir, key, result, time.time() - start_time, module_name
+			)
+		return result
+
+	@classmethod
+	def _run_evaluator(
+		cls,
+		project_dir: Union[str, Path],
+		previous_result: pd.DataFrame,
+		*args,
+		**kwargs,
 	):
 		instance = cls(project_dir, *args, **kwargs)
 		result = instance.pure(previous_result, *args, **kwargs)
@@ -5,14 +5,20 @@ from typing import List, Iterable, Tuple, Any, Optional, Callable
 import numpy as np
 import pandas as pd
 
+from autorag.utils.module_cache import MODULE_CACHE_TIME_ATTR
+
 
 def measure_speed(func, *args, **kwargs):
 	"""
 	Method for measuring execution speed of the function.
+	When the result dataframe is reused from the module result cache,
+	it returns the execution time of the run that made the result.
 	"""
 	start_time = time.time()
 	result = func(*args, **kwargs)
 	end_time = time.time()
+	if isinstance(result, pd.DataFrame) and MODULE_CACHE_TIME_ATTR in result.attrs:
+		return result, result.attrs.pop(MODULE_CACHE_TIME_ATTR)
 	return result, end_time - start_time
 
 
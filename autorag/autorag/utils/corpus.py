@@ -0,0 +1,245 @@
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from typing import List, Any, Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+CORPUS_CACHE_SIZE = 4
+# the uncompressed Arrow IPC file of the corpus, which is memory-mapped without decoding
+CORPUS_TABLE_NAME = "corpus.arrow"
+
+_corpus_lookups: Dict[int, "CorpusLookup"] = {}
+_corpus_lookups_lock = threading.Lock()
+_corpus_cache: "OrderedDict[Tuple[str, bool], Tuple[Tuple[int, int], pd.DataFrame]]" = (
+	OrderedDict()
+)
+_corpus_cache_lock = threading.RLock()
+
+
+class CorpusLookup:
+	def __init__(self, corpus_data: pd.DataFrame, id_column_name: str = "doc_id"):
+		"""
+		The doc_id to row position index of the corpus dataframe.
+		It finds the rows of many ids with one hash lookup,
+		instead of scanning the whole corpus dataframe for each id.
+		When the same doc_id is in the corpus more than once, its first row is used.
+		The lookup keeps a weak reference to the corpus dataframe,
+		and it is re-built when the doc ids of the dataframe are changed.
+
+		:param corpus_data: The corpus dataframe.
+		:param id_column_name: The column name of the doc id. Default is 'doc_id'.
+		"""
+		self._corpus_ref = weakref.ref(corpus_data)
+		self.id_column_name = id_column_name
+		self._build()
+
+	@property
+	def corpus_data(self) -> pd.DataFrame:
+		return self._corpus_ref()
+
+	def _build(self):
+		doc_ids = self.corpus_data[self.id_column_name].to_numpy()
+		is_first = ~pd.Index(doc_ids).duplicated(keep="first")
+		self._corpus_size = len(doc_ids)
+		self._id_index = pd.Index(doc_ids[is_first])
+		self._first_rows = np.flatnonzero(is_first)
+
+	def _find_rows(self, ids: np.ndarray) -> np.ndarray:
+		positions = self._id_index.get_indexer(ids)
+		return np.where(positions >= 0, self._first_rows[positions], -1)
+
+	def _is_stale(self, ids: np.ndarray, rows: np.ndarray) -> bool:
+		doc_ids = self.corpus_data[self.id_column_name].to_numpy()
+		return (
+			len(doc_ids) != self._corpus_size
+			or bool((rows < 0).any())
+			or not bool((doc_ids[rows] == ids).all())
+		)
+
+	def get_rows(self, ids: List[Any]) -> np.ndarray:
+		"""
+		Find the row positions of the doc ids.
+
+		:param ids: The doc ids. The id that is not a string or an empty string is skipped.
+		:return: The row position of each id. It is -1 for the skipped ids.
+		:raises ValueError: When some doc ids are not in the corpus.
+		"""
+		ids = list(ids)
+		rows = np.full(len(ids), -1, dtype=np.int64)
+		valid = np.fromiter(
+			(isinstance(id_, str) and id_ != "" for id_ in ids),
+			dtype=bool,
+			count=len(ids),
+		)
+		if not valid.any():
+			return rows
+		valid_ids = np.array(ids, dtype=object)[valid]
+		valid_rows = self._find_rows(valid_ids)
+		if self._is_stale(valid_ids, valid_rows):
+			self._build()
+			valid_rows = self._find_rows(valid_ids)
+		if (valid_rows < 0).any():
+			raise ValueError(
+				f"doc_id: {valid_ids[valid_rows < 0].tolist()} not found in corpus_data."
+			)
+		rows[valid] = valid_rows
+		return rows
+
+	def take(self, ids: List[Any], column_name: str = "contents") -> List[Any]:
+		"""
+		Get the column values of the doc ids.
+
+		:param ids: The doc ids.
+		:param column_name: The column name to get. Default is 'contents'.
+		:return: The column value of each id.
+		    It is None for the id that is not a string or an empty string.
+		"""
+		rows = self.get_rows(ids)
+		values = np.full(len(rows), None, dtype=object)
+		found = rows >= 0
+		if found.any():
+			values[found] = self.corpus_data[column_name].iloc[rows[found]].tolist()
+		return values.tolist()
+
+	def take_nested(
+		self, ids: List[List[Any]], column_name: str = "contents"
+	) -> List[List[Any]]:
+		"""
+		Get the column values of the 2-d list of doc ids with one lookup.
+		The length of each inner list can be different, and the empty inner list results in ``[None]``.
+
+		:param ids: The 2-d list of doc ids.
+		:param column_name: The column name to get. Default is 'contents'.
+		:return: The 2-d list of the column values, in the same shape of ids.
+		"""
+		inner_lists = list(map(_to_inner_list, ids))
+		flatten_values = self.take(
+			[id_ for inner in inner_lists for id_ in inner], column_name
+		)
+		result, start = [], 0
+		for inner in inner_lists:
+			result.append(flatten_values[start : start + len(inner)])
+			start += len(inner)
+		return result
+
+
+def get_corpus_lookup(
+	corpus_data: pd.DataFrame, id_column_name: str = "doc_id"
+) -> CorpusLookup:
+	"""
+	Get the CorpusLookup of the corpus dataframe.
+	The lookup is built once for each dataframe object and reused while the dataframe is alive.
+
+	:param corpus_data: The corpus dataframe.
+	:param id_column_name: The column name of the doc id. Default is 'doc_id'.
+	:return: The CorpusLookup instance.
+	"""
+	key = id(corpus_data)
+	lookup = _corpus_lookups.get(key)
+	if (
+		lookup is not None
+		and lookup.corpus_data is corpus_data
+		and lookup.id_column_name == id_column_name
+	):
+		return lookup
+
+	lookup = CorpusLookup(corpus_data, id_column_name)
+	with _corpus_lookups_lock:
+		if _corpus_lookups.get(key) is None:
+			weakref.finalize(corpus_data, _corpus_lookups.pop, key, None)
+		_corpus_lookups[key] = lookup
+	return lookup
+
+
+def get_corpus_path(data_dir: str) -> str:
+	"""
+	Get the corpus file path of the data directory.
+	It is the corpus table file when the data directory has it, like the runner snapshot.
+	If not, it is the corpus parquet file.
+
+	:param data_dir: The data directory of the project.
+	:return: The corpus file path.
+	"""
+	table_path = os.path.join(data_dir, CORPUS_TABLE_NAME)
+	if os.path.exists(table_path):
+		return table_path
+	return os.path.join(data_dir, "corpus.parquet")
+
+
+def save_corpus_table(corpus_df: pd.DataFrame, table_path: str):
+	"""
+	Save the corpus dataframe as an uncompressed Arrow IPC file.
+	The file is memory-mapped by ``load_corpus_data`` without the parquet decoding.
+
+	:param corpus_df: The corpus dataframe.
+	:param table_path: The path of the corpus table file.
+	"""
+	table = pa.Table.from_pandas(corpus_df, preserve_index=False)
+	tmp_path = f"{table_path}.tmp"
+	with pa.OSFile(tmp_path, "wb") as sink:
+		with pa.ipc.new_file(sink, table.schema) as writer:
+			writer.write_table(table)
+	os.replace(tmp_path, table_path)
+
+
+def load_corpus_data(corpus_path: str, cast: bool = False) -> pd.DataFrame:
+	"""
+	Load the corpus parquet file with the process-wide corpus cache.
+	The file is read once with the memory-mapped Arrow reader,
+	and the same dataframe is returned until the file is modified.
+	The corpus table file from ``save_corpus_table`` (``.arrow``) is loaded as well.
+	The modification is detected by the mtime and the size of the file.
+	The returned dataframe is shared between the modules, so do not modify it in place.
+	Copy it first when you need to change it.
+
+	:param corpus_path: The path of the corpus parquet file or the corpus table file.
+	:param cast: If True, validate and cast the corpus with ``cast_corpus_dataset``.
+	    The cast result is cached separately from the raw corpus.
+	:return: The shared corpus dataframe.
+	"""
+	corpus_path = os.path.abspath(corpus_path)
+	stat = os.stat(corpus_path)
+	signature = (stat.st_mtime_ns, stat.st_size)
+	key = (corpus_path, cast)
+	with _corpus_cache_lock:
+		cached = _corpus_cache.get(key)
+		if cached is not None and cached[0] == signature:
+			_corpus_cache.move_to_end(key)
+			return cached[1]
+
+		if cast:
+			# preprocess imports util, which imports this module
+			from autorag.utils.preprocess import cast_corpus_dataset
+
+			corpus_df = cast_corpus_dataset(load_corpus_data(corpus_path))
+		elif corpus_path.endswith(".arrow"):
+			source = pa.memory_map(corpus_path, "r")
+			corpus_df = pa.ipc.open_file(source).read_all().to_pandas()
+		else:
+			corpus_df = pq.read_table(corpus_path, memory_map=True).to_pandas()
+		_corpus_cache[key] = (signature, corpus_df)
+		_corpus_cache.move_to_end(key)
+		while len(_corpus_cache) > CORPUS_CACHE_SIZE:
+			_corpus_cache.popitem(last=False)
+		return corpus_df
+
+
+def clear_corpus_cache():
+	"""
+	Remove every corpus dataframe from the process-wide corpus cache.
+	"""
+	with _corpus_cache_lock:
+		_corpus_cache.clear()
+
+
+def _to_inner_list(inner: Any) -> List[Any]:
+	# keep the same shape with exploding the pandas column
+	if isinstance(inner, str) or not isinstance(inner, Iterable):
+		return [inner]
+	inner = list(inner)
+	return inner if len(inner) > 0 else [None]
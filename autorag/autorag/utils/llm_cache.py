@@ -0,0 +1,289 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable, List
+
+logger = logging.getLogger("AutoRAG")
+
+LLM_CACHE_FILENAME = "llm_cache.sqlite"
+LLM_CACHE_MAX_BYTES = 1024**3
+# the ratio of the responses that are evicted at once when the cache is too big
+LLM_CACHE_EVICT_RATIO = 0.1
+
+_llm_caches: Dict[str, "LLMResponseCache"] = {}
+_llm_caches_lock = threading.Lock()
+
+
+class LLMResponseCache:
+	def __init__(
+		self,
+		path: str,
+		ttl: Optional[float] = None,
+		max_bytes: int = LLM_CACHE_MAX_BYTES,
+	):
+		"""
+		The persistent LLM response cache in a SQLite file.
+		The responses are saved as JSON with the sha256 key of (model, prompt, sampling params).
+		The responses older than ttl are not used,
+		and the least recently used responses are evicted when the cache is bigger than max_bytes.
+
+		:param path: The SQLite file path.
+		:param ttl: The seconds that a response is valid. Default is None, which never expires.
+		:param max_bytes: The maximum size of the saved responses in bytes.
+		"""
+		self.path = path
+		self.ttl = ttl
+		self.max_bytes = max_bytes
+		self.hits = 0
+		self.misses = 0
+		self._lock = threading.Lock()
+		os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+		self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+		with self._lock, self._conn:
+			self._conn.execute("PRAGMA journal_mode=WAL")
+			self._conn.execute("PRAGMA synchronous=NORMAL")
+			self._conn.execute(
+				"CREATE TABLE IF NOT EXISTS responses ("
+				"key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+				"created_at REAL NOT NULL, last_used REAL NOT NULL, size INTEGER NOT NULL)"
+			)
+			self._conn.execute(
+				"CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+			)
+			if ttl is not None:
+				self._conn.execute(
+					"DELETE FROM responses WHERE created_at < ?", (time.time() - ttl,)
+				)
+			self._total_bytes = self._conn.execute(
+				"SELECT COALESCE(SUM(size), 0) FROM responses"
+			).fetchone()[0]
+
+	@staticmethod
+	def make_key(model: Any, prompt: Any, params: Dict[str, Any]) -> str:
+		key = json.dumps(
+			{"model": model, "prompt": prompt, "params": params},
+			sort_keys=True,
+			default=str,
+		)
+		return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+	def get(self, key: str) -> Optional[Any]:
+		"""
+		Get the cached response.
+
+		:param key: The key from make_key.
+		:return: The response. None when it is not in the cache or expired.
+		"""
+		now = time.time()
+		with self._lock, self._conn:
+			row = self._conn.execute(
+				"SELECT value, created_at FROM responses WHERE key = ?", (key,)
+			).fetchone()
+			if row is None or (self.ttl is not None and row[1] < now - self.ttl):
+				self.misses += 1
+				return None
+			self._conn.execute(
+				"UPDATE responses SET last_used = ? WHERE key = ?", (now, key)
+			)
+			self.hits += 1
+		return json.loads(row[0])
+
+	def put(self, key: str, value: Any):
+		"""
+		Put the response to the cache.
+
+		:param key: The key from make_key.
+		:param value: The JSON serializable response.
+		"""
+		value = json.dumps(value)
+		size = len(key) + len(value)
+		now = time.time()
+		with self._lock, self._conn:
+			old = self._conn.execute(
+				"SELECT size FROM responses WHERE key = ?", (key,)
+			).fetchone()
+			self._conn.execute(
+				"INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+				(key, value, now, now, size),
+			)
+			self._total_bytes += size - (old[0] if old is not None else 0)
+			if self._total_bytes > self.max_bytes:
+				self._evict()
+
+	def _evict(self):
+		# must be called with the lock
+		if self.ttl is not None:
+			self._conn.execute(
+				"DELETE FROM responses WHERE created_at < ?", (time.time() - self.ttl,)
+			)
+		count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+		self._conn.execute(
+			"DELETE FROM responses WHERE key IN "
+			"(SELECT key FROM responses ORDER BY last_used LIMIT ?)",
+			(max(1, int(count * LLM_CACHE_EVICT_RATIO)),),
+		)
+		self._total_bytes = self._conn.execute(
+			"SELECT COALESCE(SUM(size), 0) FROM responses"
+		).fetchone()[0]
+
+	def stats(self) -> Dict[str, Any]:
+		"""
+		Get the statistics of the cache.
+
+		:return: The dictionary of hits, misses, hit_rate, size (the count of cached responses) and bytes.
+		"""
+		with self._lock:
+			size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+			total = self.hits + self.misses
+			return {
+				"hits": self.hits,
+				"misses": self.misses,
+				"hit_rate": self.hits / total if total > 0 else 0.0,
+				"size": size,
+				"bytes": self._total_bytes,
+			}
+
+	def close(self):
+		with self._lock:
+			self._conn.close()
+
+
+def get_llm_cache_path() -> Optional[str]:
+	"""
+	Get the LLM response cache file path.
+	It is 'llm_cache.sqlite' at the AUTORAG_LLM_CACHE_DIR environment variable when it is set.
+	Set it to an empty string to disable the LLM response cache.
+	If not, it is at 'resources' of the project directory (PROJECT_DIR environment variable).
+
+	:return: The LLM response cache file path. None when the LLM response cache is disabled.
+	"""
+	if "AUTORAG_LLM_CACHE_DIR" in os.environ:
+		cache_dir = os.environ["AUTORAG_LLM_CACHE_DIR"]
+		return os.path.join(cache_dir, LLM_CACHE_FILENAME) if cache_dir else None
+	project_dir = os.environ.get("PROJECT_DIR")
+	if project_dir is None or not os.path.isdir(os.path.join(project_dir, "resources")):
+		return None
+	return os.path.join(project_dir, "resources", LLM_CACHE_FILENAME)
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+	"""
+	Get the LLMResponseCache of the current LLM response cache path.
+	The AUTORAG_LLM_CACHE_TTL environment variable sets the TTL seconds,
+	and the AUTORAG_LLM_CACHE_MAX_BYTES environment variable sets the maximum size.
+
+	:return: The LLMResponseCache instance. None when the LLM response cache is disabled.
+	"""
+	path = get_llm_cache_path()
+	if path is None:
+		return None
+	path = os.path.abspath(path)
+	with _llm_caches_lock:
+		if path not in _llm_caches:
+			ttl = os.environ.get("AUTORAG_LLM_CACHE_TTL")
+			_llm_caches[path] = LLMResponseCache(
+				path,
+				ttl=float(ttl) if ttl else None,
+				max_bytes=int(
+					os.environ.get("AUTORAG_LLM_CACHE_MAX_BYTES", LLM_CACHE_MAX_BYTES)
+				),
+			)
+		return _llm_caches[path]
+
+
+def get_llm_cache_stats() -> Dict[str, Dict[str, Any]]:
+	"""
+	Get the statistics of every LLM response cache in this process.
+
+	:return: The dictionary of the cache file path and its statistics.
+	"""
+	with _llm_caches_lock:
+		caches = list(_llm_caches.values())
+	return {cache.path: cache.stats() for cache in caches}
+
+
+def is_llm_cacheable(temperature: Optional[float]) -> bool:
+	"""
+	Whether the LLM response can be cached.
+	Only the deterministic responses with zero temperature are cached,
+	unless the AUTORAG_LLM_CACHE_FORCE environment variable is set to 1 or true.
+
+	:param temperature: The sampling temperature. None when it is unknown.
+	:return: Whether to use the cache.
+	"""
+	if os.environ.get("AUTORAG_LLM_CACHE_FORCE", "").lower() in ["1", "true"]:
+		return True
+	return temperature is not None and temperature <= 0
+
+
+async def acached_llm_call(
+	model: Any,
+	prompt: Any,
+	params: Dict[str, Any],
+	temperature: Optional[float],
+	call: Callable[[], Awaitable[Any]],
+	dump: Callable[[Any], Any] = lambda x: x,
+	load: Callable[[Any], Any] = lambda x: x,
+) -> Any:
+	"""
+	Call the LLM with the LLM response cache.
+
+	:param model: The model identity, like the model name or the model configuration dictionary.
+	:param prompt: The prompt.
+	:param params: The sampling parameters and the other parameters that change the response.
+	:param temperature: The sampling temperature. The response is cached only at zero temperature.
+	:param call: The no-argument function that returns the awaitable of the LLM call.
+	:param dump: The function that converts the response to the JSON serializable value.
+	:param load: The function that converts the cached value to the response.
+	:return: The response.
+	"""
+	cache = get_llm_cache()
+	if cache is None or not is_llm_cacheable(temperature):
+		return await call()
+	key = cache.make_key(model, prompt, params)
+	value = cache.get(key)
+	if value is not None:
+		return load(value)
+	response = await call()
+	cache.put(key, dump(response))
+	return response
+
+
+def cached_llm_batch(
+	model: Any,
+	prompts: List[Any],
+	params: Dict[str, Any],
+	temperature: Optional[float],
+	call: Callable[[List[Any]], List[Any]],
+	dump: Callable[[Any], Any] = lambda x: x,
+	load: Callable[[Any], Any] = lambda x: x,
+) -> List[Any]:
+	"""
+	Call the LLM with a batch of prompts, and only the prompts that are not in the cache are sent.
+
+	:param model: The model identity, like the model name or the model configuration dictionary.
+	:param prompts: The prompts.
+	:param params: The sampling parameters and the other parameters that change the response.
+	:param temperature: The sampling temperature. The responses are cached only at zero temperature.
+	:param call: The function that gets the list of the prompts and returns their responses.
+	:param dump: The function that converts a response to the JSON serializable value.
+	:param load: The function that converts a cached value to the response.
+	:return: The responses of the prompts.
+	"""
+	cache = get_llm_cache()
+	if cache is None or not is_llm_cacheable(temperature):
+		return call(prompts)
+	keys = [cache.make_key(model, prompt, params) for prompt in prompts]
+	values = [cache.get(key) for key in keys]
+	results = [load(value) if value is not None else None for value in values]
+	missing = [i for i, value in enumerate(values) if value is None]
+	if missing:
+		responses = call([prompts[i] for i in missing])
+		for i, response in zip(missing, responses):
+			cache.put(keys[i], dump(response))
+			results[i] = response
+	return results
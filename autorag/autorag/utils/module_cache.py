@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, Any, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+import autorag
+from autorag.utils.util import to_list
+
+logger = logging.getLogger("AutoRAG")
+
+MODULE_CACHE_DIRNAME = "module_cache"
+# the DataFrame.attrs key of the execution time of the module when the result is from the cache
+MODULE_CACHE_TIME_ATTR = "autorag_module_cache_execution_time"
+
+_file_fingerprints: Dict[str, Tuple[int, int, str]] = {}
+_file_fingerprints_lock = threading.Lock()
+
+
+def get_module_cache_dir(project_dir: Union[str, Path]) -> Optional[str]:
+	"""
+	Get the module result cache directory.
+	It is the AUTORAG_MODULE_CACHE_DIR environment variable when it is set.
+	Set it to an empty string to disable the module result cache.
+	If not, it is 'resources/module_cache' of the project directory, which is made by the Evaluator.
+
+	:param project_dir: The project directory.
+	:return: The module result cache directory. None when the module result cache is disabled.
+	"""
+	if "AUTORAG_MODULE_CACHE_DIR" in os.environ:
+		return os.environ["AUTORAG_MODULE_CACHE_DIR"] or None
+	cache_dir = os.path.join(str(project_dir), "resources", MODULE_CACHE_DIRNAME)
+	return cache_dir if os.path.isdir(cache_dir) else None
+
+
+def file_fingerprint(path: str) -> Optional[str]:
+	"""
+	Get the sha256 of the file content.
+	It is computed again only when the modified time or the size of the file is changed.
+
+	:param path: The file path.
+	:return: The sha256 hex digest. None when the file does not exist.
+	"""
+	try:
+		stat = os.stat(path)
+	except FileNotFoundError:
+		return None
+	path = os.path.abspath(path)
+	with _file_fingerprints_lock:
+		cached = _file_fingerprints.get(path)
+	if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+		return cached[2]
+	sha = hashlib.sha256()
+	with open(path, "rb") as f:
+		for chunk in iter(lambda: f.read(1024 * 1024), b""):
+			sha.update(chunk)
+	digest = sha.hexdigest()
+	with _file_fingerprints_lock:
+		_file_fingerprints[path] = (stat.st_mtime_ns, stat.st_size, digest)
+	return digest
+
+
+def dataframe_fingerprint(df: pd.DataFrame) -> str:
+	"""
+	Get the sha256 of the dataframe columns and values.
+	The cells of lists and numpy arrays are hashed by their values,
+	so the dataframe read from a parquet file has the same fingerprint as the original one.
+
+	:param df: The dataframe.
+	:return: The sha256 hex digest.
+	"""
+	sha = hashlib.sha256()
+	sha.update(str(len(df)).encode("utf-8"))
+	for column in df.columns:
+		sha.update(str(column).encode("utf-8"))
+		series = df[column]
+		if series.dtype == object:
+			series = series.map(
+				lambda x: json.dumps(to_list(x), sort_keys=True, default=str)
+			)
+		sha.update(pd.util.hash_pandas_object(series, index=False).values.tobytes())
+	return sha.hexdigest()
+
+
+def make_module_cache_key(
+	module_name: str,
+	project_dir: Union[str, Path],
+	previous_result: pd.DataFrame,
+	args: Tuple,
+	kwargs: Dict[str, Any],
+) -> str:
+	"""
+	Make the content-addressed key of the module result.
+	The key changes when the module, its parameters, the previous result,
+	the corpus and qa data or the vectordb config of the project is changed,
+	and when the AutoRAG version is changed.
+	"""
+	project_dir = str(project_dir)
+	key = json.dumps(
+		{
+			"autorag_version": autorag.__version__,
+			"module": module_name,
+			"args": list(args),
+			"params": kwargs,
+			"previous_result": dataframe_fingerprint(previous_result),
+			"qa": file_fingerprint(os.path.join(project_dir, "data", "qa.parquet")),
+			"corpus": file_fingerprint(
+				os.path.join(project_dir, "data", "corpus.parquet")
+			),
+			"vectordb": file_fingerprint(
+				os.path.join(project_dir, "resources", "vectordb.yaml")
+			),
+		},
+		sort_keys=True,
+		default=str,
+	)
+	return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def load_module_result(
+	cache_dir: str, key: str
+) -> Optional[Tuple[pd.DataFrame, float]]:
+	"""
+	Load the cached module result.
+
+	:param cache_dir: The module result cache directory.
+	:param key: The key from make_module_cache_key.
+	:return: The result dataframe and the execution time of the module run that made it.
+	    None when it is not in the cache.
+	"""
+	result_path = os.path.join(cache_dir, f"{key}.parquet")
+	meta_path = os.path.join(cache_dir, f"{key}.json")
+	if not (os.path.exists(result_path) and os.path.exists(meta_path)):
+		return None
+	try:
+		with open(meta_path, "r") as f:
+			meta = json.load(f)
+		result = pd.read_parquet(result_path, engine="pyarrow")
+	except Exception as e:
+		logger.warning(f"Failed to load the cached module result {key}: {e}")
+		return None
+	# parquet reads the list cells as numpy arrays
+	for column in result.columns:
+		if result[column].dtype == object:
+			result[column] = result[column].map(
+				lambda x: to_list(x) if isinstance(x, np.ndarray) else x
+			)
+	return result, meta["execution_time"]
+
+
+def save_module_result(
+	cache_dir: str,
+	key: str,
+	result: pd.DataFrame,
+	execution_time: float,
+	module_name: str,
+):
+	"""
+	Save the module result to the cache.
+	The result that can't be saved as parquet is not cached.
+
+	:param cache_dir: The module result cache directory.
+	:param key: The key from make_module_cache_key.
+	:param result: The result dataframe.
+	:param execution_time: The execution time of the module in seconds.
+	:param module_name: The module name. It is saved to the metadata file.
+	"""
+	os.makedirs(cache_dir, exist_ok=True)
+	result_path = os.path.join(cache_dir, f"{key}.parquet")
+	meta_path = os.path.join(cache_dir, f"{key}.json")
+	# write to temporary files first, so the other processes never read a partial file
+	tmp_suffix = f".{uuid.uuid4().hex}.tmp"
+	try:
+		result.to_parquet(result_path + tmp_suffix, engine="pyarrow")
+		os.replace(result_path + tmp_suffix, result_path)
+	except Exception as e:
+		logger.debug(f"The result of {module_name} is not cached: {e}")
+		if os.path.exists(result_path + tmp_suffix):
+			os.remove(result_path + tmp_suffix)
+		return
+	with open(meta_path + tmp_suffix, "w") as f:
+		json.dump(
+			{
+				"module": module_name,
+				"execution_time": execution_time,
+				"created_at": time.time(),
+			},
+			f,
+		)
+	os.replace(meta_path + tmp_suffix, meta_path)
@@ -0,0 +1,286 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Optional, Callable, Awaitable, Any, Tuple, Type, Mapping
+
+logger = logging.getLogger("AutoRAG")
+
+
+class RateLimiter:
+	"""
+	Token bucket rate limiter for the requests per minute (RPM) and the tokens per minute (TPM).
+	Each bucket starts full and refills continuously, so a burst up to the quota is allowed
+	and the average rate never goes over the quota.
+	A request reserves its budget at once and waits for the deficit to refill,
+	so the waiting requests are served in order.
+	It is thread-safe and does not bind to an event loop,
+	so it can be shared by many process_batch calls to keep one budget for the same API key.
+	"""
+
+	def __init__(
+		self,
+		requests_per_minute: Optional[float] = None,
+		tokens_per_minute: Optional[float] = None,
+	):
+		"""
+		:param requests_per_minute: The maximum number of requests per minute.
+		    Default is None, which means no limit.
+		:param tokens_per_minute: The maximum number of tokens per minute.
+		    Default is None, which means no limit.
+		"""
+		if requests_per_minute is not None and requests_per_minute <= 0:
+			raise ValueError("requests_per_minute must be positive.")
+		if tokens_per_minute is not None and tokens_per_minute <= 0:
+			raise ValueError("tokens_per_minute must be positive.")
+		self.requests_per_minute = requests_per_minute
+		self.tokens_per_minute = tokens_per_minute
+		self.available_requests = requests_per_minute
+		self.available_tokens = tokens_per_minute
+		self.updated_at = time.monotonic()
+		self._lock = threading.Lock()
+
+	def _refill(self):
+		now = time.monotonic()
+		elapsed_minutes = (now - self.updated_at) / 60
+		self.updated_at = now
+		if self.requests_per_minute is not None:
+			self.available_requests = min(
+				self.requests_per_minute,
+				self.available_requests + elapsed_minutes * self.requests_per_minute,
+			)
+		if self.tokens_per_minute is not None:
+			self.available_tokens = min(
+				self.tokens_per_minute,
+				self.available_tokens + elapsed_minutes * self.tokens_per_minute,
+			)
+
+	def _reserve(self, tokens: float) -> float:
+		"""
+		Consume one request with the tokens and return the seconds to wait until the budget is refilled.
+		"""
+		wait_minutes = 0.0
+		with self._lock:
+			self._refill()
+			if self.requests_per_minute is not None:
+				self.available_requests -= 1
+				if self.available_requests < 0:
+					wait_minutes = -self.available_requests / self.requests_per_minute
+			if self.tokens_per_minute is not None:
+				self.available_tokens -= min(tokens, self.tokens_per_minute)
+				if self.available_tokens < 0:
+					wait_minutes = max(
+						wait_minutes, -self.available_tokens / self.tokens_per_minute
+					)
+		return wait_minutes * 60
+
+	async def acquire(self, tokens: int = 0):
+		"""
+		Wait until one request with the given tokens fits in the quota.
+		The request that has more tokens than tokens_per_minute waits for a full bucket.
+
+		:param tokens: The number of tokens that the request uses.
+		    Default is 0.
+		"""
+		wait_seconds = self._reserve(tokens)
+		if wait_seconds > 0:
+			await asyncio.sleep(wait_seconds)
+
+	def adjust_tokens(self, tokens: int):
+		"""
+		Consume more tokens, or give back tokens with a negative value.
+		Use it when the real token usage of a request is different from the reserved tokens.
+		"""
+		with self._lock:
+			if self.tokens_per_minute is not None:
+				self._refill()
+				self.available_tokens = min(
+					self.tokens_per_minute, self.available_tokens - tokens
+				)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+	"""
+	RateLimiter that also limits the number of the running requests,
+	and adapts the limit with AIMD (additive increase, multiplicative decrease).
+	The limit increases by one after each round of successful requests,
+	and halves when the API answers with a rate limit error.
+	The RPM and TPM quota can be learned from the rate limit headers of the API responses.
+	"""
+
+	def __init__(
+		self,
+		requests_per_minute: Optional[float] = None,
+		tokens_per_minute: Optional[float] = None,
+		initial_concurrency: int = 16,
+		max_concurrency: int = 256,
+		max_retries: int = 3,
+	):
+		"""
+		:param requests_per_minute: The maximum number of requests per minute.
+		    Default is None, which learns it from the response headers.
+		:param tokens_per_minute: The maximum number of tokens per minute.
+		    Default is None, which learns it from the response headers.
+		:param initial_concurrency: The number of the running requests at the start.
+		    Default is 16.
+		:param max_concurrency: The maximum number of the running requests.
+		    Default is 256.
+		:param max_retries: The maximum number of retries of a rate-limited request in run.
+		    Default is 3.
+		"""
+		super().__init__(requests_per_minute, tokens_per_minute)
+		if initial_concurrency <= 0 or max_concurrency < initial_concurrency:
+			raise ValueError(
+				"initial_concurrency must be positive and not bigger than max_concurrency."
+			)
+		self.fixed_requests_per_minute = requests_per_minute is not None
+		self.fixed_tokens_per_minute = tokens_per_minute is not None
+		self.concurrency = initial_concurrency
+		self.max_concurrency = max_concurrency
+		self.max_retries = max_retries
+		self.running = 0
+		self.paused_until = 0.0
+		self.decreased_at = 0.0
+		self._successes = 0
+		self._waiters = deque()
+
+	async def acquire(self, tokens: int = 0):
+		wait_seconds = self.paused_until - time.monotonic()
+		if wait_seconds > 0:
+			await asyncio.sleep(wait_seconds)
+		await super().acquire(tokens)
+
+	def _wake_waiters(self):
+		# must be called with the lock
+		while self._waiters and self.running < self.concurrency:
+			self.running += 1
+			loop, future = self._waiters.popleft()
+			loop.call_soon_threadsafe(self._hand_over, future)
+
+	def _hand_over(self, future: asyncio.Future):
+		if future.done():  # the waiter is cancelled, so pass the slot to the next one
+			self._release_slot()
+		else:
+			future.set_result(None)
+
+	async def _acquire_slot(self):
+		loop = asyncio.get_running_loop()
+		with self._lock:
+			if self.running < self.concurrency and not self._waiters:
+				self.running += 1
+				return
+			future = loop.create_future()
+			self._waiters.append((loop, future))
+		try:
+			await future
+		except asyncio.CancelledError:
+			with self._lock:
+				if (loop, future) in self._waiters:
+					self._waiters.remove((loop, future))
+					raise
+			if future.done() and not future.cancelled():
+				self._release_slot()
+			raise
+
+	def _release_slot(self):
+		with self._lock:
+			self.running -= 1
+			self._wake_waiters()
+
+	def on_success(self):
+		with self._lock:
+			self._successes += 1
+			if self._successes >= self.concurrency:
+				self._successes = 0
+				self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+				self._wake_waiters()
+
+	def on_rate_limited(self, retry_after: Optional[float] = None):
+		"""
+		Halve the concurrency and pause the new requests.
+		The rate limit errors in one second count as one, because they come from the same burst.
+
+		:param retry_after: The seconds to pause. Default is None, which pauses one second.
+		"""
+		now = time.monotonic()
+		with self._lock:
+			self.paused_until = max(self.paused_until, now + (retry_after or 1.0))
+			if now - self.decreased_at >= 1.0:
+				self.decreased_at = now
+				self._successes = 0
+				self.concurrency = max(1, self.concurrency // 2)
+				logger.warning(
+					f"Rate limited. Decrease the concurrency to {self.concurrency}."
+				)
+
+	def update_from_headers(self, headers: Mapping[str, str]):
+		"""
+		Update the quota and the remaining budget from the rate limit headers.
+		It reads x-ratelimit-limit-requests, x-ratelimit-limit-tokens,
+		x-ratelimit-remaining-requests and x-ratelimit-remaining-tokens.
+		"""
+
+		def get_number(key: str) -> Optional[float]:
+			try:
+				return float(headers[key])
+			except (KeyError, TypeError, ValueError):
+				return None
+
+		limit_requests = get_number("x-ratelimit-limit-requests")
+		limit_tokens = get_number("x-ratelimit-limit-tokens")
+		remaining_requests = get_number("x-ratelimit-remaining-requests")
+		remaining_tokens = get_number("x-ratelimit-remaining-tokens")
+		with self._lock:
+			self._refill()
+			if limit_requests and not self.fixed_requests_per_minute:
+				if self.requests_per_minute is None:
+					self.available_requests = limit_requests
+				self.requests_per_minute = limit_requests
+			if limit_tokens and not self.fixed_tokens_per_minute:
+				if self.tokens_per_minute is None:
+					self.available_tokens = limit_tokens
+				self.tokens_per_minute = limit_tokens
+			if remaining_requests is not None and self.requests_per_minute is not None:
+				self.available_requests = min(
+					self.available_requests, remaining_requests
+				)
+			if remaining_tokens is not None and self.tokens_per_minute is not None:
+				self.available_tokens = min(self.available_tokens, remaining_tokens)
+
+	async def run(
+		self,
+		request: Callable[[], Awaitable[Any]],
+		tokens: int = 0,
+		rate_limit_exceptions: Tuple[Type[BaseException], ...] = (),
+		get_used_tokens: Optional[Callable[[Any], Optional[int]]] = None,
+	) -> Any:
+		"""
+		Run the request in the concurrency limit and the quota.
+
+		:param request: The no-argument function that returns the awaitable of the request.
+		:param tokens: The estimated tokens of the request.
+		:param rate_limit_exceptions: The exception types of the rate limit error.
+		    The request is retried after the pause when it raises one of them.
+		:param get_used_tokens: The optional function that gets the real used tokens from the result.
+		    The difference from the estimated tokens is given back to the budget.
+		:return: The result of the request.
+		"""
+		for attempt in range(self.max_retries + 1):
+			await self._acquire_slot()
+			try:
+				await self.acquire(tokens)
+				result = await request()
+			except rate_limit_exceptions:
+				self.on_rate_limited()
+				if attempt >= self.max_retries:
+					raise
+				continue
+			finally:
+				self._release_slot()
+			self.on_success()
+			if get_used_tokens is not None:
+				used_tokens = get_used_tokens(result)
+				if used_tokens is not None:
+					self.adjust_tokens(used_tokens - tokens)
+			return result
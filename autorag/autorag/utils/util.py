@@ -8,11 +8,22 @@ import itertools
 import json
 import logging
 import os
+import random
 import re
 import string
 from copy import deepcopy
 from json import JSONDecoder
-from typing import List, Callable, Dict, Optional, Any, Collection, Iterable
+from typing import (
+	List,
+	Callable,
+	Dict,
+	Optional,
+	Any,
+	Collection,
+	Iterable,
+	Tuple,
+	Type,
+)
 
 from asyncio import AbstractEventLoop
 import emoji
@@ -26,21 +37,29 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from pydantic import BaseModel as BM
 from pydantic.v1 import BaseModel
 
+from autorag.utils.corpus import get_corpus_lookup
+from autorag.utils.rate_limit import RateLimiter
+
 logger = logging.getLogger("AutoRAG")
 
+# The maximum seconds to wait before retrying a failed task in process_batch
+MAX_RETRY_DELAY = 60.0
+
 
 def fetch_contents(
 	corpus_data: pd.DataFrame, ids: List[List[str]], column_name: str = "contents"
 ) -> List[List[Any]]:
-	def fetch_contents_pure(
-		ids: List[str], corpus_data: pd.DataFrame, column_name: str
-	):
-		return list(map(lambda x: fetch_one_content(corpus_data, x, column_name), ids))
+	"""
+	Fetch the column values of the 2-d list of doc ids from the corpus dataframe.
+	The doc ids are found with the doc_id to row index of the corpus dataframe,
+	which is built once for each corpus dataframe.
 
-	result = flatten_apply(
-		fetch_contents_pure, ids, corpus_data=corpus_data, column_name=column_name
-	)
-	return result
+	:param corpus_data: The corpus dataframe.
+	:param ids: The 2-d list of doc ids.
+	:param column_name: The column name to fetch. Default is 'contents'.
+	:return: The 2-d list of the column values, in the same shape of ids.
+	"""
+	return get_corpus_lookup(corpus_data).take_nested(ids, column_name)
 
 
 def fetch_one_content(
@@ -49,16 +68,7 @@ def fetch_one_content(
 	column_name: str = "contents",
 	id_column_name: str = "doc_id",
 ) -> Any:
-	if isinstance(id_, str):
-		if id_ in ["", ""]:
-			return None
-		fetch_result = corpus_data[corpus_data[id_column_name] == id_]
-		if fetch_result.empty:
-			raise ValueError(f"doc_id: {id_} not found in corpus_data.")
-		else:
-			return fetch_result[column_name].iloc[0]
-	else:
-		return None
+	return get_corpus_lookup(corpus_data, id_column_name).take([id_], column_name)[0]
 
 
 def result_to_dataframe(column_names: List[str]):
@@ -80,6 +90,8 @@ def result_to_dataframe(column_names: List[str]):
 			result_df = pd.DataFrame(df_input)
 			return result_df
 
+		# the result columns of the raw results from wrapper.__wrapped__
+		wrapper.result_columns = column_names
 		return wrapper
 
 	return decorator_result_to_dataframe
@@ -289,21 +301,93 @@ def convert_env_in_dict(d: Dict):
 	return d
 
 
-async def process_batch(tasks, batch_size: int = 64) -> List[Any]:
+async def process_batch(
+	tasks,
+	batch_size: int = 64,
+	rate_limiter: Optional[RateLimiter] = None,
+	token_counts: Optional[List[int]] = None,
+	max_retries: int = 0,
+	retry_delay: float = 1.0,
+	retry_exceptions: Tuple[Type[BaseException], ...] = (Exception,),
+	progress_callback: Optional[Callable[[int, int], None]] = None,
+) -> List[Any]:
 	"""
-	Processes tasks in batches asynchronously.
+	Processes tasks asynchronously with at most batch_size tasks running at once.
+	The next task starts as soon as any running task is done,
+	so one slow task does not stall the other tasks.
 
 	:param tasks: A list of no-argument functions or coroutines to be executed.
-	:param batch_size: The number of tasks to process in a single batch.
+	    The no-argument function must return an awaitable.
+	    Only the tasks given as functions can be retried, because a coroutine can be awaited only once.
+	:param batch_size: The maximum number of tasks running at once.
 	    Default is 64.
-	:return: A list of results from the processed tasks.
-	"""
-	results = []
-
-	for i in range(0, len(tasks), batch_size):
-		batch = tasks[i : i + batch_size]
-		batch_results = await asyncio.gather(*batch)
-		results.extend(batch_results)
+	:param rate_limiter: The optional RateLimiter for the requests and tokens per minute.
+	    Share one RateLimiter between the calls that use the same API quota.
+	    Default is None.
+	:param token_counts: The number of tokens of each task, which is used by the rate_limiter.
+	    Default is None, which counts every task as zero tokens.
+	:param max_retries: The maximum number of retries of the failed task.
+	    Default is 0.
+	:param retry_delay: The base delay seconds of the retry.
+	    The retry waits a random time up to retry_delay * 2 ** attempt seconds.
+	    Default is 1.0.
+	:param retry_exceptions: The exception types to retry.
+	    Default is (Exception,).
+	:param progress_callback: The optional function that is called with (done count, total count)
+	    whenever a task is done.
+	    Default is None.
+	:return: A list of results from the processed tasks, in the order of the tasks.
+	"""
+	tasks = list(tasks)
+	if token_counts is not None and len(token_counts) != len(tasks):
+		raise ValueError("token_counts must have the same length as tasks.")
+	results = [None] * len(tasks)
+	if len(tasks) == 0:
+		return results
+	indices = iter(range(len(tasks)))
+	done_count = 0
+
+	async def run(index: int):
+		task = tasks[index]
+		for attempt in itertools.count():
+			if rate_limiter is not None:
+				await rate_limiter.acquire(
+					token_counts[index] if token_counts is not None else 0
+				)
+			try:
+				return await (task() if callable(task) else task)
+			except retry_exceptions as e:
+				if attempt >= max_retries or not callable(task):
+					raise
+				delay = random.uniform(
+					0, min(retry_delay * 2**attempt, MAX_RETRY_DELAY)
+				)
+				logger.warning(
+					f"Task {index} failed with {e!r}. Retry after {delay:.2f} seconds."
+				)
+				await asyncio.sleep(delay)
+
+	async def worker():
+		nonlocal done_count
+		for index in indices:
+			results[index] = await run(index)
+			done_count += 1
+			if progress_callback is not None:
+				progress_callback(done_count, len(tasks))
+
+	workers = [
+		asyncio.ensure_future(worker()) for _ in range(min(batch_size, len(tasks)))
+	]
+	try:
+		await asyncio.gather(*workers)
+	except BaseException:
+		for worker_task in workers:
+			worker_task.cancel()
+		# close the coroutines that are never started
+		for index in indices:
+			if inspect.iscoroutine(tasks[index]):
+				tasks[index].close()
+		raise
 
 	return results
 
@@ -553,6 +637,44 @@ def embedding_query_content(
 	return query_embeddings, content_embeddings
 
 
+def embedding_query_content_from_vectordb(
+	queries: List[str],
+	contents_list: List[List[str]],
+	ids_list: List[List[str]],
+	vector_store,
+	batch: int = 128,
+):
+	"""
+	Embed the queries, and get the content embeddings from the vector store by their ids.
+	It is the same as embedding_query_content, but the contents that are already stored at the vector store
+	are not embedded again.
+	The embedding model of the vector store is used for the queries and the contents that are not stored.
+
+	:param queries: The list of queries.
+	:param contents_list: The list of lists of contents.
+	:param ids_list: The list of lists of ids of the contents.
+	:param vector_store: The BaseVectorStore instance that has the corpus embeddings.
+	:param batch: The embedding batch size of the queries.
+	:return: The query embeddings and the content embeddings.
+	"""
+	embedding_model = vector_store.embedding
+	queries = vector_store.truncated_inputs(queries)
+	embedding_model.embed_batch_size = batch
+	query_embeddings = embedding_model.get_text_embedding_batch(queries)
+
+	loop = get_event_loop()
+	content_embeddings_flatten = loop.run_until_complete(
+		vector_store.fetch_embeddings(
+			list(itertools.chain.from_iterable(ids_list)),
+			list(itertools.chain.from_iterable(contents_list)),
+		)
+	)
+	content_embeddings = reconstruct_list(
+		content_embeddings_flatten, list(map(len, contents_list))
+	)
+	return query_embeddings, content_embeddings
+
+
 def to_list(item):
 	"""Recursively convert collections to Python lists."""
 	if isinstance(item, np.ndarray):
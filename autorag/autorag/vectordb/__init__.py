@@ -20,6 +20,8 @@ def get_support_vectordb(vectordb_name: str):
 		"Couchbase": ("autorag.vectordb.couchbase", "Couchbase"),
 		"qdrant": ("autorag.vectordb.qdrant", "Qdrant"),
 		"Qdrant": ("autorag.vectordb.qdrant", "Qdrant"),
+		"local": ("autorag.vectordb.local", "Local"),
+		"Local": ("autorag.vectordb.local", "Local"),
 	}
 	return dynamically_find_function(vectordb_name, support_vectordb)
 
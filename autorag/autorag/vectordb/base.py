@@ -1,13 +1,29 @@
+import abc
+import asyncio
+import itertools
 from abc import abstractmethod
+from collections import OrderedDict
 from typing import List, Tuple, Union
 
+import numpy as np
 from llama_index.embeddings.openai import OpenAIEmbedding
 
-from autorag.utils.util import openai_truncate_by_token
+from autorag.utils.util import (
+	openai_truncate_by_token,
+	make_batch,
+	reconstruct_list,
+)
 from autorag.embedding.base import EmbeddingModel
 
+# The maximum count of the fetched embeddings that are kept at the local cache
+VECTOR_FETCH_CACHE_SIZE = 10_000
+# The maximum count of the ids at one fetch request
+VECTOR_FETCH_BATCH = 1_000
+# The maximum count of the search requests that are running at once in batch_query
+VECTOR_SEARCH_MAX_CONCURRENCY = 4
 
-class BaseVectorStore:
+
+class BaseVectorStore(metaclass=abc.ABCMeta):
 	support_similarity_metrics = ["l2", "ip", "cosine"]
 
 	def __init__(
@@ -23,6 +39,7 @@ class BaseVectorStore:
 			similarity_metric in self.support_similarity_metrics
 		), f"search method {similarity_metric} is not supported"
 		self.similarity_metric = similarity_metric
+		self.fetch_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
 
 	@abstractmethod
 	async def add(
@@ -38,6 +55,64 @@ class BaseVectorStore:
 	) -> Tuple[List[List[str]], List[List[float]]]:
 		pass
 
+	@abstractmethod
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		"""
+		Search the Vector DB with the query embeddings.
+		Send the query embeddings in one bulk request, when the Vector DB supports it.
+		"""
+		pass
+
+	async def batch_query(
+		self,
+		queries_list: List[List[str]],
+		top_k: int,
+		search_batch: int = 128,
+		max_concurrency: int = VECTOR_SEARCH_MAX_CONCURRENCY,
+		**kwargs,
+	) -> Tuple[List[List[List[str]]], List[List[List[float]]]]:
+		"""
+		Search the queries of many rows at once.
+		All queries are embedded at once with the embedding batch size of the vector store.
+		Then the query embeddings are split to the bulk search requests of search_batch queries,
+		and at most max_concurrency requests are running at once.
+		The results are scattered back to each row.
+
+		:param queries_list: The list of the queries of each row.
+		:param top_k: The number of the ids to retrieve for each query.
+		:param search_batch: The number of the queries at one search request. Default is 128.
+		:param max_concurrency: The maximum number of the running search requests. Default is 4.
+		:return: The ids and the scores of each query of each row.
+		    Each of them is shaped (rows, queries of the row, top_k).
+		"""
+		flatten_queries = self.truncated_inputs(
+			list(itertools.chain.from_iterable(queries_list))
+		)
+		if len(flatten_queries) == 0:
+			return [[] for _ in queries_list], [[] for _ in queries_list]
+		query_embeddings = await self.embedding.aget_text_embedding_batch(
+			flatten_queries
+		)
+
+		semaphore = asyncio.Semaphore(max_concurrency)
+
+		async def search(embedding_batch: List[List[float]]):
+			async with semaphore:
+				return await self.query_by_embeddings(embedding_batch, top_k, **kwargs)
+
+		results = await asyncio.gather(
+			*[
+				search(embedding_batch)
+				for embedding_batch in make_batch(query_embeddings, search_batch)
+			]
+		)
+		ids = list(itertools.chain.from_iterable(result[0] for result in results))
+		scores = list(itertools.chain.from_iterable(result[1] for result in results))
+		lengths = list(map(len, queries_list))
+		return reconstruct_list(ids, lengths), reconstruct_list(scores, lengths)
+
 	@abstractmethod
 	async def fetch(self, ids: List[str]) -> List[List[float]]:
 		"""
@@ -45,6 +120,63 @@ class BaseVectorStore:
 		"""
 		pass
 
+	async def fetch_embeddings(
+		self, ids: List[str], texts: List[str]
+	) -> List[np.ndarray]:
+		"""
+		Get the embeddings of the ids in bulk.
+		The embeddings at the local cache are used first.
+		The rest of them are fetched from the Vector DB at once,
+		and only the ids that are not in the Vector DB are embedded with their texts.
+		The embedded ids are not added to the Vector DB.
+
+		:param ids: The ids to get the embeddings. It can have duplicated ids.
+		:param texts: The content of each id. It is used only when the id is not in the Vector DB.
+		:return: The embedding of each id.
+		"""
+		assert len(ids) == len(texts), "ids and texts must have same length."
+		id_texts = dict(zip(ids, texts))
+		embeddings = {}
+		for id_ in id_texts.keys():
+			if id_ in self.fetch_cache:
+				self.fetch_cache.move_to_end(id_)
+				embeddings[id_] = self.fetch_cache[id_]
+
+		missing_ids = [id_ for id_ in id_texts.keys() if id_ not in embeddings]
+		new_ids = []
+		for id_batch in make_batch(missing_ids, VECTOR_FETCH_BATCH):
+			existed_bool_list = await self.is_exist(id_batch)
+			stored_ids = [
+				id_ for id_, existed in zip(id_batch, existed_bool_list) if existed
+			]
+			new_ids.extend(
+				id_ for id_, existed in zip(id_batch, existed_bool_list) if not existed
+			)
+			if len(stored_ids) > 0:
+				fetched = await self.fetch(stored_ids)
+				embeddings.update(zip(stored_ids, map(np.asarray, fetched)))
+		if len(new_ids) > 0:
+			new_texts = self.truncated_inputs([id_texts[id_] for id_ in new_ids])
+			new_embeddings = await self.embedding.aget_text_embedding_batch(new_texts)
+			embeddings.update(zip(new_ids, map(np.asarray, new_embeddings)))
+
+		for id_ in missing_ids:
+			self.fetch_cache[id_] = embeddings[id_]
+		while len(self.fetch_cache) > VECTOR_FETCH_CACHE_SIZE:
+			self.fetch_cache.popitem(last=False)
+		return [embeddings[id_] for id_ in ids]
+
+	def invalidate_fetch_cache(self, ids: List[str]):
+		"""
+		Remove the ids from the local fetch cache.
+		The Vector DB calls it when the ids are added or deleted,
+		so fetch_embeddings does not return the stale embedding of a re-added id.
+
+		:param ids: The added or deleted ids.
+		"""
+		for id_ in ids:
+			self.fetch_cache.pop(id_, None)
+
 	@abstractmethod
 	async def is_exist(self, ids: List[str]) -> List[bool]:
 		"""
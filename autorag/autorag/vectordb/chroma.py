@@ -65,6 +65,7 @@ class Chroma(BaseVectorStore):
 		)
 
 	async def add(self, ids: List[str], texts: List[str]):
+		self.invalidate_fetch_cache(ids)
 		texts = self.truncated_inputs(texts)
 		text_embeddings = await self.embedding.aget_text_embedding_batch(texts)
 		if isinstance(self.collection, AsyncCollection):
@@ -79,8 +80,9 @@ class Chroma(BaseVectorStore):
 			)
 		else:
 			fetch_result = self.collection.get(ids, include=[IncludeEnum.embeddings])
-		fetch_embeddings = fetch_result["embeddings"]
-		return fetch_embeddings
+		# the order of the fetched embeddings is not the order of the ids
+		id_vector_dict = dict(zip(fetch_result["ids"], fetch_result["embeddings"]))
+		return [id_vector_dict[_id] for _id in ids]
 
 	async def is_exist(self, ids: List[str]) -> List[bool]:
 		if isinstance(self.collection, AsyncCollection):
@@ -97,6 +99,11 @@ class Chroma(BaseVectorStore):
 		query_embeddings: List[
 			List[float]
 		] = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
+
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
 		if isinstance(self.collection, AsyncCollection):
 			query_result: QueryResult = await self.collection.query(
 				query_embeddings=query_embeddings, n_results=top_k
@@ -111,6 +118,7 @@ class Chroma(BaseVectorStore):
 		return ids, scores
 
 	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
 		if isinstance(self.collection, AsyncCollection):
 			await self.collection.delete(ids)
 		else:
@@ -83,6 +83,7 @@ class Couchbase(BaseVectorStore):
 	async def add(self, ids: List[str], texts: List[str]):
 		from couchbase.exceptions import DocumentExistsException
 
+		self.invalidate_fetch_cache(ids)
 		texts = self.truncated_inputs(texts)
 		text_embeddings: List[
 			List[float]
@@ -124,14 +125,18 @@ class Couchbase(BaseVectorStore):
 	async def query(
 		self, queries: List[str], top_k: int, **kwargs
 	) -> Tuple[List[List[str]], List[List[float]]]:
-		import couchbase.search as search
-		from couchbase.options import SearchOptions
-		from couchbase.vector_search import VectorQuery, VectorSearch
-
 		queries = self.truncated_inputs(queries)
 		query_embeddings: List[
 			List[float]
 		] = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
+
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		import couchbase.search as search
+		from couchbase.options import SearchOptions
+		from couchbase.vector_search import VectorQuery, VectorSearch
 
 		ids, scores = [], []
 		for query_embedding in query_embeddings:
@@ -174,6 +179,7 @@ class Couchbase(BaseVectorStore):
 		return ids, scores
 
 	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
 		self.collection.remove_multi(ids)
 
 	def _check_bucket_exists(self) -> bool:
@@ -0,0 +1,453 @@
+import json
+import logging
+import os
+import threading
+from typing import List, Tuple, Union, Optional, Dict
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from autorag.evaluation.metric.util import (
+	calculate_cosine_similarity_matrix,
+	calculate_inner_product_matrix,
+	calculate_l2_distance_matrix,
+	normalize_embedding_matrix,
+	to_embedding_matrix,
+)
+from autorag.vectordb.base import BaseVectorStore
+
+logger = logging.getLogger("AutoRAG")
+
+# The row count of the stored matrix that is scored at once
+LOCAL_SEARCH_CHUNK_SIZE = 65_536
+# The maximum row count of the IVF training sample per list
+LOCAL_IVF_SAMPLE_PER_LIST = 64
+LOCAL_IVF_TRAIN_ITERATIONS = 10
+
+
+class Local(BaseVectorStore):
+	support_index_types = ["exact", "ivf"]
+	support_dtypes = ["float32", "float16"]
+
+	def __init__(
+		self,
+		embedding_model: Union[str, List[dict]],
+		collection_name: str,
+		path: str,
+		embedding_batch: int = 100,
+		similarity_metric: str = "cosine",
+		dtype: str = "float32",
+		index_type: str = "exact",
+		n_lists: Optional[int] = None,
+		n_probe: int = 8,
+	):
+		"""
+		The local in-process vector store.
+		The vectors are saved at a memory-mapped matrix file in the path, so it needs no server or network.
+		The query is scored with the batched matrix multiplication over the whole matrix (exact search),
+		or over the rows of the nearest IVF lists (ivf search).
+		It is useful for the evaluation trials with a fixed corpus.
+
+		:param embedding_model: The embedding model name or the config.
+		:param collection_name: The collection name. The collection is saved at path/collection_name.
+		:param path: The directory path to save the collections.
+		    For example, ${PROJECT_DIR}/resources/local.
+		:param embedding_batch: The embedding batch size.
+		:param similarity_metric: The similarity metric. 'cosine', 'ip', or 'l2'.
+		    The l2 score is 1 - l2 distance.
+		:param dtype: The dtype of the saved vectors. 'float32' or 'float16'.
+		    The float16 halves the file size, and the scores are computed in float32.
+		:param index_type: The search index type. 'exact' or 'ivf'.
+		    The 'ivf' clusters the vectors with k-means at the first query,
+		    and scores the vectors of the n_probe nearest clusters only.
+		:param n_lists: The cluster count of the ivf index.
+		    Default is sqrt(the vector count).
+		:param n_probe: The cluster count to search at the ivf index. Default is 8.
+		"""
+		super().__init__(embedding_model, similarity_metric, embedding_batch)
+		assert (
+			index_type in self.support_index_types
+		), f"index_type {index_type} is not supported"
+		assert dtype in self.support_dtypes, f"dtype {dtype} is not supported"
+		assert n_probe > 0, "n_probe must be greater than 0."
+
+		self.collection_name = collection_name
+		self.collection_path = os.path.join(path, collection_name)
+		self.dtype = dtype
+		self.index_type = index_type
+		self.n_lists = n_lists
+		self.n_probe = n_probe
+		self._lock = threading.RLock()
+
+		os.makedirs(self.collection_path, exist_ok=True)
+		self._vectors_path = os.path.join(self.collection_path, "vectors.bin")
+		self._ids_path = os.path.join(self.collection_path, "ids.jsonl")
+		self._deleted_path = os.path.join(self.collection_path, "deleted.jsonl")
+		self._meta_path = os.path.join(self.collection_path, "meta.json")
+		self._centroids_path = os.path.join(self.collection_path, "ivf_centroids.npy")
+		self._load()
+
+	def _load(self):
+		if os.path.exists(self._meta_path):
+			with open(self._meta_path) as f:
+				meta = json.load(f)
+			if meta["dtype"] != self.dtype:
+				raise ValueError(
+					f"The collection {self.collection_name} is saved with {meta['dtype']}, "
+					f"but dtype is {self.dtype}."
+				)
+			self.dimension: Optional[int] = meta["dimension"]
+		else:
+			self.dimension = None
+
+		row_ids: List[Optional[str]] = []
+		if os.path.exists(self._ids_path):
+			with open(self._ids_path) as f:
+				row_ids = [json.loads(line) for line in f if line.strip()]
+		# the vectors are written before the ids, so the ids are never more than the vectors
+		vector_count = 0
+		if self.dimension is not None and os.path.exists(self._vectors_path):
+			row_bytes = self.dimension * np.dtype(self.dtype).itemsize
+			vector_count = os.path.getsize(self._vectors_path) // row_bytes
+			if vector_count > len(row_ids):
+				# drop the vectors that were written without their ids
+				os.truncate(self._vectors_path, len(row_ids) * row_bytes)
+				vector_count = len(row_ids)
+		row_ids = row_ids[:vector_count]
+		if os.path.exists(self._deleted_path):
+			with open(self._deleted_path) as f:
+				for line in f:
+					if line.strip() and json.loads(line) < len(row_ids):
+						row_ids[json.loads(line)] = None
+		self.row_ids = row_ids
+		self.id_to_row: Dict[str, int] = {
+			id_: row for row, id_ in enumerate(self.row_ids) if id_ is not None
+		}
+		# alive[row] is False when the row is deleted
+		self.alive = np.array([id_ is not None for id_ in self.row_ids], dtype=bool)
+		self._vectors: Optional[np.ndarray] = None
+		self._norms: Optional[np.ndarray] = None
+		self._centroids: Optional[np.ndarray] = None
+		self._assignments: Optional[np.ndarray] = None
+		if os.path.exists(self._centroids_path):
+			self._centroids = np.load(self._centroids_path)
+
+	@property
+	def vectors(self) -> np.ndarray:
+		"""
+		The memory-mapped matrix of the stored vectors, including the deleted rows.
+		"""
+		if self._vectors is None:
+			if len(self.row_ids) == 0:
+				return np.empty((0, self.dimension or 0), dtype=self.dtype)
+			self._vectors = np.memmap(
+				self._vectors_path,
+				dtype=self.dtype,
+				mode="r",
+				shape=(len(self.row_ids), self.dimension),
+			)
+		return self._vectors
+
+	async def add(self, ids: List[str], texts: List[str]):
+		texts = self.truncated_inputs(texts)
+		text_embeddings = await self.embedding.aget_text_embedding_batch(texts)
+		self.add_embeddings(ids, text_embeddings)
+
+	def add_embeddings(self, ids: List[str], embeddings: List[List[float]]):
+		"""
+		Add the embeddings to the collection.
+		When the id already exists, its embedding is replaced.
+
+		:param ids: The ids of the embeddings.
+		:param embeddings: The embeddings to add.
+		"""
+		assert len(ids) == len(embeddings), "ids and embeddings must have same length."
+		if len(ids) == 0:
+			return
+		self.invalidate_fetch_cache(ids)
+		# the last one is saved when the ids are duplicated
+		id_rows = dict(zip(ids, range(len(ids))))
+		ids = list(id_rows.keys())
+		matrix = to_embedding_matrix(embeddings, dtype=np.float32)[
+			list(id_rows.values())
+		]
+		with self._lock:
+			if self.dimension is None:
+				self.dimension = matrix.shape[1]
+				self._write_json(
+					self._meta_path,
+					{
+						"dimension": self.dimension,
+						"dtype": self.dtype,
+						"similarity_metric": self.similarity_metric,
+					},
+				)
+			if matrix.shape[1] != self.dimension:
+				raise ValueError(
+					f"The embedding dimension is {matrix.shape[1]}, "
+					f"but the collection dimension is {self.dimension}."
+				)
+			self._delete_rows(
+				[self.id_to_row[id_] for id_ in ids if id_ in self.id_to_row]
+			)
+
+			start = len(self.row_ids)
+			matrix = matrix.astype(self.dtype)
+			with open(self._vectors_path, "ab") as f:
+				f.write(matrix.tobytes())
+			matrix = matrix.astype(np.float32)
+			with open(self._ids_path, "a") as f:
+				f.writelines(json.dumps(id_) + "\n" for id_ in ids)
+			self.row_ids.extend(ids)
+			self.alive = np.concatenate([self.alive, np.ones(len(ids), dtype=bool)])
+			self.id_to_row.update(zip(ids, range(start, start + len(ids))))
+			self._vectors = None
+			if self._norms is not None:
+				self._norms = np.concatenate(
+					[self._norms, np.linalg.norm(matrix, axis=1)]
+				)
+			if self._assignments is not None:
+				self._assignments = np.concatenate(
+					[self._assignments, self._assign(matrix)]
+				)
+
+	async def query(
+		self, queries: List[str], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		queries = self.truncated_inputs(queries)
+		query_embeddings = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
+
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		return self.search(query_embeddings, top_k)
+
+	def search(
+		self, query_embeddings: List[List[float]], top_k: int
+	) -> Tuple[List[List[str]], List[List[float]]]:
+		"""
+		Search the top_k ids of each query embedding.
+
+		:param query_embeddings: The query embeddings.
+		:param top_k: The number of the ids to retrieve.
+		:return: The ids and the scores of each query, in the order of the scores.
+		"""
+		with self._lock:
+			alive = self.alive.copy()
+			if len(query_embeddings) == 0:
+				return [], []
+			if not alive.any():
+				return [[] for _ in query_embeddings], [[] for _ in query_embeddings]
+			query_matrix = to_embedding_matrix(query_embeddings, dtype=np.float32)
+			if self.index_type == "ivf":
+				rows_list, scores_list = self._ivf_search(query_matrix, top_k, alive)
+			else:
+				rows_list, scores_list = self._exact_search(
+					query_matrix, top_k, np.flatnonzero(alive)
+				)
+			ids = [[self.row_ids[row] for row in rows] for rows in rows_list]
+			return ids, scores_list
+
+	def _score(self, query_matrix: np.ndarray, rows: np.ndarray) -> np.ndarray:
+		# rows are sorted, so the memory map is read in order
+		vectors = np.asarray(self.vectors[rows], dtype=np.float32)
+		if self.similarity_metric == "cosine":
+			norms = self.norms[rows]
+			with np.errstate(divide="ignore", invalid="ignore"):
+				return calculate_cosine_similarity_matrix(
+					normalize_embedding_matrix(query_matrix),
+					vectors / norms[:, None],
+					normalized=True,
+				)
+		elif self.similarity_metric == "ip":
+			return calculate_inner_product_matrix(query_matrix, vectors)
+		else:
+			return 1 - calculate_l2_distance_matrix(query_matrix, vectors)
+
+	def _exact_search(
+		self, query_matrix: np.ndarray, top_k: int, rows: np.ndarray
+	) -> Tuple[List[List[int]], List[List[float]]]:
+		best_rows = np.empty((len(query_matrix), 0), dtype=np.int64)
+		best_scores = np.empty((len(query_matrix), 0), dtype=np.float64)
+		for start in range(0, len(rows), LOCAL_SEARCH_CHUNK_SIZE):
+			chunk_rows = rows[start : start + LOCAL_SEARCH_CHUNK_SIZE]
+			scores = np.nan_to_num(
+				self._score(query_matrix, chunk_rows).astype(np.float64), nan=-np.inf
+			)
+			best_rows, best_scores = _merge_top_k(
+				np.concatenate(
+					[best_rows, np.broadcast_to(chunk_rows, scores.shape)], axis=1
+				),
+				np.concatenate([best_scores, scores], axis=1),
+				top_k,
+			)
+		return best_rows.tolist(), best_scores.tolist()
+
+	def _ivf_search(
+		self, query_matrix: np.ndarray, top_k: int, alive: np.ndarray
+	) -> Tuple[List[List[int]], List[List[float]]]:
+		if self._centroids is None:
+			self._train_ivf(np.flatnonzero(alive))
+		if self._assignments is None:
+			self._assignments = np.concatenate(
+				[
+					self._assign(
+						np.asarray(
+							self.vectors[start : start + LOCAL_SEARCH_CHUNK_SIZE],
+							dtype=np.float32,
+						)
+					)
+					for start in range(0, len(self.row_ids), LOCAL_SEARCH_CHUNK_SIZE)
+				]
+			)
+		n_probe = min(self.n_probe, len(self._centroids))
+		nearest_lists = np.argsort(-self._centroid_scores(query_matrix), axis=1)[
+			:, :n_probe
+		]
+		# the inverted lists: the rows of list i are list_rows[offsets[i] : offsets[i + 1]]
+		list_rows = np.argsort(self._assignments, kind="stable")
+		offsets = np.searchsorted(
+			self._assignments[list_rows], np.arange(len(self._centroids) + 1)
+		)
+		rows_list, scores_list = [], []
+		for query_vector, lists in zip(query_matrix, nearest_lists):
+			rows = np.sort(
+				np.concatenate([list_rows[offsets[i] : offsets[i + 1]] for i in lists])
+			)
+			rows = rows[alive[rows]]
+			rows, scores = self._exact_search(query_vector[None, :], top_k, rows)
+			rows_list.extend(rows)
+			scores_list.extend(scores)
+		return rows_list, scores_list
+
+	def _centroid_scores(self, matrix: np.ndarray) -> np.ndarray:
+		if self.similarity_metric == "l2":
+			return -calculate_l2_distance_matrix(matrix, self._centroids)
+		# the ip vectors are clustered by their direction
+		return np.nan_to_num(
+			calculate_cosine_similarity_matrix(
+				normalize_embedding_matrix(matrix), self._centroids, normalized=True
+			),
+			nan=-np.inf,
+		)
+
+	def _assign(self, matrix: np.ndarray) -> np.ndarray:
+		return np.argmax(self._centroid_scores(matrix), axis=1)
+
+	def _train_ivf(self, rows: np.ndarray):
+		n_lists = self.n_lists or max(1, int(np.sqrt(len(rows))))
+		n_lists = min(n_lists, len(rows))
+		logger.info(
+			f"Training the IVF index of {self.collection_name} with {n_lists} lists..."
+		)
+		# the fixed seed makes the same index from the same corpus
+		rng = np.random.default_rng(0)
+		sample_size = min(len(rows), n_lists * LOCAL_IVF_SAMPLE_PER_LIST)
+		sample_rows = np.sort(rng.choice(rows, size=sample_size, replace=False))
+		sample = np.asarray(self.vectors[sample_rows], dtype=np.float32)
+		if self.similarity_metric != "l2":
+			sample = np.nan_to_num(normalize_embedding_matrix(sample))
+		self._centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+		for _ in range(LOCAL_IVF_TRAIN_ITERATIONS):
+			labels = self._assign(sample)
+			# sum the members of each list with one sparse matrix multiplication
+			membership = csr_matrix(
+				(
+					np.ones(len(labels), dtype=np.float32),
+					(labels, np.arange(len(labels))),
+				),
+				shape=(n_lists, len(labels)),
+			)
+			counts = np.bincount(labels, minlength=n_lists)
+			non_empty = counts > 0
+			self._centroids[non_empty] = (membership @ sample)[non_empty] / counts[
+				non_empty, None
+			]
+			if self.similarity_metric != "l2":
+				self._centroids = np.nan_to_num(
+					normalize_embedding_matrix(self._centroids)
+				)
+		np.save(self._centroids_path, self._centroids)
+		self._assignments = None
+
+	@property
+	def norms(self) -> np.ndarray:
+		if self._norms is None or len(self._norms) != len(self.row_ids):
+			self._norms = np.concatenate(
+				[
+					np.linalg.norm(
+						np.asarray(
+							self.vectors[start : start + LOCAL_SEARCH_CHUNK_SIZE],
+							dtype=np.float32,
+						),
+						axis=1,
+					)
+					for start in range(0, len(self.row_ids), LOCAL_SEARCH_CHUNK_SIZE)
+				]
+			)
+		return self._norms
+
+	async def fetch(self, ids: List[str]) -> List[List[float]]:
+		with self._lock:
+			rows = [self.id_to_row[id_] for id_ in ids]
+			return np.asarray(self.vectors[rows], dtype=np.float32).tolist()
+
+	async def is_exist(self, ids: List[str]) -> List[bool]:
+		with self._lock:
+			return [id_ in self.id_to_row for id_ in ids]
+
+	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
+		with self._lock:
+			self._delete_rows(
+				[self.id_to_row[id_] for id_ in ids if id_ in self.id_to_row]
+			)
+
+	def _delete_rows(self, rows: List[int]):
+		if len(rows) == 0:
+			return
+		with open(self._deleted_path, "a") as f:
+			f.writelines(f"{row}\n" for row in rows)
+		for row in rows:
+			del self.id_to_row[self.row_ids[row]]
+			self.row_ids[row] = None
+		self.alive[rows] = False
+
+	def delete_collection(self):
+		with self._lock:
+			for file_path in [
+				self._vectors_path,
+				self._ids_path,
+				self._deleted_path,
+				self._meta_path,
+				self._centroids_path,
+			]:
+				if os.path.exists(file_path):
+					os.remove(file_path)
+			self._load()
+
+	@staticmethod
+	def _write_json(file_path: str, data: dict):
+		tmp_path = f"{file_path}.tmp"
+		with open(tmp_path, "w") as f:
+			json.dump(data, f)
+		os.replace(tmp_path, file_path)
+
+
+def _merge_top_k(
+	rows: np.ndarray, scores: np.ndarray, top_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+	"""
+	Select the top_k rows of each query in the order of the scores.
+	The tied scores are ordered by the row index.
+	"""
+	top_k = min(top_k, scores.shape[1])
+	if top_k < scores.shape[1]:
+		candidates = np.argpartition(-scores, top_k - 1, axis=1)[:, :top_k]
+		rows = np.take_along_axis(rows, candidates, axis=1)
+		scores = np.take_along_axis(scores, candidates, axis=1)
+	order = np.lexsort((rows, -scores), axis=1)
+	return np.take_along_axis(rows, order, axis=1), np.take_along_axis(
+		scores, order, axis=1
+	)
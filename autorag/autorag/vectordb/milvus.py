@@ -83,6 +83,7 @@ class Milvus(BaseVectorStore):
 			self.collection = Collection(name=self.collection_name)
 
 	async def add(self, ids: List[str], texts: List[str]):
+		self.invalidate_fetch_cache(ids)
 		texts = self.truncated_inputs(texts)
 		text_embeddings: List[
 			List[float]
@@ -108,7 +109,11 @@ class Milvus(BaseVectorStore):
 		query_embeddings: List[
 			List[float]
 		] = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
 
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
 		self.collection.load(timeout=self.timeout)
 
 		# Perform similarity search
@@ -158,6 +163,7 @@ class Milvus(BaseVectorStore):
 		return [str(_id) in existing_ids for _id in ids]
 
 	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
 		# Delete entries by IDs
 		self.collection.delete(expr=f"id in {ids}", timeout=self.timeout)
 
@@ -53,6 +53,7 @@ class Pinecone(BaseVectorStore):
 		self.index = self.client.Index(index_name)
 
 	async def add(self, ids: List[str], texts: List[str]):
+		self.invalidate_fetch_cache(ids)
 		texts = self.truncated_inputs(texts)
 		text_embeddings: List[
 			List[float]
@@ -92,7 +93,11 @@ class Pinecone(BaseVectorStore):
 		query_embeddings: List[
 			List[float]
 		] = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
 
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
 		ids, scores = [], []
 		for query_embedding in query_embeddings:
 			response = self.index.query(
@@ -111,6 +116,7 @@ class Pinecone(BaseVectorStore):
 		return ids, scores
 
 	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
 		# Delete entries by IDs
 		self.index.delete(ids=ids, namespace=self.namespace)
 
@@ -79,6 +79,7 @@ class Qdrant(BaseVectorStore):
 		self.collection = self.client.get_collection(collection_name)
 
 	async def add(self, ids: List[str], texts: List[str]):
+		self.invalidate_fetch_cache(ids)
 		texts = self.truncated_inputs(texts)
 		text_embeddings = await self.embedding.aget_text_embedding_batch(texts)
 
@@ -102,7 +103,8 @@ class Qdrant(BaseVectorStore):
 			ids=ids,
 			with_vectors=True,
 		)
-		return list(map(lambda x: x.vector, fetched_results))
+		id_vector_dict = {str(result.id): result.vector for result in fetched_results}
+		return [id_vector_dict[_id] for _id in ids]
 
 	async def is_exist(self, ids: List[str]) -> List[bool]:
 		existed_result = self.client.scroll(
@@ -124,7 +126,11 @@ class Qdrant(BaseVectorStore):
 		query_embeddings: List[
 			List[float]
 		] = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
 
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
 		search_queries = list(
 			map(
 				lambda x: SearchRequest(vector=x, limit=top_k, with_vector=True),
@@ -143,6 +149,7 @@ class Qdrant(BaseVectorStore):
 		return ids, scores
 
 	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
 		self.client.delete(
 			collection_name=self.collection_name,
 			points_selector=PointIdsList(points=ids),
@@ -77,6 +77,7 @@ class Weaviate(BaseVectorStore):
 		self.collection_name = collection_name
 
 	async def add(self, ids: List[str], texts: List[str]):
+		self.invalidate_fetch_cache(ids)
 		texts = self.truncated_inputs(texts)
 		text_embeddings = await self.embedding.aget_text_embedding_batch(texts)
 
@@ -125,7 +126,11 @@ class Weaviate(BaseVectorStore):
 		query_embeddings: List[
 			List[float]
 		] = await self.embedding.aget_text_embedding_batch(queries)
+		return await self.query_by_embeddings(query_embeddings, top_k, **kwargs)
 
+	async def query_by_embeddings(
+		self, query_embeddings: List[List[float]], top_k: int, **kwargs
+	) -> Tuple[List[List[str]], List[List[float]]]:
 		ids, scores = [], []
 		for query_embedding in query_embeddings:
 			response = self.collection.query.near_vector(
@@ -145,6 +150,7 @@ class Weaviate(BaseVectorStore):
 		return ids, scores
 
 	async def delete(self, ids: List[str]):
+		self.invalidate_fetch_cache(ids)
 		filter = wvc.query.Filter.by_id().contains_any(ids)
 		self.collection.data.delete_many(where=filter)
 
@@ -0,0 +1,82 @@
+import asyncio
+import os
+
+import pytest
+
+from autorag.embedding.base import EmbeddingModel, MockEmbeddingRandom
+from autorag.embedding.cache import (
+	EmbeddingCache,
+	get_embedding_cache,
+	get_embedding_cache_dir,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+	cache_dir = str(tmp_path / "embedding_cache")
+	monkeypatch.setenv("AUTORAG_EMBEDDING_CACHE_DIR", cache_dir)
+	yield cache_dir
+
+
+def test_get_embedding_cache_dir(tmp_path, monkeypatch):
+	monkeypatch.delenv("AUTORAG_EMBEDDING_CACHE_DIR", raising=False)
+	monkeypatch.setenv("PROJECT_DIR", str(tmp_path))
+	assert get_embedding_cache_dir() is None
+	os.makedirs(tmp_path / "resources")
+	assert get_embedding_cache_dir() == os.path.join(
+		str(tmp_path), "resources", "embedding_cache"
+	)
+	monkeypatch.setenv("AUTORAG_EMBEDDING_CACHE_DIR", "")
+	assert get_embedding_cache_dir() is None
+
+
+def test_cached_embedding_model(cache_dir):
+	lazy_init = EmbeddingModel.load("mock")
+	assert lazy_init is EmbeddingModel.load("mock")
+	embedding = lazy_init()
+	assert isinstance(embedding, MockEmbeddingRandom)
+
+	first = embedding.get_text_embedding_batch(["a", "b", "a"])
+	assert first[0] == first[2]
+	second = embedding.get_text_embedding_batch(["b", "c"])
+	assert second[0] == first[1]
+	assert embedding.get_text_embedding("c") == second[1]
+	third = asyncio.run(embedding.aget_text_embedding_batch(["a", "d"]))
+	assert third[0] == first[0]
+
+	# the query embeddings are cached separately
+	query_embedding = embedding.get_query_embedding("a")
+	assert query_embedding == embedding.get_query_embedding("a")
+	assert query_embedding != first[0]
+
+	stats = get_embedding_cache(embedding).stats()
+	assert stats["size"] == 5
+	assert stats["hits"] == 4
+
+
+def test_embedding_cache_persist(cache_dir):
+	cache = EmbeddingCache(cache_dir, "test_model")
+	cache.put("text", ["a", "b"], [[0.1, 0.2], [0.3, 0.4]])
+	assert cache.get("text", ["a", "c"]) == [[0.1, 0.2], None]
+	cache.flush()
+	assert os.path.exists(os.path.join(cache_dir, "model.json"))
+
+	new_cache = EmbeddingCache(cache_dir, "test_model")
+	assert new_cache.get("text", ["b", "a"]) == [[0.3, 0.4], [0.1, 0.2]]
+	assert new_cache.get("query", ["a"]) == [None]
+	assert new_cache.stats()["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_embedding_cache_compact(cache_dir):
+	# room for two embeddings of dimension 2
+	cache = EmbeddingCache(cache_dir, "test_model", max_bytes=32)
+	cache.put("text", ["a", "b"], [[0.1, 0.2], [0.3, 0.4]])
+	cache.flush()
+	assert cache.get("text", ["a"]) == [[0.1, 0.2]]
+	cache.put("text", ["c"], [[0.5, 0.6]])
+	cache.flush()
+
+	# b is the least recently used embedding
+	new_cache = EmbeddingCache(cache_dir, "test_model", max_bytes=32)
+	assert new_cache.get("text", ["a", "b", "c"]) == [[0.1, 0.2], None, [0.5, 0.6]]
+	assert len([f for f in os.listdir(cache_dir) if f.endswith(".keys.npy")]) == 1
@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from autorag.evaluation.metric.util import (
+	calculate_cosine_similarity,
+	calculate_cosine_similarity_groups,
+	calculate_cosine_similarity_matrix,
+	calculate_inner_product,
+	calculate_inner_product_matrix,
+	calculate_l2_distance,
+	calculate_l2_distance_matrix,
+	normalize_embedding_matrix,
+	to_embedding_matrix,
+)
+
+rng = np.random.default_rng(42)
+a_example = rng.normal(size=(4, 16)).tolist()
+b_example = rng.normal(size=(3, 16)).tolist()
+
+
+@pytest.mark.parametrize(
+	"matrix_func, pair_func",
+	[
+		(calculate_cosine_similarity_matrix, calculate_cosine_similarity),
+		(calculate_inner_product_matrix, calculate_inner_product),
+		(calculate_l2_distance_matrix, calculate_l2_distance),
+	],
+)
+def test_similarity_matrix(matrix_func, pair_func):
+	result = matrix_func(to_embedding_matrix(a_example), to_embedding_matrix(b_example))
+	assert result.shape == (4, 3)
+	expected = [
+		[pair_func(np.array(a), np.array(b)) for b in b_example] for a in a_example
+	]
+	np.testing.assert_allclose(result, expected, rtol=1e-5, atol=1e-6)
+
+
+def test_similarity_matrix_normalized():
+	a = normalize_embedding_matrix(to_embedding_matrix(a_example))
+	b = normalize_embedding_matrix(to_embedding_matrix(b_example))
+	np.testing.assert_allclose(np.linalg.norm(a, axis=1), np.ones(4), rtol=1e-6)
+	np.testing.assert_allclose(
+		calculate_cosine_similarity_matrix(a, b, normalized=True),
+		calculate_cosine_similarity_matrix(a, b),
+		rtol=1e-6,
+	)
+	# the distance of the same vectors is zero
+	np.testing.assert_allclose(
+		np.diag(calculate_l2_distance_matrix(a, a)), np.zeros(4), atol=1e-6
+	)
+
+
+def test_calculate_cosine_similarity_groups():
+	result = calculate_cosine_similarity_groups(
+		b_example, [a_example[:2], [], a_example[2:]]
+	)
+	assert len(result) == 3
+	assert result[1] == []
+	assert result[0] == pytest.approx(
+		[calculate_cosine_similarity(b_example[0], a) for a in a_example[:2]],
+		rel=1e-5,
+	)
+	assert result[2] == pytest.approx(
+		[calculate_cosine_similarity(b_example[2], a) for a in a_example[2:]],
+		rel=1e-5,
+	)
+	assert all(isinstance(score, float) for score in result[0])
+	assert calculate_cosine_similarity_groups([[1.0, 0.0]], [[]]) == [[]]
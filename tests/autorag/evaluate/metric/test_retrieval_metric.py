@@ -9,6 +9,7 @@ from autorag.evaluation.metric import (
 	retrieval_mrr,
 	retrieval_map,
 )
+from autorag.evaluation.metric.retrieval import RetrievalMetricBatch
 from autorag.schema.metricinput import MetricInput
 
 retrieval_gt = [
@@ -105,3 +106,32 @@ def test_retrieval_map():
 	result = retrieval_map(metric_inputs=metric_inputs)
 	for gt, res in zip(solution, result):
 		assert gt == pytest.approx(res, rel=1e-4)
+
+
+def test_retrieval_metric_batch():
+	metric_funcs = [
+		retrieval_f1,
+		retrieval_precision,
+		retrieval_recall,
+		retrieval_ndcg,
+		retrieval_mrr,
+		retrieval_map,
+	]
+	metric_names = [func.__name__ for func in metric_funcs]
+	retrieval_gt_np = [[np.array(["test-1", "test-4"])], np.array([["test-2"]])]
+	pred_np = np.array([["test-2", "test-3", "test-1"], ["test-5", "test-2", "test-2"]])
+	for inputs, preds in [
+		(metric_inputs, pred),
+		(
+			[
+				MetricInput(retrieval_gt=ret_gt_np, retrieved_ids=pr_np)
+				for ret_gt_np, pr_np in zip(retrieval_gt_np, pred_np)
+			],
+			pred_np,
+		),
+	]:
+		result = RetrievalMetricBatch(inputs)(preds, metric_names)
+		assert list(result.keys()) == metric_names
+		for func in metric_funcs:
+			# bit-identical to the metric functions
+			assert result[func.__name__] == func(metric_inputs=inputs)
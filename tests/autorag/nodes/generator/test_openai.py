@@ -1,12 +1,14 @@
 import time
 from unittest.mock import patch
 
+import httpx
 import openai.resources.chat
 import pandas as pd
 import pytest
 from pydantic import BaseModel
 
 from autorag.nodes.generator import OpenAILLM
+from autorag.nodes.generator.openai_llm import make_openai_client, run_openai_request
 from tests.autorag.nodes.generator.test_generator_base import (
     prompts,
     check_generated_texts,
@@ -175,3 +177,73 @@ async def test_openai_llm_astream():
         result.append(s)
         if i >= 1:
             assert len(result[i]) >= len(result[i - 1])
+
+
+@pytest.mark.asyncio()
+async def test_openai_rate_limiter():
+    statuses = iter([429, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = next(statuses)
+        if status == 429:
+            return httpx.Response(
+                429, headers={"retry-after-ms": "10"}, json={"error": {}}
+            )
+        completion = {
+            "id": "test_id",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "gpt-4o-mini",
+            "choices": [
+                {
+                    "index": 0,
+                    "finish_reason": "stop",
+                    "message": {"role": "assistant", "content": "Why not"},
+                }
+            ],
+            "usage": {
+                "prompt_tokens": 10,
+                "completion_tokens": 2,
+                "total_tokens": 12,
+            },
+        }
+        return httpx.Response(
+            200,
+            headers={
+                "x-ratelimit-limit-requests": "500",
+                "x-ratelimit-limit-tokens": "30000",
+                "x-ratelimit-remaining-tokens": "29000",
+            },
+            json=completion,
+        )
+
+    client, rate_limiter = make_openai_client(
+        "gpt-4o-mini",
+        api_key="mock_openai_api_key",
+        base_url="https://rate-limit.test/v1",
+        max_retries=1,
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    # the same api key and model shares one rate limiter
+    _, other_rate_limiter = make_openai_client(
+        "gpt-4o-mini",
+        api_key="mock_openai_api_key",
+        base_url="https://rate-limit.test/v1",
+    )
+    assert rate_limiter is other_rate_limiter
+    concurrency = rate_limiter.concurrency
+
+    response = await run_openai_request(
+        rate_limiter,
+        lambda: client.chat.completions.create(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Hi"}]
+        ),
+        tokens=100,
+    )
+    assert response.choices[0].message.content == "Why not"
+    # the 429 response halves the concurrency, and the headers set the quota
+    assert rate_limiter.concurrency == concurrency // 2
+    assert rate_limiter.requests_per_minute == 500
+    assert rate_limiter.tokens_per_minute == 30000
+    # the unused tokens of the request are given back, and the bucket keeps refilling
+    assert 29000 + 100 - 12 <= rate_limiter.available_tokens < 29000 + 1000
@@ -1,8 +1,9 @@
+import multiprocessing
 import os
-import pickle
 import shutil
 import tempfile
 from datetime import datetime
+from itertools import chain
 
 import pandas as pd
 import pytest
@@ -10,14 +11,19 @@ import pytest
 from autorag.nodes.retrieval import BM25
 from autorag.nodes.retrieval.bm25 import (
 	bm25_ingest,
+	bm25_pure,
+	load_bm25_corpus,
 	tokenize_ko_kiwi,
 	tokenize_porter_stemmer,
 	tokenize_space,
 	tokenize_ko_kkma,
 	tokenize_ko_okt,
 	tokenize_ja_sudachipy,
+	tokenize_parallel,
+	iter_tokenize_parallel,
 )
-from autorag.utils.util import to_list
+from autorag.nodes.retrieval.bm25_index import load_bm25_index, migrate_bm25_pkl
+from autorag.utils.util import to_list, get_event_loop
 from tests.autorag.nodes.retrieval.test_retrieval_base import (
 	queries,
 	project_dir,
@@ -43,11 +49,10 @@ ja_texts = [
 
 @pytest.fixture
 def ingested_bm25_path():
-	with tempfile.NamedTemporaryFile(suffix=".pkl", mode="w+b", delete=False) as path:
-		bm25_ingest(path.name, corpus_df)
-		yield path.name
-		path.close()
-		os.unlink(path.name)
+	with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+		index_dir = os.path.join(temp_dir, "bm25_porter_stemmer")
+		bm25_ingest(index_dir, corpus_df)
+		yield index_dir
 
 
 @pytest.fixture
@@ -55,23 +60,40 @@ def bm25_instance(ingested_bm25_path):
 	with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_project_dir:
 		os.makedirs(os.path.join(temp_project_dir, "resources"))
 		os.makedirs(os.path.join(temp_project_dir, "data"))
-		bm25_path = os.path.join(
-			temp_project_dir, "resources", "bm25_porter_stemmer.pkl"
-		)
+		bm25_path = os.path.join(temp_project_dir, "resources", "bm25_porter_stemmer")
 		corpus_df.to_parquet(
 			os.path.join(temp_project_dir, "data", "corpus.parquet"), index=False
 		)
-		shutil.copy(ingested_bm25_path, bm25_path)
+		shutil.copytree(ingested_bm25_path, bm25_path)
 		bm25 = BM25(project_dir=temp_project_dir)
 		yield bm25
 
 
+def bm25_pure_sync(*args):
+	return get_event_loop().run_until_complete(bm25_pure(*args))
+
+
 def test_bm25_retrieval(bm25_instance):
 	top_k = 3
 	id_result, score_result = bm25_instance._pure(queries, top_k=top_k)
 	base_retrieval_test(id_result, score_result, top_k)
 
 
+def test_bm25_retrieval_batch(bm25_instance):
+	top_k = 3
+	id_result, score_result = bm25_instance._pure(queries, top_k=top_k)
+	for query_list, ids, scores in zip(queries, id_result, score_result):
+		expected_ids, expected_scores = bm25_pure_sync(
+			query_list,
+			top_k,
+			bm25_instance.tokenizer,
+			bm25_instance.bm25_instance,
+			bm25_instance.bm25_corpus,
+		)
+		assert ids == expected_ids
+		assert scores == pytest.approx(expected_scores)
+
+
 def test_bm25_retrieval_ids(bm25_instance):
 	input_ids = [["doc2", "doc3"], ["doc1"], ["doc3", "doc4"]]
 	id_result, score_result = bm25_instance._pure(queries, top_k=3, ids=input_ids)
@@ -82,6 +104,24 @@ def test_bm25_retrieval_ids(bm25_instance):
 	assert len(score_result[2]) == 2
 
 
+def test_bm25_retrieval_ids_scores(bm25_instance):
+	input_ids = [["doc2", "doc3", "doc2"], ["doc1"], ["doc3", "doc4"]]
+	_, score_result = bm25_instance._pure(queries, top_k=3, ids=input_ids)
+	passage_ids = bm25_instance.bm25_corpus["passage_id"].to_pylist()
+	for query_list, ids, scores in zip(queries, input_ids, score_result):
+		all_scores = [
+			bm25_instance.bm25_instance.get_scores(query)
+			for query in tokenize_porter_stemmer(query_list)
+		]
+		assert scores == [
+			max(query_scores[passage_ids.index(id_)] for query_scores in all_scores)
+			for id_ in ids
+		]
+
+	with pytest.raises(ValueError):
+		bm25_instance._pure(queries, top_k=3, ids=[["doc1"], ["not-exist"], ["doc2"]])
+
+
 def test_bm25_retrieval_ids_empty(bm25_instance):
 	input_ids = [["doc2", "doc3"], [], ["doc3"]]
 	id_result, score_result = bm25_instance._pure(queries, top_k=3, ids=input_ids)
@@ -117,15 +157,18 @@ def test_bm25_node_ids():
 
 
 def test_bm25_ingest(ingested_bm25_path, bm25_instance):
-	with open(ingested_bm25_path, "rb") as r:
-		corpus = pickle.load(r)
-	assert set(corpus.keys()) == {"tokens", "passage_id", "tokenizer_name"}
-	assert isinstance(corpus["tokens"], list)
-	assert isinstance(corpus["passage_id"], list)
+	index, corpus = load_bm25_index(ingested_bm25_path)
+	assert set(corpus.keys()) == {"passage_id", "passage_row_map", "tokenizer_name"}
 	assert isinstance(corpus["tokenizer_name"], str)
 	assert corpus["tokenizer_name"] == "porter_stemmer"
-	assert len(corpus["tokens"]) == len(corpus["passage_id"]) == 5
-	assert set(corpus["passage_id"]) == {"doc1", "doc2", "doc3", "doc4", "doc5"}
+	assert index.corpus_size == len(corpus["passage_id"]) == 5
+	assert set(corpus["passage_id"].to_pylist()) == {
+		"doc1",
+		"doc2",
+		"doc3",
+		"doc4",
+		"doc5",
+	}
 
 	top_k = 2
 	id_result, score_result = bm25_instance._pure(
@@ -155,9 +198,31 @@ def test_duplicate_id_bm25_ingest(ingested_bm25_path):
 		{"doc_id": new_doc_id, "contents": new_contents, "metadata": new_metadata}
 	)
 	bm25_ingest(ingested_bm25_path, new_corpus_df)
-	with open(ingested_bm25_path, "rb") as r:
-		corpus = pickle.load(r)
-	assert len(corpus["tokens"]) == len(corpus["passage_id"]) == 8
+	index, corpus = load_bm25_index(ingested_bm25_path)
+	assert index.corpus_size == len(corpus["passage_id"]) == 8
+	assert corpus["passage_id"].to_pylist() == [
+		"doc1",
+		"doc2",
+		"doc3",
+		"doc4",
+		"doc5",
+		"doc6",
+		"doc7",
+		"doc8",
+	]
+
+
+def test_migrate_bm25_pkl():
+	legacy_pkl_path = os.path.join(project_dir, "resources", "bm25_porter_stemmer.pkl")
+	legacy_corpus = load_bm25_corpus(legacy_pkl_path)
+	with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+		index_dir = migrate_bm25_pkl(
+			legacy_pkl_path, os.path.join(temp_dir, "bm25_porter_stemmer")
+		)
+		index, corpus = load_bm25_index(index_dir)
+		assert corpus["tokenizer_name"] == "porter_stemmer"
+		assert corpus["passage_id"].to_pylist() == legacy_corpus["passage_id"]
+		assert index.corpus_size == len(legacy_corpus["tokens"])
 
 
 def test_other_method_bm25():
@@ -215,3 +280,30 @@ def test_tokenize_sudachipy():
 	assert len(tokenized_list) == len(ja_texts)
 	assert isinstance(tokenized_list[0], list)
 	assert all(isinstance(x, str) for x in tokenized_list[0])
+
+
+def test_tokenize_parallel():
+	def sort_tokens(tokenized_list):
+		# porter_stemmer tokens are from the set, so its order is different by the process.
+		return list(map(sorted, tokenized_list))
+
+	texts = corpus_df["contents"].tolist()
+	expected = sort_tokens(tokenize_porter_stemmer(texts))
+	result = tokenize_parallel(texts, "porter_stemmer", num_workers=1)
+	assert sort_tokens(result) == expected
+	chunks = list(
+		iter_tokenize_parallel(texts, "porter_stemmer", num_workers=2, chunk_size=2)
+	)
+	assert list(map(len, chunks)) == [2] * (len(texts) // 2) + [1] * (len(texts) % 2)
+	assert sort_tokens(chain.from_iterable(chunks)) == expected
+	assert tokenize_parallel([], "porter_stemmer") == []
+
+
+def test_tokenize_parallel_default_in_process(monkeypatch):
+	def no_process_pool(*args, **kwargs):
+		raise AssertionError("The process pool must be opt-in.")
+
+	monkeypatch.setattr(multiprocessing, "get_context", no_process_pool)
+	texts = corpus_df["contents"].tolist()
+	result = tokenize_parallel(texts, "space", chunk_size=2)
+	assert result == tokenize_space(texts)
@@ -0,0 +1,202 @@
+import os
+import tempfile
+import threading
+
+import numpy as np
+import pyarrow as pa
+import pytest
+from rank_bm25 import BM25Okapi
+
+from autorag.nodes.retrieval.bm25 import tokenize_porter_stemmer
+from autorag.nodes.retrieval.bm25_index import (
+	BM25Index,
+	BM25RowMap,
+	BM25_MAX_SEGMENTS,
+	select_top_k_indices,
+	save_bm25_index,
+	load_bm25_index,
+	append_bm25_index,
+	compact_bm25_index,
+	read_bm25_index_meta,
+)
+from tests.autorag.nodes.retrieval.test_retrieval_base import corpus_df
+
+corpus_tokens = tokenize_porter_stemmer(corpus_df["contents"].tolist())
+test_queries = [
+	"What is test document?",
+	"What is test document number 2?",
+	"Who is the best baseball team in the world?",
+	"unknown token only",
+]
+
+
+def test_bm25_index_same_as_okapi():
+	okapi = BM25Okapi(corpus_tokens)
+	index = BM25Index.from_tokens(corpus_tokens)
+	for query in tokenize_porter_stemmer(test_queries):
+		assert np.array_equal(okapi.get_scores(query), index.get_scores(query))
+
+
+def test_bm25_index_top_k():
+	index = BM25Index.from_tokens(corpus_tokens)
+	for query in tokenize_porter_stemmer(test_queries):
+		scores = index.get_scores(query)
+		top_indices, top_scores = index.get_top_k(query, 3)
+		assert len(top_indices) == len(top_scores) == 3
+		assert top_scores.tolist() == sorted(scores, reverse=True)[:3]
+		assert (
+			top_indices.tolist() == np.argsort(scores, kind="stable")[::-1][:3].tolist()
+		)
+
+
+def test_bm25_index_get_scores_by_rows():
+	index = BM25Index.from_tokens(corpus_tokens[:2]).add_tokens(corpus_tokens[2:])
+	rows = np.array([4, 0, 2, 0, 1])
+	for query in tokenize_porter_stemmer(test_queries):
+		assert np.array_equal(
+			index.get_scores_by_rows(query, rows), index.get_scores(query)[rows]
+		)
+	assert len(index.get_scores_by_rows(["test"], np.array([], dtype=np.int64))) == 0
+
+
+def test_bm25_index_batch_scores():
+	index = BM25Index.from_tokens(corpus_tokens[:2]).add_tokens(corpus_tokens[2:])
+	tokenized_queries = tokenize_porter_stemmer(test_queries)
+	score_matrix = index.get_batch_scores(tokenized_queries)
+	assert score_matrix.shape == (len(test_queries), index.corpus_size)
+	for row, query in enumerate(tokenized_queries):
+		assert np.allclose(score_matrix[row].toarray()[0], index.get_scores(query))
+
+	for top_k in [1, 3, len(corpus_tokens) + 1]:
+		top_indices, top_scores = index.get_batch_top_k(tokenized_queries, top_k)
+		assert len(top_indices) == len(top_scores) == len(test_queries)
+		for query, indices, scores in zip(tokenized_queries, top_indices, top_scores):
+			expected_indices, expected_scores = index.get_top_k(query, top_k)
+			assert indices.tolist() == expected_indices.tolist()
+			assert np.allclose(scores, expected_scores)
+
+
+def test_bm25_row_map():
+	row_map = BM25RowMap(pa.chunked_array([["a", "b"], ["c", "a"]]))
+	assert row_map.get_rows(["c", "a", "b", "a"]).tolist() == [2, 0, 1, 0]
+	assert row_map.get_rows([]).tolist() == []
+	with pytest.raises(ValueError):
+		row_map.get_rows(["a", "d"])
+
+
+def test_select_top_k_indices():
+	scores = np.array([0.5, 1.0, 0.0, 1.0, 0.5, 2.0])
+	assert select_top_k_indices(scores, 3).tolist() == [5, 3, 1]
+	assert select_top_k_indices(scores, 4).tolist() == [5, 3, 1, 4]
+	assert select_top_k_indices(scores, 10).tolist() == [5, 3, 1, 4, 0, 2]
+	assert select_top_k_indices(scores, 0).tolist() == []
+
+
+def test_bm25_index_add_tokens():
+	index = BM25Index.from_tokens(corpus_tokens[:2]).add_tokens(corpus_tokens[2:])
+	full_index = BM25Index.from_tokens(corpus_tokens)
+	assert len(index.segments) == 2
+	assert index.vocab == full_index.vocab
+	assert np.array_equal(index.doc_freqs, full_index.doc_freqs)
+	assert np.array_equal(index.idf, full_index.idf)
+	okapi = BM25Okapi(corpus_tokens)
+	for query in tokenize_porter_stemmer(test_queries):
+		assert np.array_equal(okapi.get_scores(query), index.get_scores(query))
+
+	compacted_index = index.compact()
+	assert len(compacted_index.segments) == 1
+	for name in ("terms", "indptr", "postings", "term_freqs", "doc_len"):
+		assert np.array_equal(
+			getattr(compacted_index.segments[0], name),
+			getattr(full_index.segments[0], name),
+		)
+
+
+def test_save_load_bm25_index():
+	passage_ids = corpus_df["doc_id"].tolist()
+	index = BM25Index.from_tokens(corpus_tokens, passage_ids)
+	with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+		index_dir = os.path.join(temp_dir, "bm25_porter_stemmer")
+		save_bm25_index(index_dir, index, "porter_stemmer")
+		loaded_index, bm25_corpus = load_bm25_index(index_dir)
+		assert isinstance(loaded_index.idf, np.memmap)
+		assert isinstance(loaded_index.segments[0].postings, np.memmap)
+		assert bm25_corpus["tokenizer_name"] == "porter_stemmer"
+		assert bm25_corpus["passage_id"].to_pylist() == passage_ids
+		assert dict(loaded_index.vocab.items()) == index.vocab
+		for query in tokenize_porter_stemmer(test_queries):
+			assert np.array_equal(
+				loaded_index.get_scores(query), index.get_scores(query)
+			)
+
+
+def test_append_bm25_index():
+	passage_ids = corpus_df["doc_id"].tolist()
+	with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+		index_dir = os.path.join(temp_dir, "bm25_porter_stemmer")
+		save_bm25_index(
+			index_dir,
+			BM25Index.from_tokens(corpus_tokens[:1], passage_ids[:1]),
+			"porter_stemmer",
+		)
+		first_segment = read_bm25_index_meta(index_dir)["segments"][0]
+		first_segment_mtime = os.path.getmtime(
+			os.path.join(index_dir, first_segment, "postings.npy")
+		)
+		for i in range(1, len(corpus_tokens)):
+			append_bm25_index(
+				index_dir, corpus_tokens[i : i + 1], passage_ids[i : i + 1], False
+			)
+		meta = read_bm25_index_meta(index_dir)
+		assert len(meta["segments"]) == len(corpus_tokens)
+		assert meta["segments"][0] == first_segment
+		assert first_segment_mtime == os.path.getmtime(
+			os.path.join(index_dir, first_segment, "postings.npy")
+		)
+
+		okapi = BM25Okapi(corpus_tokens)
+		loaded_index, bm25_corpus = load_bm25_index(index_dir)
+		assert bm25_corpus["passage_id"].to_pylist() == passage_ids
+		for query in tokenize_porter_stemmer(test_queries):
+			assert np.array_equal(
+				okapi.get_scores(query), loaded_index.get_scores(query)
+			)
+
+		assert compact_bm25_index(index_dir)
+		assert len(read_bm25_index_meta(index_dir)["segments"]) == 1
+		compacted_index, bm25_corpus = load_bm25_index(index_dir)
+		assert bm25_corpus["passage_id"].to_pylist() == passage_ids
+		for query in tokenize_porter_stemmer(test_queries):
+			assert np.array_equal(
+				okapi.get_scores(query), compacted_index.get_scores(query)
+			)
+
+
+def test_append_bm25_index_background_compaction():
+	tokens = corpus_tokens * (BM25_MAX_SEGMENTS + 1)
+	passage_ids = [f"doc-{i}" for i in range(len(tokens))]
+	segment_size = len(corpus_tokens)
+	with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as temp_dir:
+		index_dir = os.path.join(temp_dir, "bm25_porter_stemmer")
+		save_bm25_index(
+			index_dir,
+			BM25Index.from_tokens(tokens[:segment_size], passage_ids[:segment_size]),
+			"porter_stemmer",
+		)
+		for start in range(segment_size, len(tokens), segment_size):
+			append_bm25_index(
+				index_dir,
+				tokens[start : start + segment_size],
+				passage_ids[start : start + segment_size],
+			)
+		for thread in threading.enumerate():
+			if thread.name == "bm25_compaction":
+				thread.join()
+		assert len(read_bm25_index_meta(index_dir)["segments"]) == 1
+		loaded_index, bm25_corpus = load_bm25_index(index_dir)
+		assert bm25_corpus["passage_id"].to_pylist() == passage_ids
+		okapi = BM25Okapi(tokens)
+		for query in tokenize_porter_stemmer(test_queries):
+			assert np.array_equal(
+				okapi.get_scores(query), loaded_index.get_scores(query)
+			)
@@ -131,7 +131,7 @@ def pseudo_project_dir():
 		qa_df.to_parquet(os.path.join(project_dir, "data", "qa.parquet"))
 		resource_dir = os.path.join(project_dir, "resources")
 		os.makedirs(resource_dir)
-		bm25_ingest(os.path.join(resource_dir, "bm25_porter_stemmer.pkl"), corpus_df)
+		bm25_ingest(os.path.join(resource_dir, "bm25_porter_stemmer"), corpus_df)
 		chroma_path = os.path.join(resource_dir, "chroma")
 
 		vectordb_config_path = os.path.join(resource_dir, "vectordb.yaml")
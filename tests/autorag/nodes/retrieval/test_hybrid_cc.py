@@ -1,13 +1,22 @@
+import numpy as np
 import pandas as pd
 import pytest
 
 from autorag.nodes.retrieval import HybridCC
-from autorag.nodes.retrieval.hybrid_cc import fuse_per_query, hybrid_cc
+from autorag.nodes.retrieval.hybrid_cc import (
+	fuse_per_query,
+	hybrid_cc,
+	hybrid_cc_sweep,
+)
+from autorag.nodes.retrieval.run import optimize_hybrid, evaluate_retrieval_node
+from autorag.schema.metricinput import MetricInput
+from autorag.strategy import select_best
 from tests.autorag.nodes.retrieval.test_hybrid_base import (
 	sample_ids_2,
 	sample_scores_2,
 	sample_ids_3,
 	sample_scores_3,
+	sample_retrieval_gt_3,
 	base_hybrid_weights_node_test,
 	sample_ids_non_overlap,
 	pseudo_project_dir,
@@ -98,3 +107,79 @@ def test_hybrid_cc_node_deploy(pseudo_project_dir):
 	assert len(result_df["retrieved_ids"].tolist()[0]) == 3
 	assert len(result_df["retrieve_scores"].tolist()[0]) == 3
 	assert len(result_df["retrieved_contents"].tolist()[0]) == 3
+
+
+def reference_hybrid_cc_tmm(ids, scores, top_k, weight):
+	# the per-query convex combination with the theoretical min-max scaling, one weight at a time
+	result_ids, result_scores = [], []
+	for query_ids, query_scores in zip(zip(*ids), zip(*scores)):
+		fused = {}
+		for doc_ids, doc_scores, doc_weight, min_value in zip(
+			query_ids, query_scores, (weight, 1.0 - weight), (-1.0, 0.0)
+		):
+			max_value = max(doc_scores)
+			for doc_id, score in zip(doc_ids, doc_scores):
+				norm_score = (score - min_value) / (max_value - min_value)
+				fused[doc_id] = fused.get(doc_id, 0.0) + doc_weight * norm_score
+		ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:top_k]
+		result_ids.append([doc_id for doc_id, _ in ranked])
+		result_scores.append([score for _, score in ranked])
+	return result_ids, result_scores
+
+
+def test_hybrid_cc_sweep():
+	weights = [0.0, 0.4, 0.75, 1.0]
+	results = hybrid_cc_sweep(
+		sample_ids_3, sample_scores_3, top_k=3, weights=weights, normalize_method="tmm"
+	)
+	assert len(results) == len(weights)
+	for weight, (result_id, result_scores) in zip(weights, results):
+		expected_id, expected_scores = reference_hybrid_cc_tmm(
+			sample_ids_3, sample_scores_3, top_k=3, weight=weight
+		)
+		assert result_id == expected_id
+		for result_score, expected_score in zip(result_scores, expected_scores):
+			assert result_score == pytest.approx(expected_score)
+	# hand-computed at the weight 0.4
+	assert results[1][0] == [["id-1", "id-4", "id-2"], ["id-2", "id-5", "id-3"]]
+
+
+def test_optimize_hybrid_cc(pseudo_project_dir):
+	metric_inputs = [MetricInput(retrieval_gt=gt) for gt in sample_retrieval_gt_3]
+	strategy = {"metrics": ["retrieval_f1", "retrieval_recall"]}
+	module_param = {
+		"ids": sample_ids_3,
+		"scores": sample_scores_3,
+		"top_k": 2,
+		"normalize_method": "mm",
+		"test_weight_size": 11,
+	}
+	result_df, best_weight = optimize_hybrid(
+		HybridCC,
+		module_param,
+		strategy,
+		metric_inputs,
+		pseudo_project_dir,
+		previous_result,
+	)
+
+	# the same weight with evaluating every weight one by one
+	weights = np.linspace(0.0, 1.0, 11).tolist()
+	expected_results = [
+		evaluate_retrieval_node(
+			HybridCC.run_evaluator(
+				pseudo_project_dir, previous_result, weight=weight, **module_param
+			),
+			metric_inputs,
+			strategy["metrics"],
+		)
+		for weight in weights
+	]
+	expected_df, expected_weight = select_best(
+		expected_results,
+		strategy["metrics"],
+		metadatas=weights,
+		strategy_name="normalize_mean",
+	)
+	assert best_weight == expected_weight
+	pd.testing.assert_frame_equal(result_df, expected_df)
@@ -5,7 +5,7 @@ import pytest
 from llama_index.embeddings.openai import OpenAIEmbedding
 
 from autorag.nodes.retrieval import HybridRRF
-from autorag.nodes.retrieval.hybrid_rrf import rrf_pure, hybrid_rrf
+from autorag.nodes.retrieval.hybrid_rrf import rrf_pure, hybrid_rrf, hybrid_rrf_sweep
 from tests.autorag.nodes.retrieval.test_hybrid_base import (
 	sample_ids,
 	sample_scores,
@@ -97,3 +97,32 @@ def test_hybrid_rrf_node_deploy(pseudo_project_dir):
 	assert len(result_df["retrieved_ids"].tolist()[0]) == 3
 	assert len(result_df["retrieve_scores"].tolist()[0]) == 3
 	assert len(result_df["retrieved_contents"].tolist()[0]) == 3
+
+
+def reference_hybrid_rrf(ids, scores, top_k, weight):
+	# the per-query reciprocal rank fusion, one weight at a time
+	result_ids, result_scores = [], []
+	for query_ids, query_scores in zip(zip(*ids), zip(*scores)):
+		fused = {}
+		for doc_ids, doc_scores in zip(query_ids, query_scores):
+			for doc_id, score in zip(doc_ids, doc_scores):
+				rank = 1 + sum(other > score for other in doc_scores)
+				fused[doc_id] = fused.get(doc_id, 0.0) + 1 / (rank + weight)
+		ranked = sorted(fused.items(), key=lambda x: x[1], reverse=True)[:top_k]
+		result_ids.append([doc_id for doc_id, _ in ranked])
+		result_scores.append([score for _, score in ranked])
+	return result_ids, result_scores
+
+
+def test_hybrid_rrf_sweep():
+	weights = [1, 4, 60]
+	results = hybrid_rrf_sweep(sample_ids, sample_scores, top_k=3, weights=weights)
+	assert len(results) == len(weights)
+	for weight, (result_id, result_scores) in zip(weights, results):
+		expected_id, expected_scores = reference_hybrid_rrf(
+			sample_ids, sample_scores, top_k=3, weight=weight
+		)
+		assert result_id == expected_id
+		for result_score, expected_score in zip(result_scores, expected_scores):
+			assert result_score == pytest.approx(expected_score)
+	assert results[0][0] == [["id-3", "id-1", "id-2"], ["id-4", "id-2", "id-3"]]
@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from autorag.nodes.queryexpansion import HyDE, PassQueryExpansion
+from autorag.nodes.util import run_modules
+from autorag.schema import BaseModule
+
+
+class SleepModule(BaseModule):
+	running = 0
+	max_running = 0
+	lock = threading.Lock()
+
+	def __init__(self, project_dir, *args, **kwargs):
+		pass
+
+	def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
+		return self._pure(previous_result, **kwargs)
+
+	def _pure(self, previous_result, seconds: float, name: str):
+		cls = self.__class__
+		with cls.lock:
+			cls.running += 1
+			cls.max_running = max(cls.max_running, cls.running)
+		time.sleep(seconds)
+		with cls.lock:
+			cls.running -= 1
+		return pd.DataFrame(
+			{
+				"name": [name] * len(previous_result),
+				"pid": [os.getpid()] * len(previous_result),
+			}
+		)
+
+	def cast_to_run(self, previous_result: pd.DataFrame, *args, **kwargs):
+		pass
+
+
+class CPUModule(SleepModule):
+	resource = "cpu"
+
+
+class APIModule(SleepModule):
+	resource = "api"
+
+
+class GPUModule(SleepModule):
+	resource = "gpu"
+
+
+@pytest.fixture
+def previous_result(monkeypatch):
+	monkeypatch.setenv("AUTORAG_MODULE_CACHE_DIR", "")
+	yield pd.DataFrame({"query": ["a", "b"]})
+
+
+def test_run_modules_sequential(previous_result):
+	modules = [APIModule, APIModule]
+	params = [{"seconds": 0.2, "name": "a"}, {"seconds": 0.2, "name": "b"}]
+	results, execution_times = run_modules(modules, params, "pseudo", previous_result)
+	assert [result["name"][0] for result in results] == ["a", "b"]
+	assert APIModule.max_running == 1
+	assert all(t == pytest.approx(0.2, abs=0.1) for t in execution_times)
+
+
+def test_run_modules_parallel(previous_result):
+	modules = [CPUModule, GPUModule, APIModule, CPUModule, GPUModule, APIModule]
+	params = [{"seconds": 0.5, "name": str(i)} for i in range(len(modules))]
+	start_time = time.time()
+	results, execution_times = run_modules(
+		modules, params, "pseudo", previous_result, max_workers=4
+	)
+	elapsed_time = time.time() - start_time
+
+	assert [result["name"][0] for result in results] == [str(i) for i in range(6)]
+	# cpu modules run at the other processes
+	assert results[0]["pid"][0] != os.getpid()
+	assert results[0]["pid"][0] != results[3]["pid"][0]
+	assert results[1]["pid"][0] == results[2]["pid"][0] == os.getpid()
+	# gpu modules run one at a time, and the others run while they run
+	assert GPUModule.max_running == 1
+	assert APIModule.max_running == 2
+	assert elapsed_time < 2.0
+	# the execution time is measured for each module
+	assert all(t == pytest.approx(0.5, abs=0.2) for t in execution_times)
+
+
+def test_get_resource():
+	assert PassQueryExpansion.get_resource() == "cpu"
+	assert HyDE.get_resource(generator_module_type="openai_llm", llm="gpt-4o") == "api"
+	assert HyDE.get_resource(generator_module_type="vllm", llm="mock") == "gpu"
+	assert (
+		HyDE.get_resource(generator_module_type="llama_index_llm", llm="huggingfacellm")
+		== "gpu"
+	)
@@ -1,9 +1,14 @@
+import os
+import time
 from pathlib import Path
 from typing import Union
 
 import pandas as pd
+import pytest
 
 from autorag.schema import BaseModule
+from autorag.strategy import measure_speed
+from autorag.utils.module_cache import dataframe_fingerprint
 
 
 class TestModule(BaseModule):
@@ -36,3 +41,123 @@ def test_base_module_kwargs_pop():
     )
     assert param3 == 3
     assert result_lst == [1, 2, 3, {"param4": 4}]
+
+
+class CountModule(BaseModule):
+    calls = 0
+
+    def __init__(self, project_dir: Union[str, Path], *args, **kwargs):
+        pass
+
+    def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
+        return self._pure(previous_result["query"].tolist(), **kwargs)
+
+    def _pure(self, queries, top_k: int = 1):
+        CountModule.calls += 1
+        time.sleep(0.2)
+        return pd.DataFrame(
+            {
+                "retrieved_ids": [
+                    [f"{query}-{i}" for i in range(top_k)] for query in queries
+                ],
+                "retrieve_scores": [[1.0] * top_k for _ in queries],
+            }
+        )
+
+    def cast_to_run(self, previous_result: pd.DataFrame, *args, **kwargs):
+        pass
+
+
+def test_base_module_result_cache(tmp_path, monkeypatch):
+    monkeypatch.delenv("AUTORAG_MODULE_CACHE_DIR", raising=False)
+    project_dir = str(tmp_path)
+    os.makedirs(os.path.join(project_dir, "data"))
+    corpus_path = os.path.join(project_dir, "data", "corpus.parquet")
+    pd.DataFrame({"doc_id": ["a"], "contents": ["a"]}).to_parquet(corpus_path)
+    previous_result = pd.DataFrame({"query": ["q1", "q2"]})
+
+    def run(previous_result, **kwargs):
+        return measure_speed(
+            CountModule.run_evaluator,
+            project_dir=project_dir,
+            previous_result=previous_result,
+            **kwargs,
+        )
+
+    # the cache is off when there is no module_cache directory
+    run(previous_result, top_k=2)
+    run(previous_result, top_k=2)
+    assert CountModule.calls == 2
+
+    os.makedirs(os.path.join(project_dir, "resources", "module_cache"))
+    result, execution_time = run(previous_result, top_k=2)
+    assert CountModule.calls == 3
+    cached_result, cached_time = run(previous_result, top_k=2)
+    assert CountModule.calls == 3
+    pd.testing.assert_frame_equal(result, cached_result)
+    assert cached_result["retrieved_ids"].tolist() == [
+        ["q1-0", "q1-1"],
+        ["q2-0", "q2-1"],
+    ]
+    # the execution time of the first run is kept
+    assert cached_time == pytest.approx(execution_time, abs=0.05)
+    assert cached_result.attrs == {}
+
+    # the other parameters, previous result or corpus run the module again
+    run(previous_result, top_k=3)
+    assert CountModule.calls == 4
+    run(pd.DataFrame({"query": ["q1", "q3"]}), top_k=2)
+    assert CountModule.calls == 5
+    pd.DataFrame({"doc_id": ["b"], "contents": ["b"]}).to_parquet(corpus_path)
+    run(previous_result, top_k=2)
+    assert CountModule.calls == 6
+
+    monkeypatch.setenv("AUTORAG_MODULE_CACHE_DIR", "")
+    run(previous_result, top_k=2)
+    assert CountModule.calls == 7
+
+
+class SamplingModule(CountModule):
+    llm_sampling = True
+
+    def pure(self, previous_result: pd.DataFrame, *args, **kwargs):
+        kwargs.pop("temperature", None)
+        return super().pure(previous_result, *args, **kwargs)
+
+
+def test_base_module_result_cache_sampling(tmp_path, monkeypatch):
+    monkeypatch.delenv("AUTORAG_LLM_CACHE_FORCE", raising=False)
+    monkeypatch.setenv("AUTORAG_MODULE_CACHE_DIR", str(tmp_path / "module_cache"))
+    previous_result = pd.DataFrame({"query": ["q1"]})
+
+    assert CountModule.is_result_cacheable(top_k=2)
+    assert not CountModule.is_result_cacheable(top_k=2, temperature=0.7)
+    assert SamplingModule.is_result_cacheable(temperature=0.0)
+    # the default temperature of the LLM is unknown
+    assert not SamplingModule.is_result_cacheable()
+
+    def run(**kwargs):
+        calls = CountModule.calls
+        SamplingModule.run_evaluator(str(tmp_path), previous_result, **kwargs)
+        return CountModule.calls - calls
+
+    # the sampled results are not replayed from the cache
+    assert run(temperature=0.7) == 1
+    assert run(temperature=0.7) == 1
+    assert run(temperature=0.0) == 1
+    assert run(temperature=0.0) == 0
+
+    monkeypatch.setenv("AUTORAG_LLM_CACHE_FORCE", "true")
+    assert run(temperature=0.7) == 1
+    assert run(temperature=0.7) == 0
+
+
+def test_dataframe_fingerprint(tmp_path):
+    df = pd.DataFrame(
+        {"query": ["a", "b"], "ids": [["1", "2"], ["3"]], "score": [0.1, 0.2]}
+    )
+    df.to_parquet(os.path.join(tmp_path, "df.parquet"))
+    read_df = pd.read_parquet(os.path.join(tmp_path, "df.parquet"))
+    assert dataframe_fingerprint(df) == dataframe_fingerprint(read_df)
+    df["ids"] = [["1", "2"], ["4"]]
+    assert dataframe_fingerprint(df) != dataframe_fingerprint(read_df)
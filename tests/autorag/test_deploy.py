@@ -1,4 +1,5 @@
 import asyncio
+import json
 import logging
 import os
 import pathlib
@@ -16,8 +17,12 @@ from autorag.deploy import (
     extract_node_line_names,
     extract_node_strategy,
 )
-from autorag.deploy.api import ApiRunner
+from autorag.deploy.api import API_RUNNER_ENV, ApiRunner
+from autorag.deploy.base import make_pipeline_context, run_module_with_context
+from autorag.deploy.batching import MicroBatcher
 from autorag.evaluator import Evaluator
+from autorag.nodes.passagereranker import PassReranker
+from autorag.nodes.promptmaker import Fstring
 from tests.delete_tests import is_github_action
 
 root_dir = pathlib.PurePath(os.path.dirname(os.path.realpath(__file__))).parent
@@ -209,6 +214,28 @@ def test_extract_best_config(pseudo_trial_path):
         os.unlink(yaml_path.name)
 
 
+def test_run_module_with_context():
+    context = make_pipeline_context(["What is the best movie?"])
+    context["retrieved_contents"] = [["Parasite", "Minari"]]
+    context["retrieved_ids"] = [["id-1", "id-2"]]
+    context["retrieve_scores"] = [[0.9, 0.8]]
+
+    reranker = PassReranker(project_dir=resource_dir)
+    context = run_module_with_context(reranker, {"top_k": 1}, context)
+    assert context["retrieved_ids"] == [["id-1"]]
+    assert context["retrieve_scores"] == [[0.9]]
+
+    prompt_maker = Fstring(project_dir=resource_dir)
+    module_param = {"prompt": "Question: {query} Passages: {retrieved_contents}"}
+    expected = prompt_maker.pure(pd.DataFrame(context), **module_param)
+    context = run_module_with_context(prompt_maker, module_param, context)
+    assert context["prompts"] == expected["prompts"].tolist()
+    assert context["prompts"] == [
+        "Question: What is the best movie? Passages: Parasite"
+    ]
+    assert context["query"] == ["What is the best movie?"]
+
+
 def test_runner(evaluator):
     evaluator.start_trial(os.path.join(resource_dir, "simple_mock.yaml"))
     project_dir = evaluator.project_dir
@@ -236,6 +263,34 @@ def test_runner(evaluator):
         os.unlink(yaml_path.name)
 
 
+def test_runner_snapshot(evaluator):
+    evaluator.start_trial(os.path.join(resource_dir, "simple_mock.yaml"))
+    project_dir = evaluator.project_dir
+    query = "What is the best movie in Korea? Have Korea movie ever won Oscar?"
+
+    runner = Runner.from_trial_folder(os.path.join(project_dir, "0"))
+    expected = runner.run(query, "retrieved_ids")
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        runner.save_snapshot(snapshot_dir)
+        assert os.path.exists(os.path.join(snapshot_dir, "snapshot.yaml"))
+        assert os.path.exists(os.path.join(snapshot_dir, "data", "corpus.arrow"))
+        resources_dir = os.path.join(snapshot_dir, "resources")
+        assert os.path.exists(os.path.join(resources_dir, "vectordb.yaml"))
+        for name in os.listdir(resources_dir):
+            if name.startswith("bm25_") and not name.startswith("bm25_tokenizer_"):
+                assert os.path.exists(os.path.join(resources_dir, name, "meta.json"))
+
+        restored = Runner.from_snapshot(snapshot_dir)
+        assert restored.project_dir == snapshot_dir
+        assert restored.config == runner.config
+        assert restored.run(query, "retrieved_ids") == expected
+
+        api_runner = ApiRunner.from_snapshot(snapshot_dir)
+        assert isinstance(api_runner, ApiRunner)
+        del restored, api_runner
+
+
 @pytest.mark.skipif(is_github_action(), reason="Skipping this test on GitHub Actions")
 def test_runner_full(evaluator):
     runner = Runner.from_trial_folder(os.path.join(resource_dir, "result_project", "0"))
@@ -308,6 +363,141 @@ def test_runner_api_server(evaluator):
     assert isinstance(passages[0]["score"], float)
 
 
+def test_runner_api_server_concurrent(evaluator):
+    project_dir = evaluator.project_dir
+    evaluator.start_trial(os.path.join(resource_dir, "simple_mock.yaml"))
+    runner = ApiRunner.from_trial_folder(os.path.join(project_dir, "0"))
+    client = runner.app.test_client()
+
+    async def post_to_server(query: str):
+        response = await client.post("/v1/retrieve", json={"query": query})
+        return await response.get_json(), response.status_code
+
+    async def post_concurrently():
+        return await asyncio.gather(
+            *[post_to_server(f"What is the movie {i}?") for i in range(8)]
+        )
+
+    nest_asyncio.apply()
+
+    responses = asyncio.run(post_concurrently())
+    assert all(status_code == 200 for _, status_code in responses)
+    assert all(len(response["passages"]) == 10 for response, _ in responses)
+
+
+def test_runner_multi_worker_server(evaluator, monkeypatch):
+    project_dir = evaluator.project_dir
+    evaluator.start_trial(os.path.join(resource_dir, "simple_mock.yaml"))
+    hypercorn_configs = []
+    monkeypatch.setattr("hypercorn.run.run", hypercorn_configs.append)
+    monkeypatch.delenv(API_RUNNER_ENV, raising=False)
+
+    config = extract_best_config(os.path.join(project_dir, "0"))
+    ApiRunner.run_multi_worker_server(
+        config, project_dir, remote=False, workers=3, max_batch_size=4
+    )
+    assert hypercorn_configs[-1].workers == 3
+    assert json.loads(os.environ[API_RUNNER_ENV]) == {
+        "config": config,
+        "project_dir": project_dir,
+        "max_batch_size": 4,
+    }
+
+    # the launching runner releases its modules before the workers load them
+    runner = ApiRunner(config, project_dir=project_dir)
+    runner.run_api_server(remote=False, workers=2)
+    assert hypercorn_configs[-1].workers == 2
+    assert runner.module_instances == []
+    assert runner.corpus_df is None
+
+
+def test_micro_batcher():
+    batch_sizes = []
+
+    async def run_batch(df: pd.DataFrame) -> pd.DataFrame:
+        batch_sizes.append(len(df))
+        if "error" in df["query"].tolist():
+            raise ValueError("error query")
+        return pd.DataFrame({"answer": [query.upper() for query in df["query"]]})
+
+    batcher = MicroBatcher(run_batch, max_batch_size=4, max_wait_ms=20)
+
+    async def run(query: str):
+        return await batcher.run(pd.DataFrame({"query": [query]}))
+
+    async def run_concurrently(queries):
+        return await asyncio.gather(
+            *[run(query) for query in queries], return_exceptions=True
+        )
+
+    results = asyncio.run(run_concurrently([f"q{i}" for i in range(6)]))
+    assert [result["answer"].tolist() for result in results] == [
+        [f"Q{i}"] for i in range(6)
+    ]
+    assert batch_sizes == [4, 2]
+
+    # the failed request does not fail the others in the same batch
+    batch_sizes.clear()
+    results = asyncio.run(run_concurrently(["a", "error", "b"]))
+    assert results[0]["answer"].tolist() == ["A"]
+    assert isinstance(results[1], ValueError)
+    assert results[2]["answer"].tolist() == ["B"]
+    assert batch_sizes[0] == 3
+
+
+def test_runner_api_server_batch(evaluator):
+    project_dir = evaluator.project_dir
+    evaluator.start_trial(os.path.join(resource_dir, "simple_mock.yaml"))
+    runner = ApiRunner.from_trial_folder(
+        os.path.join(project_dir, "0"), max_batch_size=4, batch_wait_ms=20
+    )
+    client = runner.app.test_client()
+
+    async def post_to_server(query: str):
+        response = await client.post("/v1/retrieve", json={"query": query})
+        return await response.get_json(), response.status_code
+
+    async def post_concurrently():
+        return await asyncio.gather(
+            *[post_to_server(f"What is the movie {i}?") for i in range(6)]
+        )
+
+    nest_asyncio.apply()
+
+    responses = asyncio.run(post_concurrently())
+    assert all(status_code == 200 for _, status_code in responses)
+    single_response, _ = asyncio.run(post_to_server("What is the movie 3?"))
+    assert single_response["passages"] == responses[3][0]["passages"]
+
+
+def test_runner_api_server_ready(evaluator):
+    project_dir = evaluator.project_dir
+    evaluator.start_trial(os.path.join(resource_dir, "simple_mock.yaml"))
+    runner = ApiRunner.from_trial_folder(
+        os.path.join(project_dir, "0"),
+        warmup_queries=["What is the movie?", "Who is the actor?"],
+    )
+    assert runner.ready is False
+
+    async def check_ready():
+        async with runner.app.test_app() as app:
+            client = app.test_client()
+            await runner.warmup_task
+            response = await client.get("/health/ready")
+            return await response.get_json(), response.status_code
+
+    nest_asyncio.apply()
+
+    data, status_code = asyncio.run(check_ready())
+    assert status_code == 200
+    assert data["ready"] is True
+    assert data["error"] is None
+    assert len(data["modules"]) == len(runner.module_instances)
+    for module in data["modules"]:
+        assert module["load_time"] >= 0
+        assert module["warmup_time"] >= 0
+
+
 def test_runner_api_server2(evaluator_data_gen_by_autorag):
     project_dir = evaluator_data_gen_by_autorag.project_dir
     evaluator_data_gen_by_autorag.start_trial(
@@ -0,0 +1,121 @@
+import gc
+import os
+import pathlib
+import tempfile
+
+import pandas as pd
+import pytest
+
+from autorag.utils.corpus import (
+	CorpusLookup,
+	get_corpus_lookup,
+	_corpus_lookups,
+	load_corpus_data,
+	clear_corpus_cache,
+	get_corpus_path,
+	save_corpus_table,
+)
+from autorag.utils.util import fetch_one_content
+
+root_dir = pathlib.PurePath(os.path.dirname(os.path.realpath(__file__))).parent.parent
+resource_dir = os.path.join(root_dir, "resources")
+
+corpus_data = pd.DataFrame(
+	{
+		"doc_id": ["doc1", "doc2", "doc3", "doc2"],
+		"contents": ["apple", "banana", "cherry", "durian"],
+		"path": ["a.txt", "b.txt", "c.txt", "d.txt"],
+	}
+)
+
+
+def test_corpus_lookup_take():
+	lookup = CorpusLookup(corpus_data)
+	assert lookup.get_rows(["doc3", "doc1", "", None, "doc2"]).tolist() == [
+		2,
+		0,
+		-1,
+		-1,
+		1,
+	]
+	assert lookup.take(["doc2", "doc3"]) == ["banana", "cherry"]
+	assert lookup.take(["doc1", ""], column_name="path") == ["a.txt", None]
+	assert lookup.take_nested([["doc3", "doc1"], [], ["doc2"]]) == [
+		["cherry", "apple"],
+		[None],
+		["banana"],
+	]
+	with pytest.raises(ValueError):
+		lookup.take(["doc1", "doc5"])
+
+
+def test_corpus_lookup_changed_corpus():
+	changed_corpus = corpus_data.copy()
+	lookup = get_corpus_lookup(changed_corpus)
+	assert lookup.take(["doc1"]) == ["apple"]
+	changed_corpus.loc[0, "doc_id"] = "doc5"
+	assert lookup.take(["doc5"]) == ["apple"]
+	with pytest.raises(ValueError):
+		lookup.take(["doc1"])
+	assert fetch_one_content(changed_corpus, "doc5") == "apple"
+
+
+def test_get_corpus_lookup_cache():
+	new_corpus = corpus_data.copy()
+	lookup = get_corpus_lookup(new_corpus)
+	assert get_corpus_lookup(new_corpus) is lookup
+	assert get_corpus_lookup(corpus_data) is not lookup
+	key = id(new_corpus)
+	del new_corpus, lookup
+	gc.collect()
+	assert key not in _corpus_lookups
+
+
+def test_load_corpus_data():
+	clear_corpus_cache()
+	corpus_path = os.path.join(resource_dir, "corpus_data_sample.parquet")
+	corpus_df = load_corpus_data(corpus_path)
+	pd.testing.assert_frame_equal(
+		corpus_df, pd.read_parquet(corpus_path, engine="pyarrow")
+	)
+	assert load_corpus_data(corpus_path) is corpus_df
+
+	cast_df = load_corpus_data(corpus_path, cast=True)
+	assert cast_df is not corpus_df
+	assert load_corpus_data(corpus_path, cast=True) is cast_df
+	assert all("last_modified_datetime" in metadata for metadata in cast_df["metadata"])
+
+
+def test_load_corpus_data_modified():
+	clear_corpus_cache()
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		corpus_path = os.path.join(tmp_dir, "corpus.parquet")
+		corpus_data.to_parquet(corpus_path, index=False)
+		corpus_df = load_corpus_data(corpus_path)
+		assert corpus_df["contents"].tolist() == corpus_data["contents"].tolist()
+
+		corpus_data.iloc[:2].to_parquet(corpus_path, index=False)
+		new_corpus_df = load_corpus_data(corpus_path)
+		assert new_corpus_df is not corpus_df
+		assert new_corpus_df["contents"].tolist() == ["apple", "banana"]
+		assert load_corpus_data(corpus_path) is new_corpus_df
+
+
+def test_corpus_table():
+	clear_corpus_cache()
+	corpus_path = os.path.join(resource_dir, "corpus_data_sample.parquet")
+	corpus_df = load_corpus_data(corpus_path)
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		assert get_corpus_path(tmp_dir) == os.path.join(tmp_dir, "corpus.parquet")
+		save_corpus_table(corpus_df, os.path.join(tmp_dir, "corpus.arrow"))
+		table_path = get_corpus_path(tmp_dir)
+		assert table_path == os.path.join(tmp_dir, "corpus.arrow")
+		table_df = load_corpus_data(table_path)
+		pd.testing.assert_frame_equal(table_df, corpus_df)
+		assert load_corpus_data(table_path) is table_df
+		cast_df = load_corpus_data(table_path, cast=True)
+		assert all(
+			"last_modified_datetime" in metadata for metadata in cast_df["metadata"]
+		)
+		del table_df, cast_df
+		clear_corpus_cache()
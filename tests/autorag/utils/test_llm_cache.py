@@ -0,0 +1,122 @@
+import asyncio
+import os
+import time
+
+import pytest
+
+from autorag.utils.llm_cache import (
+	LLMResponseCache,
+	acached_llm_call,
+	cached_llm_batch,
+	get_llm_cache,
+	get_llm_cache_path,
+	get_llm_cache_stats,
+	is_llm_cacheable,
+)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+	cache_dir = str(tmp_path / "llm_cache")
+	monkeypatch.setenv("AUTORAG_LLM_CACHE_DIR", cache_dir)
+	monkeypatch.delenv("AUTORAG_LLM_CACHE_FORCE", raising=False)
+	yield cache_dir
+
+
+def test_get_llm_cache_path(tmp_path, monkeypatch):
+	monkeypatch.delenv("AUTORAG_LLM_CACHE_DIR", raising=False)
+	monkeypatch.setenv("PROJECT_DIR", str(tmp_path))
+	assert get_llm_cache_path() is None
+	os.makedirs(tmp_path / "resources")
+	assert get_llm_cache_path() == os.path.join(
+		str(tmp_path), "resources", "llm_cache.sqlite"
+	)
+	monkeypatch.setenv("AUTORAG_LLM_CACHE_DIR", "")
+	assert get_llm_cache_path() is None
+	assert get_llm_cache() is None
+
+
+def test_llm_response_cache(tmp_path):
+	path = str(tmp_path / "cache.sqlite")
+	cache = LLMResponseCache(path)
+	key = cache.make_key("gpt-4o-mini", "hello", {"temperature": 0})
+	# the params order does not change the key
+	assert key == cache.make_key("gpt-4o-mini", "hello", {"temperature": 0})
+	assert key != cache.make_key("gpt-4o-mini", "hello", {"temperature": 0.5})
+	assert cache.get(key) is None
+	cache.put(key, ["Hi", [1, 2], [-0.1, -0.2]])
+	assert cache.get(key) == ["Hi", [1, 2], [-0.1, -0.2]]
+	assert cache.stats()["hits"] == 1
+	assert cache.stats()["misses"] == 1
+	assert cache.stats()["size"] == 1
+	cache.close()
+
+	# the responses are saved at the file
+	cache = LLMResponseCache(path, ttl=60)
+	assert cache.get(key) == ["Hi", [1, 2], [-0.1, -0.2]]
+	cache.close()
+
+	# the expired response is not used
+	time.sleep(0.05)
+	cache = LLMResponseCache(path, ttl=0.01)
+	assert cache.get(key) is None
+	assert cache.stats()["size"] == 0
+	cache.close()
+
+
+def test_llm_response_cache_eviction(tmp_path):
+	cache = LLMResponseCache(str(tmp_path / "cache.sqlite"), max_bytes=1000)
+	keys = [cache.make_key("model", str(i), {}) for i in range(20)]
+	for key in keys[:10]:
+		cache.put(key, "x" * 10)
+	# the first response is recently used, so it is kept
+	cache.get(keys[0])
+	for key in keys[10:]:
+		cache.put(key, "x" * 10)
+	assert cache.stats()["bytes"] <= 1000
+	assert cache.get(keys[0]) == "x" * 10
+	assert cache.get(keys[1]) is None
+	assert cache.get(keys[-1]) == "x" * 10
+
+
+def test_acached_llm_call(cache_dir, monkeypatch):
+	calls = []
+
+	async def call():
+		calls.append(1)
+		return {"text": f"answer {len(calls)}"}
+
+	async def run(temperature):
+		return await acached_llm_call(
+			"mock", "prompt", {"temperature": temperature}, temperature, call
+		)
+
+	assert asyncio.run(run(0)) == {"text": "answer 1"}
+	assert asyncio.run(run(0)) == {"text": "answer 1"}
+	# the response with temperature is not deterministic, so it is not cached
+	assert asyncio.run(run(0.7)) == {"text": "answer 2"}
+	assert asyncio.run(run(0.7)) == {"text": "answer 3"}
+	monkeypatch.setenv("AUTORAG_LLM_CACHE_FORCE", "true")
+	assert is_llm_cacheable(0.7)
+	assert asyncio.run(run(0.7)) == {"text": "answer 4"}
+	assert asyncio.run(run(0.7)) == {"text": "answer 4"}
+
+	stats = get_llm_cache_stats()[os.path.join(cache_dir, "llm_cache.sqlite")]
+	assert stats["hits"] == 2
+	assert stats["size"] == 2
+
+
+def test_cached_llm_batch(cache_dir):
+	called_prompts = []
+
+	def generate(prompts):
+		called_prompts.append(prompts)
+		return [(prompt.upper(), [len(prompt)]) for prompt in prompts]
+
+	result = cached_llm_batch("mock", ["a", "b"], {}, 0.0, generate, load=tuple)
+	assert result == [("A", [1]), ("B", [1])]
+	result = cached_llm_batch("mock", ["b", "cc", "a"], {}, 0.0, generate, load=tuple)
+	assert result == [("B", [1]), ("CC", [2]), ("A", [1])]
+	assert called_prompts == [["a", "b"], ["cc"]]
+	assert cached_llm_batch("mock", ["a"], {}, None, generate) == [("A", [1])]
+	assert len(called_prompts) == 3
@@ -0,0 +1,150 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from autorag.utils import rate_limit
+from autorag.utils.rate_limit import RateLimiter, AdaptiveRateLimiter
+from autorag.utils.util import process_batch, get_event_loop
+
+
+def test_rate_limiter_requests_per_minute():
+	# 600 RPM is ten requests per second after the first full bucket
+	rate_limiter = RateLimiter(requests_per_minute=600)
+	rate_limiter.available_requests = 0
+
+	loop = get_event_loop()
+	start = loop.time()
+	for _ in range(3):
+		loop.run_until_complete(rate_limiter.acquire())
+	assert loop.time() - start >= 0.25
+
+
+def test_rate_limiter_tokens_per_minute():
+	rate_limiter = RateLimiter(tokens_per_minute=6000)
+	times = []
+
+	async def task():
+		times.append(asyncio.get_event_loop().time())
+
+	loop = get_event_loop()
+	loop.run_until_complete(
+		process_batch(
+			[task() for _ in range(3)],
+			batch_size=3,
+			rate_limiter=rate_limiter,
+			token_counts=[6000, 10, 10],
+		)
+	)
+	# the first task uses the whole bucket, so the next one waits for 10 tokens (0.1 second)
+	assert times[1] - times[0] >= 0.08
+	assert rate_limiter.available_tokens < 10
+
+
+def test_rate_limiter_invalid():
+	with pytest.raises(ValueError):
+		RateLimiter(requests_per_minute=0)
+	with pytest.raises(ValueError):
+		process_batch_coroutine = process_batch([], token_counts=[1])
+		get_event_loop().run_until_complete(process_batch_coroutine)
+
+
+class MockRateLimitError(Exception):
+	pass
+
+
+def test_adaptive_rate_limiter_concurrency():
+	rate_limiter = AdaptiveRateLimiter(initial_concurrency=2, max_concurrency=3)
+	running = 0
+	max_running = 0
+
+	async def request():
+		nonlocal running, max_running
+		running += 1
+		max_running = max(max_running, running)
+		await asyncio.sleep(0.01)
+		running -= 1
+		return "ok"
+
+	loop = get_event_loop()
+	result = loop.run_until_complete(
+		process_batch(
+			[rate_limiter.run(request) for _ in range(20)],
+			batch_size=10,
+		)
+	)
+	assert result == ["ok"] * 20
+	assert max_running <= 3
+	# additive increase after each round of successes, up to max_concurrency
+	assert rate_limiter.concurrency == 3
+	assert rate_limiter.running == 0
+
+
+def test_adaptive_rate_limiter_rate_limited():
+	rate_limiter = AdaptiveRateLimiter(initial_concurrency=8, max_retries=2)
+	attempts = 0
+
+	async def request():
+		nonlocal attempts
+		attempts += 1
+		if attempts == 1:
+			raise MockRateLimitError()
+		return "ok"
+
+	rate_limiter.on_rate_limited(0.01)
+	assert rate_limiter.concurrency == 4
+	# the errors in the same second are the same burst
+	rate_limiter.on_rate_limited(0.01)
+	assert rate_limiter.concurrency == 4
+	rate_limiter.decreased_at = 0.0
+
+	loop = get_event_loop()
+	result = loop.run_until_complete(
+		rate_limiter.run(request, rate_limit_exceptions=(MockRateLimitError,))
+	)
+	assert result == "ok"
+	assert attempts == 2
+	assert rate_limiter.concurrency == 2
+	assert rate_limiter.running == 0
+
+	async def always_limited():
+		raise MockRateLimitError()
+
+	with pytest.raises(MockRateLimitError):
+		loop.run_until_complete(
+			rate_limiter.run(
+				always_limited, rate_limit_exceptions=(MockRateLimitError,)
+			)
+		)
+	assert rate_limiter.running == 0
+
+
+def test_adaptive_rate_limiter_headers(monkeypatch):
+	# freeze the clock of the buckets, so they do not refill while the test runs
+	monkeypatch.setattr(rate_limit, "time", SimpleNamespace(monotonic=lambda: 100.0))
+	rate_limiter = AdaptiveRateLimiter(requests_per_minute=100)
+	rate_limiter.update_from_headers(
+		{
+			"x-ratelimit-limit-requests": "500",
+			"x-ratelimit-limit-tokens": "30000",
+			"x-ratelimit-remaining-requests": "50",
+			"x-ratelimit-remaining-tokens": "1000",
+		}
+	)
+	# the requests per minute is fixed by the user
+	assert rate_limiter.requests_per_minute == 100
+	assert rate_limiter.available_requests == pytest.approx(50)
+	assert rate_limiter.tokens_per_minute == 30000
+	assert rate_limiter.available_tokens == pytest.approx(1000)
+
+	async def request():
+		return {"total_tokens": 300}
+
+	loop = get_event_loop()
+	loop.run_until_complete(
+		rate_limiter.run(
+			request, tokens=500, get_used_tokens=lambda x: x["total_tokens"]
+		)
+	)
+	# the unused tokens are given back
+	assert rate_limiter.available_tokens == pytest.approx(700)
@@ -370,6 +370,67 @@ def test_process_batch():
 	assert result == results
 
 
+def test_process_batch_sliding_window():
+	running = 0
+	max_running = 0
+
+	async def task(i):
+		nonlocal running, max_running
+		running += 1
+		max_running = max(max_running, running)
+		# the first task is slow, but the others do not wait for it
+		await asyncio.sleep(0.3 if i == 0 else 0.01)
+		running -= 1
+		return i
+
+	progress = []
+	loop = get_event_loop()
+	start = loop.time()
+	result = loop.run_until_complete(
+		process_batch(
+			[task(i) for i in range(40)],
+			batch_size=4,
+			progress_callback=lambda done, total: progress.append((done, total)),
+		)
+	)
+	assert result == list(range(40))
+	assert max_running == 4
+	assert loop.time() - start < 0.3 + 0.01 * 40 / 4
+	assert progress[-1] == (40, 40)
+	assert len(progress) == 40
+
+
+def test_process_batch_retry():
+	attempts = {}
+
+	def make_task(i):
+		async def task():
+			attempts[i] = attempts.get(i, 0) + 1
+			if i % 2 == 0 and attempts[i] < 3:
+				raise ConnectionError("temporary error")
+			return i
+
+		return task
+
+	loop = get_event_loop()
+	result = loop.run_until_complete(
+		process_batch(
+			[make_task(i) for i in range(6)],
+			batch_size=2,
+			max_retries=2,
+			retry_delay=0.01,
+		)
+	)
+	assert result == list(range(6))
+	assert attempts == {0: 3, 1: 1, 2: 3, 3: 1, 4: 3, 5: 1}
+
+	attempts.clear()
+	with pytest.raises(ConnectionError):
+		loop.run_until_complete(
+			process_batch([make_task(0)], max_retries=2, retry_exceptions=(ValueError,))
+		)
+
+
 def test_openai_truncate_by_token():
 	base_text = "This is a test text."
 	t1 = base_text * 5
@@ -2,6 +2,7 @@ import os.path
 import pathlib
 import tempfile
 
+import pytest
 from llama_index.core import MockEmbedding
 from llama_index.embeddings.openai import OpenAIEmbedding
 
@@ -10,6 +11,7 @@ from autorag.vectordb import (
     load_vectordb_from_yaml,
     load_all_vectordb_from_yaml,
 )
+from autorag.vectordb.base import BaseVectorStore
 from autorag.vectordb.chroma import Chroma
 
 
@@ -68,3 +70,14 @@ def test_load_all_vectordb_from_yaml():
         assert isinstance(chroma_large_vectordb, Chroma)
         assert chroma_large_vectordb.collection.name == "openai_embed_3_large"
         assert isinstance(chroma_large_vectordb.embedding, MockEmbedding)
+
+
+def test_base_vectordb_abstract_methods():
+    class NoBulkSearchStore(Chroma):
+        query_by_embeddings = BaseVectorStore.query_by_embeddings
+
+    # the backend without the bulk search fails when it is made, not inside batch_query
+    with pytest.raises(TypeError, match="query_by_embeddings"):
+        NoBulkSearchStore(
+            embedding_model="mock", collection_name="jax2", client_type="ephemeral"
+        )
@@ -54,3 +54,45 @@ async def test_delete_documents(chroma_ephemeral):
 
 	assert len(contents[0]) == 1
 	assert len(scores[0]) == 1
+
+
+@pytest.mark.asyncio
+async def test_fetch_embeddings(chroma_ephemeral):
+	ids = ["doc1", "doc2"]
+	texts = ["This is a test document.", "This is another test document."]
+	await chroma_ephemeral.add(ids, texts)
+	stored_embeddings = await chroma_ephemeral.fetch(["doc2", "doc1"])
+
+	embeddings = await chroma_ephemeral.fetch_embeddings(
+		["doc1", "doc3", "doc2", "doc1"],
+		texts[:1] + ["This is not stored."] + texts[1:] + texts[:1],
+	)
+	assert len(embeddings) == 4
+	assert embeddings[0].tolist() == list(stored_embeddings[1])
+	assert embeddings[2].tolist() == list(stored_embeddings[0])
+	assert embeddings[3].tolist() == embeddings[0].tolist()
+	assert len(embeddings[1]) == 768
+	assert set(chroma_ephemeral.fetch_cache.keys()) == {"doc1", "doc2", "doc3"}
+
+	# the ids at the local cache are not fetched again
+	fetched_ids = []
+	original_fetch = chroma_ephemeral.fetch
+
+	async def counting_fetch(ids):
+		fetched_ids.extend(ids)
+		return await original_fetch(ids)
+
+	chroma_ephemeral.fetch = counting_fetch
+	await chroma_ephemeral.fetch_embeddings(["doc1", "doc2"], texts)
+	assert fetched_ids == []
+
+	# the deleted and re-added id does not return its stale embedding
+	await chroma_ephemeral.delete(["doc1"])
+	assert "doc1" not in chroma_ephemeral.fetch_cache
+	await chroma_ephemeral.add(["doc1"], ["This is a new document."])
+	new_stored_embeddings = await original_fetch(["doc1"])
+	embeddings = await chroma_ephemeral.fetch_embeddings(
+		["doc1"], ["This is a new document."]
+	)
+	assert embeddings[0].tolist() == list(new_stored_embeddings[0])
+	assert fetched_ids == ["doc1"]
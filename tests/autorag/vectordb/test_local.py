@@ -0,0 +1,191 @@
+import numpy as np
+import pytest
+
+from autorag.vectordb import get_support_vectordb
+from autorag.vectordb.local import Local
+
+
+@pytest.fixture
+def local_path(tmp_path):
+	yield str(tmp_path / "local")
+
+
+@pytest.fixture
+def local_instance(local_path):
+	return Local(
+		embedding_model="mock",
+		collection_name="test_collection",
+		path=local_path,
+	)
+
+
+def test_get_support_vectordb():
+	assert get_support_vectordb("local") is Local
+
+
+@pytest.mark.asyncio
+async def test_add_and_query_documents(local_instance, local_path):
+	# Add documents
+	ids = ["doc1", "doc2"]
+	texts = ["This is a test document.", "This is another test document."]
+	await local_instance.add(ids, texts)
+
+	# Query documents
+	queries = ["test document"]
+	contents, scores = await local_instance.query(queries, top_k=2)
+
+	assert len(contents) == 1
+	assert len(scores) == 1
+	assert len(contents[0]) == 2
+	assert len(scores[0]) == 2
+	assert scores[0][0] >= scores[0][1]
+
+	embeddings = await local_instance.fetch([ids[0]])
+	assert len(embeddings) == 1
+	assert len(embeddings[0]) == 768
+
+	exist = await local_instance.is_exist([ids[0], "doc3"])
+	assert exist == [True, False]
+
+	# the collection is saved at the path
+	new_instance = Local(
+		embedding_model="mock", collection_name="test_collection", path=local_path
+	)
+	assert await new_instance.is_exist(ids) == [True, True]
+	assert await new_instance.fetch([ids[0]]) == embeddings
+
+
+@pytest.mark.asyncio
+async def test_delete_documents(local_instance, local_path):
+	ids = ["doc1", "doc2"]
+	texts = ["This is a test document.", "This is another test document."]
+	await local_instance.add(ids, texts)
+
+	await local_instance.delete([ids[0]])
+	contents, scores = await local_instance.query(["test document"], top_k=2)
+	assert contents == [["doc2"]]
+	assert len(scores[0]) == 1
+
+	new_instance = Local(
+		embedding_model="mock", collection_name="test_collection", path=local_path
+	)
+	assert await new_instance.is_exist(ids) == [False, True]
+
+
+@pytest.mark.parametrize("similarity_metric", ["cosine", "ip", "l2"])
+def test_exact_search(local_path, similarity_metric):
+	rng = np.random.default_rng(0)
+	vectors = rng.normal(size=(100, 8)).astype(np.float32)
+	queries = rng.normal(size=(3, 8)).astype(np.float32)
+	local = Local(
+		embedding_model="mock",
+		collection_name="exact",
+		path=local_path,
+		similarity_metric=similarity_metric,
+	)
+	ids = [f"doc{i}" for i in range(100)]
+	local.add_embeddings(ids, vectors.tolist())
+	result_ids, result_scores = local.search(queries.tolist(), top_k=5)
+
+	if similarity_metric == "cosine":
+		expected = (queries / np.linalg.norm(queries, axis=1, keepdims=True)) @ (
+			vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+		).T
+	elif similarity_metric == "ip":
+		expected = queries @ vectors.T
+	else:
+		expected = 1 - np.linalg.norm(queries[:, None] - vectors[None, :], axis=-1)
+	expected_rows = np.argsort(-expected, axis=1)[:, :5]
+	assert result_ids == [[ids[row] for row in rows] for rows in expected_rows]
+	np.testing.assert_allclose(
+		result_scores,
+		np.take_along_axis(expected, expected_rows, axis=1),
+		rtol=1e-4,
+		atol=1e-5,
+	)
+
+
+def test_ivf_search(local_path):
+	rng = np.random.default_rng(0)
+	vectors = rng.normal(size=(300, 8))
+	queries = rng.normal(size=(4, 8))
+	ids = [f"doc{i}" for i in range(300)]
+	exact = Local(embedding_model="mock", collection_name="exact", path=local_path)
+	exact.add_embeddings(ids, vectors.tolist())
+	# probe every list, so the result is the same as the exact search
+	ivf = Local(
+		embedding_model="mock",
+		collection_name="ivf",
+		path=local_path,
+		index_type="ivf",
+		n_lists=6,
+		n_probe=6,
+	)
+	ivf.add_embeddings(ids[:200], vectors[:200].tolist())
+	ivf.search(queries.tolist(), top_k=3)
+	# the new vectors are added to the trained lists
+	ivf.add_embeddings(ids[200:], vectors[200:].tolist())
+	assert (
+		ivf.search(queries.tolist(), top_k=10)[0]
+		== exact.search(queries.tolist(), top_k=10)[0]
+	)
+
+	ivf.n_probe = 1
+	result_ids, result_scores = ivf.search(queries.tolist(), top_k=10)
+	assert all(len(query_ids) <= 10 for query_ids in result_ids)
+	assert all(scores == sorted(scores, reverse=True) for scores in result_scores)
+
+
+def test_float16(local_path):
+	vectors = [[0.1, 0.2, 0.3], [0.3, 0.2, 0.1], [0.1, 0.2, 0.3]]
+	local = Local(
+		embedding_model="mock",
+		collection_name="half",
+		path=local_path,
+		dtype="float16",
+	)
+	# the duplicated id is replaced
+	local.add_embeddings(["doc1", "doc2", "doc2"], vectors)
+	result_ids, result_scores = local.search([[0.1, 0.2, 0.3]], top_k=3)
+	assert result_ids == [["doc1", "doc2"]]
+	assert result_scores[0] == pytest.approx([1.0, 1.0], rel=1e-3)
+
+	with pytest.raises(ValueError):
+		Local(embedding_model="mock", collection_name="half", path=local_path)
+
+
+@pytest.mark.asyncio
+async def test_batch_query(local_instance, monkeypatch):
+	rng = np.random.default_rng(0)
+	ids = [f"doc{i}" for i in range(10)]
+	local_instance.add_embeddings(ids, rng.normal(size=(10, 768)).tolist())
+
+	queries_list = [["test document", "another"], [], ["document 3"]]
+	query_embeddings = {
+		query: rng.normal(size=768).tolist()
+		for query in ["test document", "another", "document 3"]
+	}
+
+	async def mock_embedding_batch(self, texts, **kwargs):
+		return [query_embeddings[text] for text in texts]
+
+	monkeypatch.setattr(
+		type(local_instance.embedding),
+		"aget_text_embedding_batch",
+		mock_embedding_batch,
+	)
+	ids_list, scores_list = await local_instance.batch_query(
+		queries_list, top_k=3, search_batch=2, max_concurrency=2
+	)
+	assert len(ids_list) == len(scores_list) == 3
+	assert ids_list[1] == [] and scores_list[1] == []
+	for queries, result_ids, result_scores in zip(queries_list, ids_list, scores_list):
+		if len(queries) == 0:
+			continue
+		expected_ids, expected_scores = local_instance.search(
+			[query_embeddings[query] for query in queries], top_k=3
+		)
+		assert result_ids == expected_ids
+		np.testing.assert_allclose(result_scores, expected_scores, rtol=1e-5)
+
+	assert await local_instance.batch_query([[], []], top_k=3) == ([[], []], [[], []])